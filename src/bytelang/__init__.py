@@ -1,51 +1,59 @@
+"""
+ByteLang - интерпретируемый низкоуровневый язык программирования.
+Публичные имена и подмодули импортируются при первом обращении
+"""
+
 from __future__ import annotations
 
-from os import PathLike
-from pathlib import Path
-from typing import Optional
-
-from bytelang.content import Environment
-from bytelang.handlers import ErrorHandler
-from bytelang.interpreters import Interpreter
-from bytelang.processors import CompileResult
-from bytelang.processors import Compiler
-from bytelang.registries import EnvironmentsRegistry
-from bytelang.registries import PackageRegistry
-from bytelang.registries import PrimitivesRegistry
-from bytelang.registries import ProfileRegistry
-from bytelang.sourcegenerator import InstructionSourceGenerator
-from bytelang.sourcegenerator import Language
-
-
-class ByteLang:
-    """API byteLang"""
-
-    # TODO декомпиляция
-    # TODO REPL режим
-
-    def __init__(self) -> None:
-        self.primitives_registry = PrimitivesRegistry()
-        self.profile_registry = ProfileRegistry("json", self.primitives_registry)
-        self.package_registry = PackageRegistry("blp", self.primitives_registry)
-        self.environment_registry = EnvironmentsRegistry("json", self.profile_registry, self.package_registry)
-        self.__errors_handler = ErrorHandler()
-        self.__compiler = Compiler(self.__errors_handler, self.primitives_registry, self.environment_registry)
-
-    def compile(self, source_filepath: PathLike | str, bytecode_filepath: PathLike | str) -> Optional[CompileResult]:
-        """Скомпилировать исходный код bls в байткод программу"""
-        self.__errors_handler.reset()
-        return self.__compiler.run(source_filepath, bytecode_filepath)
-
-    def decompile(self, env: str, bytecode_filepath: PathLike | str, source_filepath: PathLike | str) -> None:
-        """Декомпилировать байткод с данной средой ВМ и сгенерировать исходный код"""
-        pass
-
-    def getErrorsLog(self) -> str:
-        return self.__errors_handler.getLog()
-
-    def generateSource(self, env: str, output_folder: PathLike | str, lang: Language = Language.PYTHON) -> Path:
-        return InstructionSourceGenerator.create(lang).run(
-            self.environment_registry.get(env),
-            self.primitives_registry,
-            Path(output_folder)
-        )
+import importlib
+from typing import Any
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bytelang.api import ByteLang
+    from bytelang.content import Environment
+    from bytelang.handlers import ErrorHandler
+    from bytelang.interpreters import Interpreter
+    from bytelang.processors import CompileResult
+    from bytelang.processors import Compiler
+    from bytelang.registries import EnvironmentsRegistry
+    from bytelang.registries import PackageRegistry
+    from bytelang.registries import PrimitivesRegistry
+    from bytelang.registries import ProfileRegistry
+    from bytelang.sourcegenerator import InstructionSourceGenerator
+    from bytelang.sourcegenerator import Language
+
+_EXPORTS: dict[str, str] = {
+    "ByteLang": "bytelang.api",
+    "Environment": "bytelang.content",
+    "ErrorHandler": "bytelang.handlers",
+    "Interpreter": "bytelang.interpreters",
+    "CompileResult": "bytelang.processors",
+    "Compiler": "bytelang.processors",
+    "EnvironmentsRegistry": "bytelang.registries",
+    "PackageRegistry": "bytelang.registries",
+    "PrimitivesRegistry": "bytelang.registries",
+    "ProfileRegistry": "bytelang.registries",
+    "InstructionSourceGenerator": "bytelang.sourcegenerator",
+    "Language": "bytelang.sourcegenerator",
+}
+"""Публичное имя -> модуль, в котором оно определено"""
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _EXPORTS.get(name)) is not None:
+        ret = globals()[name] = getattr(importlib.import_module(module), name)
+        return ret
+
+    try:
+        return importlib.import_module(f"{__name__}.{name}")
+
+    except ModuleNotFoundError as e:
+        if e.name != f"{__name__}.{name}":
+            raise
+
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
@@ -0,0 +1,3 @@
+from bytelang.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,143 @@
+"""API ByteLang. Модули компилятора, интерпретатора и генератора исходного кода импортируются при первом использовании"""
+
+from __future__ import annotations
+
+import importlib
+from os import PathLike
+from pathlib import Path
+from typing import ClassVar
+from typing import Iterable
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from bytelang.handlers import ErrorHandler
+from bytelang.registries import EnvironmentsRegistry
+from bytelang.registries import PackageRegistry
+from bytelang.registries import PrimitivesRegistry
+from bytelang.registries import ProfileRegistry
+
+if TYPE_CHECKING:
+    from bytelang.layout import HeapLayout
+    from bytelang.processors import CompileResult
+    from bytelang.processors import Compiler
+    from bytelang.sourcegenerator import Language
+
+
+class ByteLang:
+    """API byteLang"""
+
+    # TODO декомпиляция
+    # TODO REPL режим
+
+    PRELOAD_MODULES: ClassVar[tuple[str, ...]] = (
+        "bytelang.processors",
+        "bytelang.interpreters",
+        "bytelang.sourcegenerator",
+    )
+    """Модули, импортируемые preload"""
+
+    def __init__(self) -> None:
+        self.primitives_registry = PrimitivesRegistry()
+        self.profile_registry = ProfileRegistry("json", self.primitives_registry)
+        self.package_registry = PackageRegistry("blp", self.primitives_registry)
+        self.environment_registry = EnvironmentsRegistry("json", self.profile_registry, self.package_registry)
+        self.__errors_handler = ErrorHandler()
+        self.__compiler: Optional[Compiler] = None
+        """Создаётся при первой компиляции"""
+
+    def preload(self, envs: Optional[Iterable[str]] = None) -> None:
+        """
+        Заранее импортировать модули компилятора и интерпретатора и загрузить реестры
+        (Для серверов, которым важна задержка первого запроса, а не время запуска)
+        :param envs: окружения для загрузки. None - все окружения каталога
+        """
+        for module in self.PRELOAD_MODULES:
+            importlib.import_module(module)
+
+        self.primitives_registry.preload()
+        self.environment_registry.preload(envs)
+        self.__getCompiler()
+
+    def __getCompiler(self) -> Compiler:
+        if self.__compiler is None:
+            from bytelang.processors import Compiler
+            self.__compiler = Compiler(self.__errors_handler, self.primitives_registry, self.environment_registry)
+
+        return self.__compiler
+
+    def setCache(self, cache_filepath: Optional[PathLike | str]) -> None:
+        """
+        Использовать постоянный кэш разрешённых окружений (None - отключить).
+        Устанавливается до setDataFolder, чтобы примитивные типы тоже читались из кэша
+        """
+        from bytelang.caches import RegistryCache
+
+        cache = None if cache_filepath is None else RegistryCache(cache_filepath)
+        self.primitives_registry.setCache(cache)
+        self.environment_registry.setCache(cache, self.primitives_registry)
+
+    def setCompileCache(self, cache_folder: Optional[PathLike | str], size_limit: Optional[int] = None) -> None:
+        """
+        Использовать кэш результатов компиляции (None - отключить).
+        Неизменённый исходник с неизменённым окружением не компилируется повторно: байткод берётся из кэша
+        :param size_limit: размер кэша в байтах. None - CompileCache.DEFAULT_SIZE_LIMIT
+        """
+        from bytelang.caches import CompileCache
+
+        cache = None if cache_folder is None else CompileCache(cache_folder, CompileCache.DEFAULT_SIZE_LIMIT if size_limit is None else size_limit)
+        self.__getCompiler().setCache(cache)
+
+    def setDataFolder(self, data_folder: PathLike | str) -> None:
+        """Настроить реестры по стандартной структуре папки данных (primitives/std.json, packages, profiles, environments)"""
+        data_folder = Path(data_folder)
+        self.primitives_registry.setFile(data_folder / "primitives/std.json")
+        self.package_registry.setFolder(data_folder / "packages")
+        self.profile_registry.setFolder(data_folder / "profiles")
+        self.environment_registry.setFolder(data_folder / "environments")
+
+    def compile(
+            self,
+            source_filepath: PathLike | str,
+            bytecode_filepath: PathLike | str,
+            *,
+            streaming: bool = False,
+            optimize: bool = False,
+            layout: Optional[HeapLayout] = None,
+            container: bool = False,
+            parse_workers: Optional[int] = 1
+    ) -> Optional[CompileResult]:
+        """Скомпилировать исходный код bls в байткод программу.
+        В потоковом режиме байт-код пишется в файл по мере разбора, результат не хранит выражения, инструкции и байт-код.
+        optimize - применить локальную оптимизацию промежуточного кода, layout - способ размещения переменных в heap
+        (оба только без потокового режима, None - HeapLayout.DECLARATION), container - записать самоописывающий контейнер (ProgramContainer),
+        parse_workers - разбирать большой исходник частями в пуле процессов (1 - последовательно, None - по количеству ядер)"""
+        compiler = self.__getCompiler()
+        self.__errors_handler.reset()
+
+        if layout is None:
+            from bytelang.layout import HeapLayout
+            layout = HeapLayout.DECLARATION
+
+        return compiler.run(source_filepath, bytecode_filepath, streaming=streaming, optimize=optimize, layout=layout, container=container, parse_workers=parse_workers)
+
+    def decompile(self, env: str, bytecode_filepath: PathLike | str, source_filepath: PathLike | str) -> None:
+        """Декомпилировать байткод с данной средой ВМ и сгенерировать исходный код"""
+        pass
+
+    def getErrorsLog(self) -> str:
+        return self.__errors_handler.getLog()
+
+    def getErrors(self) -> tuple[str, ...]:
+        """Сообщения ошибок последней компиляции"""
+        return self.__errors_handler.getMessages()
+
+    def generateSource(self, env: str, output_folder: PathLike | str, lang: Optional[Language] = None) -> Path:
+        """lang: None - Language.PYTHON"""
+        from bytelang.sourcegenerator import InstructionSourceGenerator
+        from bytelang.sourcegenerator import Language
+
+        return InstructionSourceGenerator.create(Language.PYTHON if lang is None else lang).run(
+            self.environment_registry.get(env),
+            self.primitives_registry,
+            Path(output_folder)
+        )
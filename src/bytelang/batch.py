@@ -0,0 +1,134 @@
+"""Пакетное исполнение набора программ байткода в пуле процессов"""
+
+from __future__ import annotations
+
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+from bytelang import ByteLang
+from bytelang.errors import ExecutionLimitError
+from bytelang.interpreters import Interpreter
+from bytelang.sinks import MemorySink
+
+
+@dataclass(frozen=True, kw_only=True)
+class BatchResult:
+    """Результат исполнения одной программы"""
+
+    bytecode_filepath: str
+    exit_code: Optional[int]
+    """Код завершения. None, если исполнение завершилось ошибкой"""
+    output: str
+    """Перехваченный вывод программы"""
+    instructions: int
+    """Количество исполненных инструкций"""
+    elapsed: float
+    """Время исполнения в секундах"""
+    error: Optional[str] = None
+    """Описание ошибки исполнения"""
+
+    def __str__(self) -> str:
+        status = f"exit {self.exit_code}" if self.error is None else f"error {self.error}"
+        return f"{self.bytecode_filepath}: {status} | {self.instructions} instructions | {self.elapsed * 1000:.3f} ms"
+
+
+@dataclass(frozen=True, kw_only=True)
+class BatchSettings:
+    """Настройки исполнителя, передаваемые каждому процессу"""
+
+    data_folder: str
+    """Папка данных ByteLang"""
+    environment: str
+    """Окружение, для которого скомпилированы программы"""
+    instructions_module: str
+    """Модуль со сгенерированным кортежем INSTRUCTIONS"""
+    instruction_limit: Optional[int] = None
+    """Ограничение количества инструкций на программу"""
+    cache_filepath: Optional[str] = None
+    """Файл постоянного кэша окружений (None - без кэша)"""
+
+
+class _BatchWorker:
+    """Состояние процесса пула: реестры и таблица инструкций загружаются один раз"""
+
+    SLICE: int = 1 << 16
+    """Количество инструкций за один вызов step"""
+
+    instance: Optional[_BatchWorker] = None
+
+    def __init__(self, settings: BatchSettings) -> None:
+        self.__settings = settings
+        bl = ByteLang()
+        bl.setCache(settings.cache_filepath)
+        bl.setDataFolder(settings.data_folder)
+        module = importlib.import_module(settings.instructions_module)
+        self.__output = MemorySink()
+        self.__vm = Interpreter(bl.environment_registry.get(settings.environment), bl.primitives_registry, module.INSTRUCTIONS, getattr(module, "SIGNATURE", None))
+        self.__vm.setOutput(self.__output)
+
+    @classmethod
+    def initialize(cls, settings: BatchSettings) -> None:
+        cls.instance = _BatchWorker(settings)
+
+    @classmethod
+    def execute(cls, bytecode_filepath: str) -> BatchResult:
+        return cls.instance.__execute(bytecode_filepath)
+
+    def __execute(self, bytecode_filepath: str) -> BatchResult:
+        limit = self.__settings.instruction_limit
+        executed = 0
+        exit_code = error = None
+        self.__output.clear()
+        begin = perf_counter()
+
+        try:
+            self.__vm.load(bytecode_filepath)
+
+            while self.__vm.isRunning():
+                if limit is not None and executed >= limit:
+                    raise ExecutionLimitError(f"Instruction limit {limit} exceeded")
+
+                executed += self.__vm.step(self.SLICE if limit is None else min(self.SLICE, limit - executed))
+
+            exit_code = self.__vm.getExitCode()
+
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+
+        finally:
+            # Программы могут перекомпилироваться между пакетами: отображение файла не удерживается
+            self.__vm.unload()
+
+        return BatchResult(
+            bytecode_filepath=bytecode_filepath,
+            exit_code=exit_code,
+            output=self.__output.getValue(),
+            instructions=executed,
+            elapsed=perf_counter() - begin,
+            error=error
+        )
+
+
+class BatchExecutor:
+    """Исполнитель набора программ в пуле процессов"""
+
+    def __init__(self, settings: BatchSettings, workers: Optional[int] = None) -> None:
+        self.__settings = settings
+        self.__workers = workers
+        """Количество процессов. None - по количеству ядер"""
+
+    def run(self, bytecode_filepaths: Iterable[PathLike | str]) -> Iterator[BatchResult]:
+        """Исполнить программы. Результаты возвращаются по мере завершения"""
+        with ProcessPoolExecutor(self.__workers, initializer=_BatchWorker.initialize, initargs=(self.__settings,)) as pool:
+            futures = [pool.submit(_BatchWorker.execute, str(Path(filepath))) for filepath in bytecode_filepaths]
+
+            for future in as_completed(futures):
+                yield future.result()
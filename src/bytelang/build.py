@@ -0,0 +1,145 @@
+"""Параллельная компиляция набора исходных файлов в пуле процессов"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+from bytelang import ByteLang
+from bytelang.layout import HeapLayout
+from bytelang.processors import LogFlag
+from bytelang.tools import FileTool
+
+
+@dataclass(frozen=True, kw_only=True)
+class BuildResult:
+    """Результат компиляции одного файла"""
+
+    source_filepath: str
+    bytecode_filepath: str
+    errors: tuple[str, ...]
+    """Сообщения ошибок компиляции. Пусто - компиляция успешна"""
+    program_size: Optional[int]
+    """Размер байт-кода. None, если компиляция не удалась"""
+    elapsed: float
+    """Время компиляции в секундах"""
+
+    def success(self) -> bool:
+        return not self.errors
+
+    def __str__(self) -> str:
+        status = f"{self.program_size}B" if self.success() else f"errors {len(self.errors)}"
+        return f"{self.source_filepath}: {status} | {self.elapsed * 1000:.3f} ms"
+
+
+@dataclass(frozen=True, kw_only=True)
+class BuildSettings:
+    """Настройки компиляции, передаваемые каждому процессу"""
+
+    data_folder: str
+    """Папка данных ByteLang"""
+    cache_filepath: Optional[str] = None
+    """Файл постоянного кэша окружений (None - без кэша)"""
+    compile_cache_folder: Optional[str] = None
+    """Каталог кэша результатов компиляции (None - без кэша)"""
+    listing_flags: Optional[LogFlag] = None
+    """Состав листинга, записываемого рядом с байт-кодом (<файл>.blc.txt). None - без листинга"""
+    optimize: bool = False
+    layout: HeapLayout = HeapLayout.DECLARATION
+    container: bool = False
+
+
+class _BuildWorker:
+    """Состояние процесса пула: реестры загружаются один раз и используются для всех файлов процесса"""
+
+    instance: Optional[_BuildWorker] = None
+
+    def __init__(self, settings: BuildSettings) -> None:
+        self.__settings = settings
+        self.__bl = ByteLang()
+        self.__bl.setCache(settings.cache_filepath)
+        self.__bl.setDataFolder(settings.data_folder)
+        self.__bl.setCompileCache(settings.compile_cache_folder)
+
+    @classmethod
+    def initialize(cls, settings: BuildSettings) -> None:
+        cls.instance = _BuildWorker(settings)
+
+    @classmethod
+    def execute(cls, source_filepath: str, bytecode_filepath: str) -> BuildResult:
+        return cls.instance.__execute(source_filepath, bytecode_filepath)
+
+    def __execute(self, source_filepath: str, bytecode_filepath: str) -> BuildResult:
+        settings = self.__settings
+        begin = perf_counter()
+        result = None
+
+        try:
+            Path(bytecode_filepath).parent.mkdir(parents=True, exist_ok=True)
+            result = self.__bl.compile(
+                source_filepath,
+                bytecode_filepath,
+                optimize=settings.optimize,
+                layout=settings.layout,
+                container=settings.container
+            )
+            errors = self.__bl.getErrors()
+
+            if result is not None and settings.listing_flags is not None:
+                FileTool.save(f"{bytecode_filepath}.txt", result.getInfoLog(settings.listing_flags))
+
+        except Exception as e:
+            errors = f"{e.__class__.__name__}: {e}",
+
+        if result is None and not errors:
+            errors = "Compilation failed",
+
+        return BuildResult(
+            source_filepath=source_filepath,
+            bytecode_filepath=bytecode_filepath,
+            errors=errors,
+            program_size=None if result is None else result.program_size,
+            elapsed=perf_counter() - begin
+        )
+
+
+class BuildExecutor:
+    """Компиляция набора файлов в пуле процессов"""
+
+    def __init__(self, settings: BuildSettings, workers: Optional[int] = None) -> None:
+        self.__settings = settings
+        self.__workers = workers
+        """Количество процессов. None - по количеству ядер"""
+
+    @staticmethod
+    def outputs(source_filepaths: Iterable[PathLike | str], output_folder: Optional[PathLike | str] = None) -> dict[str, str]:
+        """
+        Пути байт-кода для исходных файлов: рядом с исходником
+        или в output_folder с сохранением путей относительно общего каталога исходников
+        """
+        sources = tuple(Path(filepath) for filepath in source_filepaths)
+
+        if output_folder is None or not sources:
+            return {str(source): str(source.with_suffix(".blc")) for source in sources}
+
+        root = Path(os.path.commonpath([source.resolve().parent for source in sources]))
+        return {
+            str(source): str(Path(output_folder) / source.resolve().relative_to(root).with_suffix(".blc"))
+            for source in sources
+        }
+
+    def run(self, outputs: dict[str, str]) -> Iterator[BuildResult]:
+        """Скомпилировать файлы (исходник -> байт-код). Результаты возвращаются по мере завершения"""
+        with ProcessPoolExecutor(self.__workers, initializer=_BuildWorker.initialize, initargs=(self.__settings,)) as pool:
+            futures = [pool.submit(_BuildWorker.execute, source, bytecode) for source, bytecode in outputs.items()]
+
+            for future in as_completed(futures):
+                yield future.result()
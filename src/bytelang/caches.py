@@ -0,0 +1,428 @@
+"""Постоянные кэши: разрешённых реестров и результатов компиляции"""
+
+from __future__ import annotations
+
+import io
+import os
+import pickle
+import shutil
+from hashlib import blake2b
+from os import PathLike
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import ClassVar
+from typing import Iterable
+from typing import Optional
+
+from bytelang.content import Environment
+from bytelang.content import EnvironmentInstruction
+from bytelang.content import EnvironmentInstructionArgument
+from bytelang.content import InstructionSemantics
+from bytelang.content import OpcodeEncoding
+from bytelang.content import PrimitiveType
+from bytelang.content import Profile
+from bytelang.tools import FileTool
+
+_SourceStamp = tuple[str, int, int, bytes]
+"""Путь, время изменения (нс), размер, хеш содержимого"""
+
+_PrimitiveRecord = tuple[str, int, str]
+"""Имя, размер, способ записи"""
+
+_CompileEntry = tuple[str, bytes, bytes, bytes, bytes]
+"""Имя окружения, подпись окружения, хеш примитивных типов, хеш байткода, результат компиляции"""
+
+
+class RegistryCache:
+    """
+    Кэш сырых JSON-файлов и полностью разрешённых окружений в одном двоичном файле.
+    Запись действительна, пока не изменился ни один её исходный файл: совпадение времени изменения и размера,
+    иначе - хеша содержимого. Устаревшие записи пересобираются и кэш перезаписывается
+    """
+
+    VERSION: ClassVar[int] = 2
+    """Версия формата кэша"""
+    DEFAULT_FILENAME: ClassVar[str] = ".bytelang_cache"
+    """Имя файла кэша в папке данных по умолчанию"""
+
+    def __init__(self, filepath: PathLike | str) -> None:
+        self.__filepath = Path(filepath)
+        self.__data: Optional[dict[str, dict[str, Any]]] = None
+        """Раздел -> ключ -> (отпечатки исходных файлов, значение)"""
+
+    def getFilepath(self) -> Path:
+        return self.__filepath
+
+    def clear(self) -> None:
+        """Удалить все записи и файл кэша"""
+        self.__data = {}
+        self.__filepath.unlink(missing_ok=True)
+
+    def readJSON(self, filepath: PathLike | str) -> dict | list:
+        """Содержимое JSON-файла: из кэша, если файл не изменился"""
+        key = str(Path(filepath).resolve())
+
+        if (ret := self.__get("json", key)) is not None:
+            return ret
+
+        ret = FileTool.readJSON(filepath)
+        self.__put("json", key, (key,), ret)
+        return ret
+
+    def getEnvironment(self, filepath: PathLike | str, primitives: Callable[[str], Optional[PrimitiveType]]) -> Optional[Environment]:
+        """
+        Разрешённое окружение из кэша
+        :param primitives: текущие примитивные типы (окружение устаревает, если его типы изменились)
+        :return: None, если записи нет или она устарела
+        """
+        if (record := self.__get("environments", str(Path(filepath).resolve()))) is None:
+            return
+
+        used, env = record
+
+        if any(
+                (primitive := primitives(name)) is None or (primitive.size, primitive.write_type.name) != (size, write_type)
+                for name, size, write_type in used
+        ):
+            return
+
+        return self.__restoreEnvironment(env, primitives)
+
+    def putEnvironment(self, env: Environment, sources: Iterable[PathLike | str]) -> None:
+        """Сохранить окружение. sources - все файлы, из которых оно собрано"""
+        key = str(Path(env.parent).resolve())
+        self.__put("environments", key, (key, *(str(Path(p).resolve()) for p in sources)), (self.__usedPrimitives(env), self.__storeEnvironment(env)))
+
+    def __load(self) -> dict[str, dict[str, Any]]:
+        if self.__data is not None:
+            return self.__data
+
+        self.__data = {}
+
+        try:
+            with open(self.__filepath, "rb") as f:
+                version, data = pickle.load(f)
+
+            if version == self.VERSION:
+                self.__data = data
+
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+            # Кэш отсутствует или повреждён - будет собран заново
+            pass
+
+        return self.__data
+
+    def __save(self) -> None:
+        """Атомарная запись: параллельные процессы видят либо прежний, либо новый файл целиком"""
+        self.__filepath.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.__filepath.with_name(f"{self.__filepath.name}.{os.getpid()}.tmp")
+
+        with open(temp, "wb") as f:
+            pickle.dump((self.VERSION, self.__data), f, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temp, self.__filepath)
+
+    def __get(self, section: str, key: str) -> Any:
+        if (entry := self.__load().get(section, {}).get(key)) is None:
+            return
+
+        stamps, value = entry
+        fresh = list[_SourceStamp]()
+
+        for stamp in stamps:
+            if (current := self.__checkStamp(stamp)) is None:
+                return
+
+            fresh.append(current)
+
+        if fresh != list(stamps):
+            # Файлы были перезаписаны без изменений - обновляем отпечатки, чтобы не хешировать их повторно
+            self.__data[section][key] = (tuple(fresh), value)
+            self.__save()
+
+        return value
+
+    def __put(self, section: str, key: str, sources: Iterable[str], value: Any) -> None:
+        self.__load().setdefault(section, {})[key] = (tuple(map(self.__stamp, sources)), value)
+        self.__save()
+
+    @staticmethod
+    def __hash(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return blake2b(f.read(), digest_size=16).digest()
+
+    @classmethod
+    def __stamp(cls, path: str) -> _SourceStamp:
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size, cls.__hash(path)
+
+    @classmethod
+    def __checkStamp(cls, stamp: _SourceStamp) -> Optional[_SourceStamp]:
+        """Актуальный отпечаток файла или None, если содержимое изменилось"""
+        path, mtime_ns, size, digest = stamp
+
+        try:
+            stat = os.stat(path)
+
+            if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+                return stamp
+
+            if stat.st_size != size or cls.__hash(path) != digest:
+                return
+
+        except OSError:
+            return
+
+        return path, stat.st_mtime_ns, size, digest
+
+    @staticmethod
+    def __usedPrimitives(env: Environment) -> tuple[_PrimitiveRecord, ...]:
+        profile = env.profile
+        used = [profile.pointer_program, profile.pointer_heap, profile.instruction_index]
+
+        for ins in env.instructions.values():
+            for arg in ins.arguments:
+                used.append(arg.primitive_type)
+
+                if arg.pointing_type is not None:
+                    used.append(arg.pointing_type)
+
+        return tuple(sorted({(p.name, p.size, p.write_type.name) for p in used}))
+
+    @staticmethod
+    def __storeEnvironment(env: Environment) -> tuple:
+        profile = env.profile
+        return (
+            env.parent,
+            env.name,
+            (
+                profile.parent, profile.name, profile.max_program_length,
+                profile.pointer_program.name, profile.pointer_heap.name, profile.instruction_index.name,
+                profile.stack_size
+            ),
+            env.opcodes.variable,
+            tuple(
+                (
+                    ins.parent, ins.name, ins.index, ins.package, ins.size,
+                    tuple((arg.primitive_type.name, None if arg.pointing_type is None else arg.pointing_type.name) for arg in ins.arguments),
+                    None if ins.semantics is None else ins.semantics.value
+                )
+                for ins in env.instructions.values()
+            )
+        )
+
+    @staticmethod
+    def __restoreEnvironment(record: tuple, primitives: Callable[[str], Optional[PrimitiveType]]) -> Environment:
+        parent, name, (profile_parent, profile_name, max_program_length, pointer_program, pointer_heap, instruction_index, stack_size), variable, instructions = record
+
+        profile = Profile(
+            parent=profile_parent,
+            name=profile_name,
+            max_program_length=max_program_length,
+            pointer_program=primitives(pointer_program),
+            pointer_heap=primitives(pointer_heap),
+            instruction_index=primitives(instruction_index),
+            stack_size=stack_size
+        )
+
+        return Environment(
+            parent=parent,
+            name=name,
+            profile=profile,
+            opcodes=OpcodeEncoding(index=profile.instruction_index, variable=variable),
+            instructions={
+                ins_name: EnvironmentInstruction(
+                    parent=ins_parent,
+                    name=ins_name,
+                    index=index,
+                    package=package,
+                    arguments=tuple(
+                        EnvironmentInstructionArgument(
+                            primitive_type=primitives(primitive),
+                            pointing_type=None if pointing is None else primitives(pointing)
+                        )
+                        for primitive, pointing in arguments
+                    ),
+                    size=size,
+                    semantics=None if semantics is None else InstructionSemantics(semantics)
+                )
+                for ins_parent, ins_name, index, package, size, arguments, semantics in instructions
+            }
+        )
+
+
+class _ResultPickler(pickle.Pickler):
+    """Примитивные типы сохраняются по имени: упаковщик struct не сериализуется, а при загрузке нужны актуальные объекты реестра"""
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        if isinstance(obj, PrimitiveType):
+            return obj.name
+
+        return None
+
+
+class _ResultUnpickler(pickle.Unpickler):
+
+    def __init__(self, file: io.BytesIO, primitives: Callable[[str], Optional[PrimitiveType]]) -> None:
+        super().__init__(file)
+        self.__primitives = primitives
+
+    def persistent_load(self, pid: str) -> PrimitiveType:
+        if (ret := self.__primitives(pid)) is None:
+            raise pickle.UnpicklingError(f"Unknown primitive '{pid}'")
+
+        return ret
+
+
+class CompileCache:
+    """
+    Кэш результатов компиляции в каталоге. Ключ записи - хеш исходника, настроек компиляции и версии компилятора.
+    Запись действительна, пока не изменились подпись окружения программы и примитивные типы.
+    Каждая запись - отдельный подкаталог (параллельные процессы не мешают друг другу).
+    При превышении размера вытесняются давно не использованные записи
+    """
+
+    VERSION: ClassVar[int] = 1
+    """Версия формата записей"""
+    DEFAULT_FOLDERNAME: ClassVar[str] = ".bytelang_build"
+    """Имя каталога кэша в папке данных по умолчанию"""
+    DEFAULT_SIZE_LIMIT: ClassVar[int] = 256 * 1024 * 1024
+    """Размер кэша по умолчанию (байт)"""
+
+    __PROGRAM: ClassVar[str] = "program.blc"
+    __ENTRY: ClassVar[str] = "entry.pickle"
+
+    def __init__(self, folder: PathLike | str, size_limit: int = DEFAULT_SIZE_LIMIT) -> None:
+        self.__folder = Path(folder)
+        self.__size_limit = size_limit
+
+    def getFolder(self) -> Path:
+        return self.__folder
+
+    def clear(self) -> None:
+        """Удалить все записи"""
+        shutil.rmtree(self.__folder, ignore_errors=True)
+
+    @classmethod
+    def key(cls, source: bytes, settings: Iterable[object]) -> str:
+        """Ключ записи: хеш содержимого исходника и настроек компиляции (включая версию компилятора)"""
+        h = blake2b(source, digest_size=20)
+        h.update(repr((cls.VERSION, *settings)).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def primitivesDigest(primitives: Iterable[PrimitiveType]) -> bytes:
+        """Хеш определений примитивных типов (от них зависят размеры переменных и запись значений)"""
+        return blake2b(repr(sorted((p.name, p.size, p.write_type.name) for p in primitives)).encode(), digest_size=16).digest()
+
+    def restore(
+            self,
+            key: str,
+            bytecode_filepath: PathLike | str,
+            signature: Callable[[str], Optional[bytes]],
+            primitives_digest: bytes,
+            primitives: Callable[[str], Optional[PrimitiveType]]
+    ) -> Any:
+        """
+        Восстановить байткод записи копией в bytecode_filepath
+        :param signature: актуальная подпись окружения по имени (None - окружение не найдено)
+        :param primitives: актуальные примитивные типы по имени
+        :return: сохранённый результат компиляции или None, если записи нет или она устарела
+        """
+        entry_folder = self.__folder / key
+
+        try:
+            with open(entry_folder / self.__ENTRY, "rb") as f:
+                env_name, env_signature, entry_primitives, program_digest, result = pickle.load(f)
+
+            if entry_primitives != primitives_digest or signature(env_name) != env_signature:
+                return
+
+            program = entry_folder / self.__PROGRAM
+
+            if self.__hash(str(program)) != program_digest:
+                # Байткод записи повреждён - запись больше не действительна
+                shutil.rmtree(entry_folder, ignore_errors=True)
+                return
+
+            ret = _ResultUnpickler(io.BytesIO(result), primitives).load()
+            self.__copy(program, Path(bytecode_filepath))
+            os.utime(entry_folder)
+            return ret
+
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+            return
+
+    def put(self, key: str, env_name: str, env_signature: bytes, primitives_digest: bytes, bytecode_filepath: PathLike | str, result: Any) -> None:
+        """Сохранить байткод из bytecode_filepath и результат компиляции, затем вытеснить записи сверх размера кэша"""
+        result_buffer = io.BytesIO()
+        _ResultPickler(result_buffer, pickle.HIGHEST_PROTOCOL).dump(result)
+
+        self.__folder.mkdir(parents=True, exist_ok=True)
+        temp = self.__folder / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(temp, ignore_errors=True)
+        temp.mkdir()
+
+        try:
+            shutil.copyfile(bytecode_filepath, temp / self.__PROGRAM)
+
+            with open(temp / self.__ENTRY, "wb") as f:
+                entry: _CompileEntry = env_name, env_signature, primitives_digest, self.__hash(str(temp / self.__PROGRAM)), result_buffer.getvalue()
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+
+            # Устаревшая запись с тем же ключом заменяется
+            shutil.rmtree(self.__folder / key, ignore_errors=True)
+            os.replace(temp, self.__folder / key)
+
+        except OSError:
+            # Запись с этим ключом одновременно добавлена другим процессом
+            shutil.rmtree(temp, ignore_errors=True)
+            return
+
+        self.__evict(key)
+
+    def __evict(self, keep: str) -> None:
+        """Удалять давно не использованные записи, пока размер кэша превышает предел"""
+        entries = list[tuple[int, int, Path]]()
+
+        for entry_folder in self.__folder.iterdir():
+            if entry_folder.name.startswith("."):
+                continue
+
+            try:
+                entries.append((
+                    entry_folder.stat().st_mtime_ns,
+                    sum(f.stat().st_size for f in entry_folder.iterdir()),
+                    entry_folder
+                ))
+
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, entry_folder in sorted(entries, key=lambda e: e[0]):
+            if total <= self.__size_limit:
+                break
+
+            if entry_folder.name != keep:
+                shutil.rmtree(entry_folder, ignore_errors=True)
+                total -= size
+
+    @staticmethod
+    def __copy(source: Path, destination: Path) -> None:
+        """
+        Копия, а не жёсткая ссылка: файлы байткода перезаписываются на месте,
+        и запись через один выход изменила бы запись кэша и все восстановленные из неё файлы.
+        Копия заменяет файл целиком, не изменяя прежний файл по этому пути
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp = destination.with_name(f"{destination.name}.{os.getpid()}.tmp")
+        shutil.copyfile(source, temp)
+        os.replace(temp, destination)
+
+    @staticmethod
+    def __hash(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return blake2b(f.read(), digest_size=16).digest()
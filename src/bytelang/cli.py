@@ -0,0 +1,122 @@
+"""Интерфейс командной строки ByteLang"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from argparse import Namespace
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+from typing import Sequence
+
+from bytelang.batch import BatchExecutor
+from bytelang.batch import BatchSettings
+from bytelang.build import BuildExecutor
+from bytelang.build import BuildResult
+from bytelang.build import BuildSettings
+from bytelang.caches import CompileCache
+from bytelang.caches import RegistryCache
+from bytelang.layout import HeapLayout
+from bytelang.processors import LogFlag
+from bytelang.tools import FileTool
+from bytelang.tools import ReprTool
+
+
+def _commandBatch(args: Namespace) -> int:
+    """Исполнить набор программ байткода в пуле процессов"""
+    files = FileTool.collect(args.paths, "blc")
+    settings = BatchSettings(
+        data_folder=args.data,
+        environment=args.env,
+        instructions_module=args.instructions or f"generated.{args.env}",
+        instruction_limit=args.limit,
+        cache_filepath=None if args.no_cache else args.cache or str(Path(args.data) / RegistryCache.DEFAULT_FILENAME)
+    )
+    failed = 0
+
+    for result in BatchExecutor(settings, args.jobs).run(files):
+        print(result)
+
+        if args.output and result.output:
+            print(result.output, end="")
+
+        failed += result.error is not None
+
+    print(f"Исполнено программ: {len(files)}, с ошибками: {failed}")
+    return int(failed > 0)
+
+
+def _commandBuild(args: Namespace) -> int:
+    """Скомпилировать набор исходных файлов в пуле процессов"""
+    files = FileTool.collect(args.paths, "bls")
+    settings = BuildSettings(
+        data_folder=args.data,
+        cache_filepath=None if args.no_cache else args.cache or str(Path(args.data) / RegistryCache.DEFAULT_FILENAME),
+        compile_cache_folder=None if args.no_build_cache else args.build_cache or str(Path(args.data) / CompileCache.DEFAULT_FOLDERNAME),
+        listing_flags=None if args.listing is None else _parseLogFlags(args.listing),
+        optimize=args.optimize,
+        layout=HeapLayout[args.layout.upper()],
+        container=args.container
+    )
+    begin = perf_counter()
+    failed = list[BuildResult]()
+
+    for result in BuildExecutor(settings, args.jobs).run(BuildExecutor.outputs(files, args.output)):
+        print(result)
+
+        if not result.success():
+            failed.append(result)
+
+    for result in sorted(failed, key=lambda r: r.source_filepath):
+        print(ReprTool.headed(result.source_filepath, result.errors))
+
+    print(f"Скомпилировано файлов: {len(files) - len(failed)}, с ошибками: {len(failed)}, за {perf_counter() - begin:.3f} s")
+    return int(len(failed) > 0)
+
+
+def _parseLogFlags(names: str) -> LogFlag:
+    ret = LogFlag(0)
+
+    for name in names.split(","):
+        ret |= LogFlag[name.strip().upper()]
+
+    return ret
+
+
+def _createParser() -> ArgumentParser:
+    parser = ArgumentParser(prog="bytelang", description="ByteLang")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help=_commandBatch.__doc__)
+    batch.add_argument("paths", nargs="+", help="файлы .blc, каталоги или glob-шаблоны")
+    batch.add_argument("--env", required=True, help="окружение, для которого скомпилированы программы")
+    batch.add_argument("--data", default="data", help="папка данных ByteLang")
+    batch.add_argument("--instructions", help="модуль со сгенерированным INSTRUCTIONS (по умолчанию generated.<env>)")
+    batch.add_argument("-j", "--jobs", type=int, default=None, help="количество процессов")
+    batch.add_argument("--limit", type=int, default=None, help="ограничение количества инструкций на программу")
+    batch.add_argument("--output", action="store_true", help="выводить перехваченный вывод программ")
+    batch.add_argument("--cache", help=f"файл кэша окружений (по умолчанию <data>/{RegistryCache.DEFAULT_FILENAME})")
+    batch.add_argument("--no-cache", action="store_true", help="не использовать кэш окружений")
+    batch.set_defaults(handler=_commandBatch)
+
+    build = commands.add_parser("build", help=_commandBuild.__doc__)
+    build.add_argument("paths", nargs="+", help="файлы .bls, каталоги или glob-шаблоны")
+    build.add_argument("--data", default="data", help="папка данных ByteLang")
+    build.add_argument("-o", "--output", help="папка байт-кода (по умолчанию рядом с исходниками)")
+    build.add_argument("-j", "--jobs", type=int, default=None, help="количество процессов")
+    build.add_argument("--listing", nargs="?", const="ALL", help="записать листинг <файл>.blc.txt (флаги LogFlag через запятую, по умолчанию ALL)")
+    build.add_argument("--optimize", action="store_true", help="локальная оптимизация промежуточного кода")
+    build.add_argument("--layout", choices=[layout.name.lower() for layout in HeapLayout], default=HeapLayout.DECLARATION.name.lower(), help="размещение переменных в heap")
+    build.add_argument("--container", action="store_true", help="записать байт-код в самоописывающий контейнер")
+    build.add_argument("--cache", help=f"файл кэша окружений (по умолчанию <data>/{RegistryCache.DEFAULT_FILENAME})")
+    build.add_argument("--no-cache", action="store_true", help="не использовать кэш окружений")
+    build.add_argument("--build-cache", help=f"каталог кэша результатов компиляции (по умолчанию <data>/{CompileCache.DEFAULT_FOLDERNAME})")
+    build.add_argument("--no-build-cache", action="store_true", help="компилировать все файлы заново")
+    build.set_defaults(handler=_commandBuild)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _createParser().parse_args(argv)
+    return args.handler(args)
@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import struct
 from dataclasses import dataclass
+from typing import BinaryIO
 from typing import Callable
+from typing import ClassVar
 from typing import Iterable
+from typing import Iterator
 from typing import Optional
 
 from bytelang.content import Environment
 from bytelang.content import EnvironmentInstruction
 from bytelang.content import EnvironmentInstructionArgument
+from bytelang.content import OpcodeEncoding
 from bytelang.content import PrimitiveType
 from bytelang.content import PrimitiveWriteType
+from bytelang.errors import ExpressionError
 from bytelang.handlers import BasicErrorHandler
 from bytelang.registries import EnvironmentsRegistry
 from bytelang.registries import PrimitivesRegistry
@@ -18,6 +23,7 @@ from bytelang.statement import ArgumentValueType
 from bytelang.statement import Statement
 from bytelang.statement import StatementType
 from bytelang.statement import UniversalArgument
+from bytelang.symbols import SymbolTable
 from bytelang.tools import Filter
 from bytelang.tools import ReprTool
 
@@ -32,9 +38,11 @@ class CodeInstruction:
     """Запакованные аргументы"""
     address: int
     """адрес расположения инструкции"""
+    references: tuple[Optional[UniversalArgument], ...] = ()
+    """Исходные аргументы, значение которых зависит от адресов меток (None для остальных)"""
 
-    def write(self, instruction_index: PrimitiveType) -> bytes:
-        return instruction_index.write(self.instruction.index) + b"".join(self.arguments)
+    def write(self, opcodes: OpcodeEncoding) -> bytes:
+        return opcodes.write(self.instruction.index) + b"".join(self.arguments)
 
     def __repr__(self) -> str:
         args_s = ReprTool.iter((
@@ -76,6 +84,8 @@ class Variable:
     """Примитивный тип"""
     value: bytes
     """Значение"""
+    reference: Optional[UniversalArgument] = None
+    """Исходное значение, если оно зависит от адресов меток или переменных"""
 
     def write(self) -> bytes:
         return self.value
@@ -90,7 +100,8 @@ class ProgramData:
     start_address: int
     variables: tuple[Variable, ...]
     constants: dict[str, UniversalArgument]
-    marks: dict[int, str]
+    marks: dict[int, tuple[str, ...]]
+    """Адрес -> имена меток с этим адресом в порядке объявления"""
 
 
 class CodeGenerator:
@@ -102,13 +113,16 @@ class CodeGenerator:
         self.__primitives = primitives
 
         self.__env: Optional[Environment] = None
-        self.__constants = dict[str, UniversalArgument]()
-        self.__marks_address = dict[int, str]()
+        self.__symbols = SymbolTable(primitives.get)
+        self.__marks_address = dict[int, tuple[str, ...]]()
         self.__variables = dict[str, Variable]()
 
         self.__mark_offset_isolated: int = 0
         self.__variable_offset: Optional[int] = None
 
+        self.__streaming: bool = False
+        self.__code_started: bool = False
+
         __DIRECTIVE_ARG_ANY = DirectiveArgument("constant value or identifier", ArgumentValueType.ANY)
 
         self.__DIRECTIVES: dict[str, Directive] = {
@@ -137,33 +151,43 @@ class CodeGenerator:
             self.__err.writeStatement(statement, f"Invalid arg count. Need {need} (got {got})")
 
     def __checkNameAvailable(self, statement: Statement, name: str) -> None:
-        if name in self.__constants.keys() or name in self.__env.instructions.keys():
+        if name in self.__symbols or name in self.__env.instructions.keys():
             self.__err.writeStatement(statement, f"Идентификатор {name} уже используется")
 
-    def __checkNameExist(self, statement: Statement, identifier: str) -> None:
-        if identifier not in self.__constants.keys():
-            self.__err.writeStatement(statement, f"Идентификатор {identifier} не определён")
+    def __checkNamesExist(self, statement: Statement, argument: UniversalArgument) -> None:
+        for identifier in self.__symbols.names(argument):
+            if identifier not in self.__symbols:
+                self.__err.writeStatement(statement, f"Идентификатор {identifier} не определён")
+
+    def __evaluate(self, statement: Statement, argument: UniversalArgument) -> Optional[UniversalArgument]:
+        try:
+            return self.__symbols.evaluate(argument)
+
+        except ExpressionError as e:
+            self.__err.writeStatement(statement, f"Не удалось вычислить выражение {argument}: {e}")
 
-    def __addConstant(self, statement: Statement, name: str, value: UniversalArgument) -> None:
+    def __addConstant(self, statement: Statement, name: str, value: UniversalArgument, *, address: bool = False) -> None:
         self.__err.begin()
         self.__checkNameAvailable(statement, name)
-
-        if value.identifier is not None:
-            self.__checkNameExist(statement, value.identifier)
+        self.__checkNamesExist(statement, value)
 
         if self.__err.failed():
             return
 
-        self.__constants[name] = value
+        try:
+            self.__symbols.define(name, value, address=address)
+
+        except ExpressionError as e:
+            self.__err.writeStatement(statement, f"Не удалось вычислить выражение {value}: {e}")
 
     def __writeArgumentFromPrimitive(self, statement: Statement, argument: UniversalArgument, primitive: PrimitiveType) -> Optional[bytes]:
-        if argument.identifier:
-            self.__checkNameExist(statement, argument.identifier)
+        self.__checkNamesExist(statement, argument)
 
-            if self.__err.failed():
-                return
+        if self.__err.failed():
+            return
 
-            return self.__writeArgumentFromPrimitive(statement, self.__constants[argument.identifier], primitive)
+        if (argument := self.__evaluate(statement, argument)) is None:
+            return
 
         v = argument.exponent if primitive.write_type == PrimitiveWriteType.exponent else argument.integer
 
@@ -173,13 +197,37 @@ class CodeGenerator:
         except Exception as e:
             self.__err.writeStatement(statement, f"Не удалось выполнить преобразование: {e}")
 
+    def __reference(self, argument: UniversalArgument) -> Optional[UniversalArgument]:
+        """Аргумент, если его значение зависит от адреса метки или переменной"""
+        if self.__symbols.dependsOnAddress(argument):
+            return argument
+
+    def __pointedVariable(self, argument: UniversalArgument) -> tuple[Optional[Variable], int]:
+        """Переменная, на которую указывает аргумент, и смещение внутри неё"""
+        if argument.expression is None:
+            return self.__variables.get(argument.identifier), 0
+
+        try:
+            address = self.__symbols.evaluate(argument).integer
+
+        except ExpressionError:
+            return None, 0
+
+        for var in self.__variables.values():
+            if var.address <= address < var.address + var.primitive.size:
+                return var, address - var.address
+
+        return None, 0
+
     def __writeArgumentFromInstructionArg(self, statement: Statement, i: int, u_arg: UniversalArgument, i_arg: EnvironmentInstructionArgument) -> Optional[bytes]:
         if i_arg.pointing_type:
-            if (var := self.__variables.get(u_arg.identifier)) is None:
+            var, offset = self.__pointedVariable(u_arg)
+
+            if var is None:
                 self.__err.writeStatement(statement, f"Аргумент ({i}) Обращение по указателю ({i_arg}) с помощью сырого значения недопустимо")
                 return
 
-            if var.primitive.size < i_arg.pointing_type.size:
+            if var.primitive.size - offset < i_arg.pointing_type.size:
                 self.__err.writeStatement(
                     statement,
                     f"Аргумент ({i}): Размер переменной {var} меньше размера указателя примитивного типа аргумента {i_arg}. Передача значения будет с ошибками"
@@ -216,25 +264,27 @@ class CodeGenerator:
             self.__err.writeStatement(statement, f"Unknown primitive type: {primitive}")
 
         self.__checkNameAvailable(statement, name)
-
-        if init_value.identifier:
-            self.__checkNameExist(statement, init_value.identifier)
+        self.__checkNamesExist(statement, init_value)
 
         if self.__variable_offset is None:
             self.__err.writeStatement(statement, "variable offset index undefined. Must select env")
 
+        if self.__streaming and self.__code_started:
+            self.__err.writeStatement(statement, "В потоковом режиме переменные должны быть объявлены до меток и инструкций")
+
         arg_value = self.__writeArgumentFromPrimitive(statement, init_value, primitive)
 
         if self.__err.failed():
             return
 
-        self.__addConstant(statement, name, UniversalArgument.fromInteger(self.__variable_offset))
+        self.__addConstant(statement, name, UniversalArgument.fromInteger(self.__variable_offset), address=True)
 
         self.__variables[name] = Variable(
             address=self.__variable_offset,
             identifier=name,
             primitive=primitive,
-            value=arg_value
+            value=arg_value,
+            reference=self.__reference(init_value)
         )
 
         self.__variable_offset += primitive.size
@@ -263,11 +313,13 @@ class CodeGenerator:
         return self.__variable_offset + self.__mark_offset_isolated
 
     def __processMark(self, statement: Statement) -> None:
+        self.__code_started = True
         mark_offset = self.__getMarkOffset()
-        self.__marks_address[mark_offset] = statement.head
-        self.__addConstant(statement, statement.head, UniversalArgument.fromInteger(mark_offset))
+        self.__marks_address[mark_offset] = (*self.__marks_address.get(mark_offset, ()), statement.head)
+        self.__addConstant(statement, statement.head, UniversalArgument.fromInteger(mark_offset), address=True)
 
     def __processInstruction(self, statement: Statement) -> Optional[CodeInstruction]:
+        self.__code_started = True
         self.__err.begin()
 
         if self.__env is None:
@@ -294,25 +346,39 @@ class CodeGenerator:
         if self.__err.failed():
             return
 
-        ret = CodeInstruction(instruction=instruction, arguments=code_ins_args, address=self.__getMarkOffset())
+        ret = CodeInstruction(
+            instruction=instruction,
+            arguments=code_ins_args,
+            address=self.__getMarkOffset(),
+            references=tuple(map(self.__reference, statement.arguments))
+        )
         self.__mark_offset_isolated += instruction.size
         return ret
 
     def __reset(self) -> None:
-        self.__constants.clear()
+        self.__symbols.clear()
         self.__variables.clear()
         self.__marks_address.clear()
         self.__mark_offset_isolated = 0
         self.__variable_offset = None
         self.__env = None
+        self.__code_started = False
 
     def run(self, statements: Iterable[Statement]) -> tuple[tuple[CodeInstruction, ...], Optional[ProgramData]]:
         self.__reset()
+        self.__streaming = False
         return (
             tuple(Filter.notNone(self.__METHOD_BY_TYPE[s.type](s) for s in statements)),
             self.getProgramData()
         )
 
+    def stream(self, statements: Iterable[Statement]) -> Iterator[CodeInstruction]:
+        """Потоковая генерация: инструкции выдаются по мере обработки выражений.
+        Область переменных фиксируется с первой метки или инструкции, данные программы доступны через getProgramData"""
+        self.__reset()
+        self.__streaming = True
+        return Filter.notNone(self.__METHOD_BY_TYPE[s.type](s) for s in statements)
+
     # noinspection PyTypeChecker
     def getProgramData(self) -> Optional[ProgramData]:
         if self.__env is not None:
@@ -320,7 +386,7 @@ class CodeGenerator:
                 environment=self.__env,
                 start_address=self.__variable_offset,
                 variables=tuple(self.__variables.values()),
-                constants=self.__constants,
+                constants=self.__symbols.getDefinitions(),
                 marks=self.__marks_address
             )
 
@@ -328,10 +394,88 @@ class CodeGenerator:
 
 
 class ByteCodeGenerator:
+    STREAM_CHUNK_SIZE: ClassVar[int] = 0x10000
+    """Размер буфера инструкций перед записью в поток"""
 
     def __init__(self, error_handler: BasicErrorHandler) -> None:
         self.__err = error_handler.getChild(self.__class__.__name__)
 
+    def __checkProgramSize(self, data: ProgramData, size: int) -> bool:
+        max_length = data.environment.profile.max_program_length
+
+        if max_length is not None and max_length < size:
+            self.__err.write(f"program size ({size}) out of {max_length}")
+            return False
+
+        return True
+
+    @staticmethod
+    def __writeVariables(output: bytearray, data: ProgramData) -> None:
+        """Записать переменные по их адресам, промежутки выравнивания заполняются нулями"""
+        for v in data.variables:
+            output.extend(bytes(v.address - len(output)))
+            output.extend(v.value)
+
+        output.extend(bytes(data.start_address - len(output)))
+
+    def __writeHeap(self, stream: BinaryIO, data: ProgramData) -> int:
+        heap = bytearray(data.environment.profile.pointer_heap.size)
+        self.__writeVariables(heap, data)
+        stream.write(heap)
+        return data.start_address
+
+    def stream(self, stream: BinaryIO, instructions: Iterable[CodeInstruction], data_provider: Callable[[], Optional[ProgramData]]) -> Optional[int]:
+        """Записывать байт-код в поток (с текущей позиции) по мере поступления инструкций. Заголовок heap дописывается в конце.
+        Вернёт размер программы или None, если запись прервана"""
+        data: Optional[ProgramData] = None
+        chunk = bytearray()
+        start = stream.tell()
+        size = 0
+
+        for ins in instructions:
+            if data is None:
+                if (data := data_provider()) is None:
+                    self.__err.write("Program data is None")
+                    return
+
+                size = self.__writeHeap(stream, data)
+
+            chunk.extend(ins.write(data.environment.opcodes))
+
+            if not self.__checkProgramSize(data, size + len(chunk)):
+                return
+
+            if len(chunk) >= self.STREAM_CHUNK_SIZE:
+                stream.write(chunk)
+                size += len(chunk)
+                chunk.clear()
+
+        last = data_provider()
+
+        if last is None:
+            self.__err.write("Program data is None")
+            return
+
+        if data is None:
+            size = self.__writeHeap(stream, data := last)
+
+        if not self.__checkProgramSize(data, size := size + len(chunk)):
+            return
+
+        stream.write(chunk)
+
+        try:
+            program_start_data = data.environment.profile.pointer_heap.write(data.start_address)
+
+        except struct.error as e:
+            self.__err.write(f"Область Heap вне допустимого размера: {e}")
+            return
+
+        stream.seek(start)
+        stream.write(program_start_data)
+        stream.seek(start + size)
+        return size
+
     def run(self, instructions: Iterable[CodeInstruction], data: Optional[ProgramData]) -> Optional[bytes]:
         if data is None:
             self.__err.write("Program data is None")
@@ -348,15 +492,12 @@ class ByteCodeGenerator:
             return
 
         ret.extend(program_start_data)
-
-        for v in data.variables:
-            ret.extend(v.value)
+        self.__writeVariables(ret, data)
 
         for ins in instructions:
-            ret.extend(ins.write(profile.instruction_index))
+            ret.extend(ins.write(data.environment.opcodes))
 
-        if profile.max_program_length is not None and profile.max_program_length < len(ret):
-            self.__err.write(f"program size ({len(ret)}) out of {profile.max_program_length}")
+        if not self.__checkProgramSize(data, len(ret)):
             return
 
         return bytes(ret)
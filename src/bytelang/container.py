@@ -0,0 +1,313 @@
+"""Самоописывающий контейнер байткода"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from dataclasses import dataclass
+from hashlib import blake2b
+from os import PathLike
+from struct import Struct
+from typing import BinaryIO
+from typing import ClassVar
+from typing import Final
+from typing import Iterable
+from typing import Optional
+
+from bytelang.content import Environment
+from bytelang.content import EnvironmentInstruction
+from bytelang.content import OpcodeEncoding
+from bytelang.content import PackageInstruction
+from bytelang.content import PackageInstructionArgument
+from bytelang.content import PrimitiveType
+from bytelang.content import Profile
+from bytelang.errors import ContainerError
+from bytelang.registries import PrimitivesRegistry
+
+
+@dataclass(frozen=True, kw_only=True)
+class ContainerHeader:
+    """Заголовок контейнера"""
+
+    version: int
+    """Версия формата"""
+    variable_opcodes: bool
+    """Индексы инструкций переменной длины"""
+    pointer_program: int
+    """Размер указателя программы"""
+    pointer_heap: int
+    """Размер указателя кучи"""
+    instruction_index: int
+    """Размер индекса инструкции"""
+    stack_size: int
+    """Размер стека"""
+    max_program_length: Optional[int]
+    """Максимальный размер программы. None, если неограничен"""
+    signature: bytes
+    """Подпись окружения (ProgramContainer.signature)"""
+    payload_offset: int
+    """Смещение байткода программы"""
+    payload_size: int
+    """Размер байткода программы"""
+    table_offset: int
+    """Смещение таблицы окружения"""
+    table_size: int
+    """Размер таблицы окружения"""
+    checksum: int
+    """CRC32 байткода и таблицы"""
+
+
+class _TableWriter:
+    __LENGTH: ClassVar[Struct] = Struct("<H")
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def integer(self, value: int) -> _TableWriter:
+        self.buffer.extend(self.__LENGTH.pack(value))
+        return self
+
+    def string(self, value: str) -> _TableWriter:
+        encoded = value.encode()
+        self.integer(len(encoded)).buffer.extend(encoded)
+        return self
+
+
+class _TableReader:
+    __LENGTH: ClassVar[Struct] = Struct("<H")
+
+    def __init__(self, buffer: bytes | memoryview) -> None:
+        self.__buffer = buffer
+        self.__position = 0
+
+    def integer(self) -> int:
+        ret = self.__LENGTH.unpack_from(self.__buffer, self.__position)[0]
+        self.__position += self.__LENGTH.size
+        return ret
+
+    def string(self) -> str:
+        size = self.integer()
+        ret = bytes(self.__buffer[self.__position:self.__position + size])
+
+        if len(ret) != size:
+            raise ContainerError("Truncated environment table")
+
+        self.__position += size
+        return ret.decode()
+
+
+class ProgramContainer:
+    """
+    Формат файла blc: заголовок, байткод программы (в прежнем виде, с выравниванием для отображения в память)
+    и таблица окружения: примитивные типы, профиль и инструкции в порядке индексов с их аргументами.
+    Программу можно проверить и исполнить без реестров
+    """
+
+    MAGIC: Final[ClassVar[bytes]] = b"\x89BLC"
+    """Сигнатура файла"""
+    VERSION: Final[ClassVar[int]] = 1
+    """Версия формата"""
+    PAYLOAD_ALIGNMENT: Final[ClassVar[int]] = 64
+    """Выравнивание смещения байткода"""
+
+    __HEADER: ClassVar[Struct] = Struct("<4sHHBBBxII16sIIIII")
+    __FLAG_VARIABLE_OPCODES: ClassVar[int] = 1
+    __NO_LIMIT: ClassVar[int] = 0xFFFF_FFFF
+    __CHUNK_SIZE: ClassVar[int] = 0x10000
+
+    PAYLOAD_OFFSET: Final[ClassVar[int]] = -__HEADER.size % PAYLOAD_ALIGNMENT + __HEADER.size
+    """Смещение байткода программы"""
+
+    @classmethod
+    def signature(cls, env: Environment) -> bytes:
+        """Подпись окружения: всё, от чего зависит декодирование программы (профиль, индексы и аргументы инструкций)"""
+        table = cls.__writeProfile(_TableWriter(), env)
+        cls.__writeInstructions(table, env)
+        return blake2b(table.buffer, digest_size=16).digest()
+
+    @classmethod
+    def isContainer(cls, buffer: bytes | memoryview) -> bool:
+        return bytes(buffer[:len(cls.MAGIC)]) == cls.MAGIC
+
+    @classmethod
+    def pack(cls, env: Environment, primitives: Iterable[PrimitiveType], program: bytes) -> bytes:
+        """Упаковать байткод программы в контейнер"""
+        table = cls.__writeTable(env, primitives)
+        header = cls.__writeHeader(env, len(program), table, zlib.crc32(table, zlib.crc32(program)))
+        return header + program + table
+
+    @classmethod
+    def finishStream(cls, stream: BinaryIO, start: int, env: Environment, primitives: Iterable[PrimitiveType], payload_size: int) -> None:
+        """
+        Завершить контейнер, байткод которого уже записан в поток с адреса start + PAYLOAD_OFFSET:
+        дописать таблицу и заголовок. Поток должен быть открыт на чтение и запись
+        """
+        table = cls.__writeTable(env, primitives)
+        checksum = 0
+        stream.seek(start + cls.PAYLOAD_OFFSET)
+        remaining = payload_size
+
+        while remaining > 0:
+            chunk = stream.read(min(remaining, cls.__CHUNK_SIZE))
+
+            if not chunk:
+                raise ContainerError(f"Program payload is truncated ({payload_size - remaining} of {payload_size} bytes)")
+
+            checksum = zlib.crc32(chunk, checksum)
+            remaining -= len(chunk)
+
+        stream.write(table)
+        stream.seek(start)
+        stream.write(cls.__writeHeader(env, payload_size, table, zlib.crc32(table, checksum)))
+        stream.seek(start + cls.PAYLOAD_OFFSET + payload_size + len(table))
+
+    @classmethod
+    def readHeader(cls, buffer: bytes | memoryview) -> ContainerHeader:
+        if len(buffer) < cls.__HEADER.size or not cls.isContainer(buffer):
+            raise ContainerError("Not a ByteLang container")
+
+        (
+            _, version, flags,
+            pointer_program, pointer_heap, instruction_index,
+            stack_size, max_program_length, signature,
+            payload_offset, payload_size, table_offset, table_size, checksum
+        ) = cls.__HEADER.unpack_from(buffer)
+
+        if version != cls.VERSION:
+            raise ContainerError(f"Unsupported container version {version} (expected {cls.VERSION})")
+
+        if max(payload_offset + payload_size, table_offset + table_size) > len(buffer):
+            raise ContainerError(f"Container sections out of file (size {len(buffer)})")
+
+        return ContainerHeader(
+            version=version,
+            variable_opcodes=bool(flags & cls.__FLAG_VARIABLE_OPCODES),
+            pointer_program=pointer_program,
+            pointer_heap=pointer_heap,
+            instruction_index=instruction_index,
+            stack_size=stack_size,
+            max_program_length=None if max_program_length == cls.__NO_LIMIT else max_program_length,
+            signature=signature,
+            payload_offset=payload_offset,
+            payload_size=payload_size,
+            table_offset=table_offset,
+            table_size=table_size,
+            checksum=checksum
+        )
+
+    @classmethod
+    def verifyChecksum(cls, buffer: bytes | memoryview, header: ContainerHeader) -> None:
+        checksum = zlib.crc32(cls.payload(buffer, header))
+        checksum = zlib.crc32(buffer[header.table_offset:header.table_offset + header.table_size], checksum)
+
+        if checksum != header.checksum:
+            raise ContainerError(f"Container checksum mismatch ({checksum:08X} != {header.checksum:08X})")
+
+    @staticmethod
+    def payload(buffer: bytes | memoryview, header: ContainerHeader) -> bytes | memoryview:
+        """Байткод программы (Для memoryview - без копирования)"""
+        return buffer[header.payload_offset:header.payload_offset + header.payload_size]
+
+    @classmethod
+    def readEnvironment(cls, buffer: bytes | memoryview, source: PathLike | str = "<container>") -> tuple[Environment, PrimitivesRegistry]:
+        """
+        Восстановить окружение и примитивные типы из таблицы контейнера
+        :param source: имя источника для родительского контента
+        """
+        header = cls.readHeader(buffer)
+        cls.verifyChecksum(buffer, header)
+        table = _TableReader(buffer[header.table_offset:header.table_offset + header.table_size])
+
+        try:
+            primitives = PrimitivesRegistry()
+            primitives.setRaw(table.string(), {
+                table.string(): {"size": table.integer(), "type": table.string()}
+                for _ in range(table.integer())
+            })
+
+            env_name = table.string()
+            profile = Profile(
+                parent=str(source),
+                name=table.string(),
+                max_program_length=header.max_program_length,
+                pointer_program=primitives.getBySize(header.pointer_program),
+                pointer_heap=primitives.getBySize(header.pointer_heap),
+                instruction_index=primitives.getBySize(header.instruction_index),
+                stack_size=header.stack_size
+            )
+            opcodes = OpcodeEncoding(index=profile.instruction_index, variable=header.variable_opcodes)
+            instructions = dict[str, EnvironmentInstruction]()
+
+            for index in range(table.integer()):
+                name, package = table.string(), table.string()
+                arguments = tuple(
+                    PackageInstructionArgument(primitive=cls.__primitive(primitives, table.string()), is_pointer=bool(table.integer()))
+                    for _ in range(table.integer())
+                )
+                instructions[name] = PackageInstruction(parent=package, name=name, arguments=arguments).transform(index, profile, opcodes)
+
+        except (KeyError, ValueError, UnicodeDecodeError, struct.error) as e:
+            raise ContainerError(f"Invalid environment table: {e}") from e
+
+        env = Environment(parent=str(source), name=env_name, profile=profile, opcodes=opcodes, instructions=instructions)
+
+        if cls.signature(env) != header.signature:
+            raise ContainerError("Environment table does not match the container signature")
+
+        return env, primitives
+
+    @staticmethod
+    def __primitive(primitives: PrimitivesRegistry, name: str) -> PrimitiveType:
+        if (ret := primitives.get(name)) is None:
+            raise ContainerError(f"Unknown primitive '{name}' in environment table")
+
+        return ret
+
+    @classmethod
+    def __writeHeader(cls, env: Environment, payload_size: int, table: bytes, checksum: int) -> bytes:
+        profile = env.profile
+        header = cls.__HEADER.pack(
+            cls.MAGIC, cls.VERSION, cls.__FLAG_VARIABLE_OPCODES if env.opcodes.variable else 0,
+            profile.pointer_program.size, profile.pointer_heap.size, profile.instruction_index.size,
+            profile.stack_size, cls.__NO_LIMIT if profile.max_program_length is None else profile.max_program_length,
+            cls.signature(env),
+            cls.PAYLOAD_OFFSET, payload_size, cls.PAYLOAD_OFFSET + payload_size, len(table), checksum
+        )
+        return header.ljust(cls.PAYLOAD_OFFSET, b"\0")
+
+    @classmethod
+    def __writeTable(cls, env: Environment, primitives: Iterable[PrimitiveType]) -> bytes:
+        primitives = tuple(primitives)
+        table = _TableWriter().string(primitives[0].parent if primitives else "").integer(len(primitives))
+
+        for primitive in primitives:
+            table.string(primitive.name).integer(primitive.size).string(primitive.write_type.name)
+
+        table.string(env.name).string(env.profile.name)
+        return bytes(cls.__writeInstructions(table, env).buffer)
+
+    @staticmethod
+    def __writeProfile(table: _TableWriter, env: Environment) -> _TableWriter:
+        profile = env.profile
+        return (
+            table
+            .integer(profile.pointer_program.size).integer(profile.pointer_heap.size).integer(profile.instruction_index.size)
+            .string(str(profile.stack_size)).string(str(profile.max_program_length)).integer(env.opcodes.variable)
+        )
+
+    @staticmethod
+    def __writeInstructions(table: _TableWriter, env: Environment) -> _TableWriter:
+        instructions = sorted(env.instructions.values(), key=lambda i: i.index)
+        table.integer(len(instructions))
+
+        for ins in instructions:
+            table.string(ins.name).string(ins.package).integer(len(ins.arguments))
+
+            for arg in ins.arguments:
+                if arg.pointing_type is None:
+                    table.string(arg.primitive_type.name).integer(False)
+
+                else:
+                    table.string(arg.pointing_type.name).integer(True)
+
+        return table
@@ -74,6 +74,9 @@ class PrimitiveType(Content):
 class Profile(Content):
     """Профиль виртуальной машины"""
 
+    DEFAULT_STACK_SIZE: ClassVar[int] = 256
+    """Размер стека, если он не указан в профиле"""
+
     max_program_length: Optional[int]
     """Максимальный размер программы. None, если неограничен"""
     pointer_program: PrimitiveType
@@ -82,6 +85,50 @@ class Profile(Content):
     """Тип указателя кучи (Определяет максимально возможный адрес переменной"""
     instruction_index: PrimitiveType
     """Тип индекса инструкции (Определяет максимальное кол-во инструкций в профиле"""
+    stack_size: int
+    """Размер стека виртуальной машины в байтах"""
+
+
+@dataclass(frozen=True, kw_only=True)
+class OpcodeEncoding:
+    """Запись индекса инструкции в байткоде"""
+
+    ESCAPE: Final[ClassVar[int]] = 0xFF
+    """Первый байт длинной записи индекса при переменной длине"""
+
+    index: PrimitiveType
+    """Тип индекса инструкции из профиля"""
+    variable: bool
+    """Переменная длина: индекс меньше ESCAPE занимает один байт, остальные - байт ESCAPE и (индекс - ESCAPE) типа index"""
+
+    def size(self, index: int) -> int:
+        """Размер записи индекса"""
+        if not self.variable:
+            return self.index.size
+
+        return 1 if index < self.ESCAPE else 1 + self.index.size
+
+    def write(self, index: int) -> bytes:
+        if not self.variable:
+            return self.index.write(index)
+
+        if index < self.ESCAPE:
+            return bytes((index,))
+
+        return bytes((self.ESCAPE,)) + self.index.write(index - self.ESCAPE)
+
+    def read(self, buffer: bytes | bytearray | memoryview, address: int) -> tuple[int, int]:
+        """
+        Считать индекс инструкции по адресу: (индекс, адрес следующего за записью байта)
+        :raises IndexError, struct.error: запись выходит за пределы буфера
+        """
+        if not self.variable:
+            return self.index.packer.unpack_from(buffer, address)[0], address + self.index.size
+
+        if (first := buffer[address]) != self.ESCAPE:
+            return first, address + 1
+
+        return self.index.packer.unpack_from(buffer, address + 1)[0] + self.ESCAPE, address + 1 + self.index.size
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -106,6 +153,31 @@ class PackageInstructionArgument:
         return EnvironmentInstructionArgument(primitive_type=profile.pointer_heap, pointing_type=self.primitive)
 
 
+class InstructionSemantics(Enum):
+    """Действие инструкции, объявленное в окружении (поле semantics). Используется оптимизатором"""
+
+    PUSH = "push"
+    """Записать значение единственного аргумента в стек"""
+    POP = "pop"
+    """Снять значение со стека и записать по единственному аргументу-указателю"""
+    EXIT = "exit"
+    """Завершить программу"""
+
+    def check(self, instruction: EnvironmentInstruction) -> bool:
+        """Сигнатура инструкции допускает это действие"""
+        if len(instruction.arguments) != 1 and self is not InstructionSemantics.EXIT:
+            return False
+
+        match self:
+            case InstructionSemantics.PUSH:
+                return instruction.arguments[0].pointing_type is None
+
+            case InstructionSemantics.POP:
+                return instruction.arguments[0].pointing_type is not None
+
+        return True
+
+
 @dataclass(frozen=True, kw_only=True)
 class PackageInstruction(Content):
     """Базовые сведения об инструкции"""
@@ -116,19 +188,25 @@ class PackageInstruction(Content):
     def __repr__(self) -> str:
         return f"{self.parent}::{self.name}{ReprTool.iter(self.arguments)}"
 
-    def transform(self, index: int, profile: Profile) -> EnvironmentInstruction:
+    def transform(self, index: int, profile: Profile, opcodes: OpcodeEncoding, semantics: Optional[InstructionSemantics] = None) -> EnvironmentInstruction:
         """Создать инструкцию окружения на основе базовой и профиля"""
         args = tuple(arg.transform(profile) for arg in self.arguments)
-        size = profile.instruction_index.size + sum(arg.primitive_type.size for arg in args)
-        return EnvironmentInstruction(
+        size = opcodes.size(index) + sum(arg.primitive_type.size for arg in args)
+        ret = EnvironmentInstruction(
             parent=profile.name,
             name=self.name,
             index=index,
             package=self.parent,
             arguments=args,
-            size=size
+            size=size,
+            semantics=semantics
         )
 
+        if semantics is not None and not semantics.check(ret):
+            raise ValueError(f"{ret} - signature does not match semantics '{semantics.value}'")
+
+        return ret
+
 
 @dataclass(frozen=True, kw_only=True)
 class EnvironmentInstructionArgument:
@@ -165,6 +243,8 @@ class EnvironmentInstruction(Content):
     """Аргументы окружения. Если тип был указателем, примитивный тип стал соответствовать типу указателя профиля окружения"""
     size: int
     """Размер инструкции в байтах"""
+    semantics: Optional[InstructionSemantics] = None
+    """Объявленное в окружении действие. None - инструкция неизвестна оптимизатору и не изменяется им"""
 
     def generalInfo(self) -> str:
         return f"[{self.size}B] {self.package}::{self.name}@{self.index}"
@@ -190,5 +270,7 @@ class Environment(Content):
 
     profile: Profile
     """Профиль этого окружения (Настройки Виртуальной машины)"""
+    opcodes: OpcodeEncoding
+    """Запись индексов инструкций"""
     instructions: dict[str, EnvironmentInstruction]
     """Инструкции окружения"""
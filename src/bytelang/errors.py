@@ -4,3 +4,15 @@ class ByteLangError(Exception):
 
 class InterpreterError(ByteLangError):
     """Исключение интерпретатора"""
+
+
+class ExecutionLimitError(InterpreterError):
+    """Превышен лимит исполнения виртуальной машины"""
+
+
+class ExpressionError(ByteLangError):
+    """Ошибка записи или вычисления константного выражения"""
+
+
+class ContainerError(ByteLangError):
+    """Некорректный контейнер байткода"""
@@ -0,0 +1,294 @@
+"""Константные выражения: разбор и вычисление"""
+
+from __future__ import annotations
+
+import math
+import operator
+import re
+from abc import ABC
+from abc import abstractmethod
+from dataclasses import dataclass
+from typing import Callable
+from typing import ClassVar
+from typing import Final
+from typing import Iterable
+from typing import Optional
+
+from bytelang.errors import ExpressionError
+
+Number = int | float
+
+
+def _divide(a: Number, b: Number) -> Number:
+    """Деление. Для целых - с отбрасыванием дробной части (как в C)"""
+    if b == 0:
+        raise ExpressionError("Деление на ноль")
+
+    if isinstance(a, int) and isinstance(b, int):
+        q = abs(a) // abs(b)
+        return q if (a >= 0) == (b >= 0) else -q
+
+    return a / b
+
+
+def _modulo(a: Number, b: Number) -> Number:
+    """Остаток от деления, знак совпадает со знаком делимого (как в C)"""
+    if isinstance(a, int) and isinstance(b, int):
+        return a - b * _divide(a, b)
+
+    if b == 0:
+        raise ExpressionError("Деление на ноль")
+
+    return math.fmod(a, b)
+
+
+def _checkShift(b: Number) -> None:
+    if isinstance(b, int) and b > ExpressionParser.MAX_SHIFT:
+        raise ExpressionError(f"Сдвиг на {b} бит больше {ExpressionParser.MAX_SHIFT}")
+
+
+def _shiftLeft(a: Number, b: Number) -> Number:
+    _checkShift(b)
+    return a << b
+
+
+def _shiftRight(a: Number, b: Number) -> Number:
+    _checkShift(b)
+    return a >> b
+
+
+class ExpressionContext(ABC):
+    """Источник значений для вычисления выражения"""
+
+    @abstractmethod
+    def resolveNumber(self, name: str) -> Number:
+        """Значение константы по идентификатору"""
+
+    @abstractmethod
+    def sizeOf(self, typename: str) -> int:
+        """Размер примитивного типа"""
+
+
+class ExpressionNode(ABC):
+    """Узел дерева константного выражения"""
+
+    @abstractmethod
+    def evaluate(self, context: ExpressionContext) -> Number:
+        """Вычислить значение узла"""
+
+    @abstractmethod
+    def names(self) -> Iterable[str]:
+        """Идентификаторы констант, используемые в узле"""
+
+
+@dataclass(frozen=True)
+class LiteralNode(ExpressionNode):
+    value: Number
+
+    def evaluate(self, context: ExpressionContext) -> Number:
+        return self.value
+
+    def names(self) -> Iterable[str]:
+        return ()
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+@dataclass(frozen=True)
+class NameNode(ExpressionNode):
+    identifier: str
+
+    def evaluate(self, context: ExpressionContext) -> Number:
+        return context.resolveNumber(self.identifier)
+
+    def names(self) -> Iterable[str]:
+        return self.identifier,
+
+    def __str__(self) -> str:
+        return self.identifier
+
+
+@dataclass(frozen=True)
+class SizeOfNode(ExpressionNode):
+    typename: str
+
+    def evaluate(self, context: ExpressionContext) -> Number:
+        return context.sizeOf(self.typename)
+
+    def names(self) -> Iterable[str]:
+        return ()
+
+    def __str__(self) -> str:
+        return f"{ExpressionParser.SIZEOF}({self.typename})"
+
+
+@dataclass(frozen=True)
+class UnaryNode(ExpressionNode):
+    sign: str
+    operand: ExpressionNode
+
+    def evaluate(self, context: ExpressionContext) -> Number:
+        value = self.operand.evaluate(context)
+
+        try:
+            return ExpressionParser.UNARY[self.sign](value)
+
+        except TypeError:
+            raise ExpressionError(f"Операция '{self.sign}' недопустима для {value!r}")
+
+    def names(self) -> Iterable[str]:
+        return self.operand.names()
+
+    def __str__(self) -> str:
+        return f"{self.sign}{self.operand}"
+
+
+@dataclass(frozen=True)
+class BinaryNode(ExpressionNode):
+    sign: str
+    left: ExpressionNode
+    right: ExpressionNode
+
+    def evaluate(self, context: ExpressionContext) -> Number:
+        a, b = self.left.evaluate(context), self.right.evaluate(context)
+
+        try:
+            return ExpressionParser.BINARY[self.sign][1](a, b)
+
+        except (TypeError, ValueError, OverflowError):
+            raise ExpressionError(f"Операция '{self.sign}' недопустима для {a!r} и {b!r}")
+
+    def names(self) -> Iterable[str]:
+        yield from self.left.names()
+        yield from self.right.names()
+
+    def __str__(self) -> str:
+        return f"({self.left} {self.sign} {self.right})"
+
+
+class ExpressionParser:
+    """Разбор записи константного выражения (приоритеты операций как в C)"""
+
+    SIZEOF: Final = "sizeof"
+    MAX_SHIFT: Final = 64
+    """Наибольший сдвиг: шире самого широкого примитивного типа значение не записать"""
+
+    BINARY: ClassVar[dict[str, tuple[int, Callable[[Number, Number], Number]]]] = {
+        "|": (1, operator.or_),
+        "^": (2, operator.xor),
+        "&": (3, operator.and_),
+        "<<": (4, _shiftLeft),
+        ">>": (4, _shiftRight),
+        "+": (5, operator.add),
+        "-": (5, operator.sub),
+        "*": (6, operator.mul),
+        "/": (6, _divide),
+        "%": (6, _modulo),
+    }
+    """Бинарные операции: (приоритет, функция)"""
+
+    UNARY: ClassVar[dict[str, Callable[[Number], Number]]] = {
+        "-": operator.neg,
+        "+": operator.pos,
+        "~": operator.invert,
+    }
+    """Унарные операции"""
+
+    __TOKENS: ClassVar[re.Pattern] = re.compile("|".join((
+        r"(?P<SPACE>\s+)",
+        r"(?P<HEX>0[xX][_\da-fA-F]+)",
+        r"(?P<BIN>0[bB][_01]+)",
+        r"(?P<EXPONENT>\d+[.]\d+(?:[eE][-+]?\d+)?)",
+        r"(?P<OCT>0[_0-7]+)",
+        r"(?P<DEC>0|[1-9][\d_]*)",
+        r"(?P<CHAR>'\S')",
+        r"(?P<NAME>[a-zA-Z_][a-zA-Z\d_]*)",
+        r"(?P<SIGN><<|>>|[-+*/%&|^~()])",
+        r"(?P<UNKNOWN>.)",
+    )))
+
+    __LITERALS: ClassVar[dict[str, Callable[[str], Number]]] = {
+        "HEX": lambda s: int(s, 16),
+        "BIN": lambda s: int(s, 2),
+        "EXPONENT": float,
+        "OCT": lambda s: int(s, 8),
+        "DEC": lambda s: int(s, 10),
+        "CHAR": lambda s: ord(s[1]),
+    }
+
+    def __init__(self, source: str) -> None:
+        self.__source = source
+        self.__tokens = tuple((m.lastgroup, m.group()) for m in self.__TOKENS.finditer(source) if m.lastgroup != "SPACE")
+        self.__position = 0
+
+    @classmethod
+    def parse(cls, source: str) -> ExpressionNode:
+        """Разобрать выражение. При ошибке записи - ExpressionError"""
+        return cls(source).__run()
+
+    def __run(self) -> ExpressionNode:
+        node = self.__parseBinary(0)
+
+        if (token := self.__peek()) is not None:
+            raise ExpressionError(f"Неожиданная лексема '{token[1]}' в выражении '{self.__source}'")
+
+        return node
+
+    def __peek(self) -> Optional[tuple[str, str]]:
+        if self.__position < len(self.__tokens):
+            return self.__tokens[self.__position]
+
+    def __next(self) -> tuple[str, str]:
+        if (token := self.__peek()) is None:
+            raise ExpressionError(f"Неожиданный конец выражения '{self.__source}'")
+
+        self.__position += 1
+        return token
+
+    def __expect(self, sign: str) -> None:
+        if (token := self.__next()) != ("SIGN", sign):
+            raise ExpressionError(f"Ожидалось '{sign}' вместо '{token[1]}' в выражении '{self.__source}'")
+
+    def __parseBinary(self, min_priority: int) -> ExpressionNode:
+        left = self.__parseUnary()
+
+        while (token := self.__peek()) is not None and token[0] == "SIGN" and token[1] in self.BINARY:
+            priority = self.BINARY[token[1]][0]
+
+            if priority <= min_priority:
+                break
+
+            self.__position += 1
+            left = BinaryNode(token[1], left, self.__parseBinary(priority))
+
+        return left
+
+    def __parseUnary(self) -> ExpressionNode:
+        kind, lexeme = self.__next()
+
+        if kind == "SIGN" and lexeme in self.UNARY:
+            return UnaryNode(lexeme, self.__parseUnary())
+
+        if kind == "SIGN" and lexeme == "(":
+            node = self.__parseBinary(0)
+            self.__expect(")")
+            return node
+
+        if kind == "NAME" and lexeme == self.SIZEOF:
+            self.__expect("(")
+            kind, typename = self.__next()
+
+            if kind != "NAME":
+                raise ExpressionError(f"{self.SIZEOF}: ожидалось имя типа вместо '{typename}'")
+
+            self.__expect(")")
+            return SizeOfNode(typename)
+
+        if kind == "NAME":
+            return NameNode(lexeme)
+
+        if (literal := self.__LITERALS.get(kind)) is not None:
+            return LiteralNode(literal(lexeme))
+
+        raise ExpressionError(f"Неожиданная лексема '{lexeme}' в выражении '{self.__source}'")
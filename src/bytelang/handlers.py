@@ -72,6 +72,9 @@ class ErrorHandler(BasicErrorHandler):
     def count(self) -> int:
         return len(self.__messages)
 
+    def getMessages(self) -> tuple[str, ...]:
+        return tuple(self.__messages)
+
     def getLog(self) -> str:
         return ReprTool.headed("errors", self.__messages)
 
@@ -2,18 +2,94 @@
 
 from __future__ import annotations
 
+import inspect
+import os
+import struct
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from enum import auto
 from os import PathLike
+from time import perf_counter_ns
 from typing import Callable
+from typing import Iterable
 from typing import Optional
 
+from bytelang.container import ProgramContainer
 from bytelang.content import Environment
 from bytelang.content import PrimitiveType
+from bytelang.errors import ContainerError
+from bytelang.errors import InterpreterError
+from bytelang.profiler import ExecutionProfiler
 from bytelang.registries import PrimitivesRegistry
+from bytelang.sinks import BufferedTextSink
+from bytelang.sinks import NullSink
+from bytelang.sinks import OutputSink
 from bytelang.tools import FileTool
+from bytelang.tracing import TraceReader
+from bytelang.tracing import TraceWriter
+from bytelang.verifier import ByteCodeVerifier
+
+InstructionHandler = Callable[..., None]
+"""Обработчик инструкции: (vm, *операнды)"""
+
+DecodedInstruction = tuple[InstructionHandler, tuple[int | float, ...], int]
+"""Предекодированная инструкция: (обработчик, операнды, адрес следующей инструкции)"""
+
+
+class ExecutionMode(Enum):
+    """Режим исполнения байткода"""
+
+    DECODING = auto()
+    """Декодирование каждой инструкции при исполнении"""
+    THREADED = auto()
+    """Однократное декодирование сегмента кода при загрузке"""
+    FUSED = auto()
+    """
+    Предекодирование со слиянием частых пар инструкций в суперинструкции.
+    Сливаются только пары, первая инструкция которых не передаёт управление (BasicBlockCompiler.isStraight)
+    """
+    PROFILING = auto()
+    """Декодирование с подсчётом количества и времени исполнения каждой инструкции"""
+    TRACING = auto()
+    """Декодирование с записью трассы исполнения (setTracer)"""
+
+
+@dataclass(frozen=True, kw_only=True)
+class InterpreterSnapshot:
+    """
+    Снимок состояния ВМ.
+    Сегмент кода не копируется: снимки одной программы разделяют отображение файла,
+    куча и занятая часть стека хранятся неизменяемыми байтами и копируются только при восстановлении
+    """
+
+    code: memoryview
+    """Отображение сегмента кода"""
+    code_key: tuple
+    """Путь и состояние отображённого файла"""
+    code_start: int
+    """Адрес начала сегмента кода"""
+    heap: bytes
+    """Содержимое кучи"""
+    stack: bytes
+    """Занятая часть стека"""
+    program_pointer: int
+    exit_code: int
+    running: bool
 
 
 class Interpreter:
-    def __init__(self, env: Environment, primitives: PrimitivesRegistry, instructions: tuple[Callable[[Interpreter], None], ...]) -> None:
+    FUSION_HISTOGRAM_TOP: int = 8
+    """Сколько самых частых пар инструкций сливать, если пары не заданы явно"""
+
+    def __init__(self, env: Environment, primitives: PrimitivesRegistry, instructions: tuple[InstructionHandler, ...], signature: Optional[bytes] = None) -> None:
+        """
+        instructions - обработчики по индексам инструкций,
+        signature - подпись окружения, для которого сгенерированы обработчики (SIGNATURE сгенерированного модуля).
+        Несовпадение подписи (например, индексы переназначены по opcode_profile после генерации) - ошибка.
+        Каждый обработчик, в том числе без подписи, должен принимать операнды своей инструкции
+        и не может носить сгенерированное имя другой инструкции окружения
+        """
         self.i8 = primitives.get("i8")
         self.u8 = primitives.get("u8")
         self.i16 = primitives.get("i16")
@@ -25,46 +101,135 @@ class Interpreter:
         self.f32 = primitives.get("f32")
         self.f64 = primitives.get("f64")
 
-        self.__instructions: tuple[Callable[[Interpreter], None], ...] = instructions
+        self.__instructions: tuple[InstructionHandler, ...] = instructions
+        self.__operands_layout: tuple[tuple[PrimitiveType, ...], ...] = tuple(
+            tuple(arg.primitive_type for arg in ins.arguments)
+            for ins in sorted(env.instructions.values(), key=lambda i: i.index)
+        )
+        """Типы операндов каждой инструкции по её индексу"""
 
-        self.__primitive_instruction_index = env.profile.instruction_index
+        if len(instructions) != len(self.__operands_layout):
+            raise InterpreterError(f"Instruction handlers count {len(instructions)} does not match environment {env.name} ({len(self.__operands_layout)})")
+
+        self.__verifier = ByteCodeVerifier(env)
+        self.__signature = ProgramContainer.signature(env)
+        """Подпись окружения для проверки контейнеров"""
+
+        if signature is not None and signature != self.__signature:
+            raise InterpreterError(f"Instruction handlers were generated for another layout of environment {env.name}: regenerate them")
+
+        self.__checkHandlers(env, instructions)
+
+        self.__verified_key: Optional[tuple] = None
+        """Для какого отображения файла программа прошла проверку"""
+
+        self.__opcodes = env.opcodes
         self.__primitive_heap_pointer = env.profile.pointer_heap
         self.__primitive_program_pointer = env.profile.pointer_program
 
-        self.__stack = bytearray()
+        self.__stack = bytearray(env.profile.stack_size)
+        """Предвыделенная область стека"""
+        self.__stack_pointer = 0
+        """Индекс первого свободного байта стека"""
         self.__running = False
         self.__program_pointer = 0
         self.__exit_code = 0
 
-        self.__program: Optional[bytearray] = None
+        self.__heap = bytearray()
+        """Копия области кучи программы (адреса до начала кода), единственная изменяемая область"""
+        self.__code_start = 0
+        """Адрес начала сегмента кода"""
+        self.__code: Optional[memoryview] = None
+        """Отображённый в память файл байткода только для чтения"""
+        self.__code_map = None
+        self.__code_key: Optional[tuple] = None
+        """Путь и состояние отображённого файла (Для повторного использования отображения)"""
+
+        self.__decoded = list[DecodedInstruction]()
+        """Предекодированные инструкции сегмента кода"""
+        self.__slot_by_address = list[Optional[int]]()
+        """Индекс предекодированной инструкции по её адресу"""
+        self.__decoded_indexes = list[int]()
+        """Индексы инструкций предекодированных записей"""
+        self.__decoded_key: Optional[tuple] = None
+        """Для какого отображения файла и режима слияния декодированы записи"""
+
+        self.__output: OutputSink = BufferedTextSink()
+        """Приёмник вывода инструкций печати"""
+
+        self.__tracer: Optional[TraceWriter] = None
+        """Журнал трассы для режима TRACING"""
+
+        self.__profiler = ExecutionProfiler(env)
+        """Статистика последнего запуска в режиме PROFILING"""
+
+        self.__instruction_index_by_name = {name: ins.index for name, ins in env.instructions.items()}
+        self.__fused_pairs: Optional[frozenset[tuple[int, int]]] = None
+        """Пары индексов инструкций для слияния. None - выбрать по гистограмме пар"""
+        self.__fused_handlers = dict[tuple[int, int], InstructionHandler]()
+
+    @staticmethod
+    def __checkHandlers(env: Environment, instructions: tuple[InstructionHandler, ...]) -> None:
+        """Обработчики соответствуют инструкциям окружения по индексам"""
+        generated = {ins.reprShakeCase(): ins for ins in env.instructions.values()}
+
+        for ins in sorted(env.instructions.values(), key=lambda i: i.index):
+            handler = instructions[ins.index]
+            name = getattr(handler, "__name__", repr(handler))
+
+            if (other := generated.get(name)) is not None and other is not ins:
+                raise InterpreterError(f"Handler {name} is placed at index {ins.index} of {ins.name} ({env.name}): regenerate handlers")
+
+            try:
+                params = inspect.signature(handler)
+
+            except (TypeError, ValueError):
+                # Сигнатура недоступна (встроенные функции) - проверяется только имя
+                continue
+
+            try:
+                params.bind(None, *(0 for _ in ins.arguments))
+
+            except TypeError:
+                raise InterpreterError(f"Handler {name} at index {ins.index} does not accept operands of {ins!r} ({env.name})") from None
 
     def stackPushPrimitive(self, primitive: PrimitiveType, value: int | float) -> None:
         """Записать значение примитивного типа в стек"""
-        self.__stack.extend((primitive.packer.pack(value)))
+        sp = self.__stack_pointer
+
+        if sp + primitive.size > len(self.__stack):
+            raise InterpreterError(f"Stack overflow: push {primitive} at {sp} (stack size {len(self.__stack)})")
+
+        primitive.packer.pack_into(self.__stack, sp, value)
+        self.__stack_pointer = sp + primitive.size
 
     def stackPopPrimitive(self, primitive: PrimitiveType) -> int | float:
         """Получить значение примитивного типа из стека"""
-        b = bytearray(self.__stack.pop() for _ in range(primitive.size))
-        return primitive.packer.unpack(b)[0]
+        sp = self.__stack_pointer - primitive.size
+
+        if sp < 0:
+            raise InterpreterError(f"Stack underflow: pop {primitive} at {self.__stack_pointer}")
 
-    def ipVariableStackPop(self, primitive: PrimitiveType) -> None:
-        """Записать значение примитивного типа из стека в переменную по IP"""
-        self.addressWritePrimitive(self.ipReadHeapPointer(), primitive, self.stackPopPrimitive(primitive))
+        self.__stack_pointer = sp
+        return primitive.packer.unpack_from(self.__stack, sp)[0]
 
-    def ipStackPush(self, primitive: PrimitiveType) -> None:
-        """Отправить в стек значение примитивного типа по IP"""
-        self.stackPushPrimitive(primitive, self.ipReadPrimitive(primitive))
+    def addressStackPop(self, address: int, primitive: PrimitiveType) -> None:
+        """Записать значение примитивного типа из стека в переменную по адресу"""
+        self.addressWritePrimitive(address, primitive, self.stackPopPrimitive(primitive))
 
     def addressWritePrimitive(self, address: int, primitive: PrimitiveType, value: int | float) -> None:
         """Запись примитивный тип по адресу"""
-        primitive.packer.pack_into(self.__program, address, value)
+        if address >= self.__code_start:
+            raise InterpreterError(f"Write {primitive} to code segment at {address}")
+
+        primitive.packer.pack_into(self.__heap, address, value)
 
     def addressReadPrimitive(self, address: int, primitive: PrimitiveType) -> int | float:
         """Считать примитивный тип по адресу"""
-        return primitive.packer.unpack_from(self.__program, address)[0]
+        if address < self.__code_start:
+            return primitive.packer.unpack_from(self.__heap, address)[0]
 
-    def ipReadVariable(self, primitive: PrimitiveType) -> int | float:
-        return self.addressReadPrimitive(self.ipReadHeapPointer(), primitive)
+        return primitive.packer.unpack_from(self.__code, address)[0]
 
     def ipReadPrimitive(self, primitive: PrimitiveType) -> int | float:
         """Считать значение примитивного типа по IP"""
@@ -74,32 +239,483 @@ class Interpreter:
 
     def ipReadInstructionIndex(self) -> int:
         """Получить индекс инструкции по IP"""
-        return self.ipReadPrimitive(self.__primitive_instruction_index)
+        index, self.__program_pointer = self.__opcodes.read(self.__code, self.__program_pointer)
+        return index
 
     def ipReadHeapPointer(self) -> int:
         """Получить указатель на кучу по IP"""
         return self.ipReadPrimitive(self.__primitive_heap_pointer)
 
+    def ipJump(self, address: int) -> None:
+        """Передать управление инструкции по адресу"""
+        self.__program_pointer = address
+
+    def setFusedPairs(self, pairs: Optional[Iterable[tuple[str, str]]]) -> None:
+        """Задать пары инструкций (по именам) для слияния. None - выбирать по гистограмме пар программы"""
+        self.__decoded_key = None
+
+        if pairs is None:
+            self.__fused_pairs = None
+            return
+
+        try:
+            self.__fused_pairs = frozenset(
+                (self.__instruction_index_by_name[first], self.__instruction_index_by_name[second])
+                for first, second in pairs
+            )
+
+        except KeyError as e:
+            raise InterpreterError(f"Unknown instruction in fused pair: {e}")
+
     def setExitCode(self, code: int) -> None:
         self.__exit_code = code
         self.__running = False
 
-    def run(self, bytecode_filepath: PathLike | str) -> int:
-        self.__program_pointer = 0
+    def getProgramPointer(self) -> int:
+        return self.__program_pointer
+
+    def getExitCode(self) -> int:
+        return self.__exit_code
+
+    def getOutput(self) -> OutputSink:
+        return self.__output
+
+    def setOutput(self, sink: OutputSink) -> None:
+        """Установить приёмник вывода инструкций печати"""
+        self.__output.flush()
+        self.__output = sink
+
+    def setTracer(self, tracer: Optional[TraceWriter]) -> None:
+        """Установить журнал трассы для режима TRACING"""
+        self.__tracer = tracer
+
+    def getProfiler(self) -> ExecutionProfiler:
+        """Статистика последнего запуска в режиме PROFILING"""
+        return self.__profiler
+
+    def isRunning(self) -> bool:
+        return self.__running
+
+    def load(self, bytecode_filepath: PathLike | str, heap: Optional[bytes] = None) -> None:
+        """
+        Загрузить программу и подготовить ВМ к исполнению с начального адреса.
+        Файл отображается в память без копирования, копируется только область кучи
+        :param heap: начальное содержимое кучи вместо записанного в файле (того же размера)
+        """
+        self.__mapCode(bytecode_filepath)
+
+        self.__code_start = 0
+        self.__code_start = self.addressReadPrimitive(0, self.__primitive_heap_pointer)
+
+        if self.__code_start > len(self.__code):
+            raise InterpreterError(f"Code start address {self.__code_start} out of program (size {len(self.__code)})")
+
+        self.__heap = bytearray(self.__code[:self.__code_start] if heap is None else heap)
+
+        if len(self.__heap) != self.__code_start:
+            raise InterpreterError(f"Heap size {len(self.__heap)} does not match program heap size {self.__code_start}")
+
+        self.__program_pointer = self.__code_start
         self.__running = True
-        self.__stack.clear()
-        self.__program = bytearray(FileTool.readBytes(bytecode_filepath))
+        self.__stack_pointer = 0
 
-        self.__program_pointer = self.ipReadHeapPointer()
+    def __mapCode(self, bytecode_filepath: PathLike | str) -> None:
+        """Отобразить файл байткода, если он не отображён с момента последнего изменения"""
+        stat = os.stat(bytecode_filepath)
+        key = (os.fspath(bytecode_filepath), stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
-        while self.__running:
-            self.__instructions[self.ipReadInstructionIndex()].__call__(self)
+        if key == self.__code_key:
+            return
+
+        self.unload()
+
+        if stat.st_size == 0:
+            raise InterpreterError(f"Empty bytecode file: {bytecode_filepath}")
+
+        self.__code_map = FileTool.mapBytes(bytecode_filepath)
+        self.__code = memoryview(self.__code_map)
+        self.__code_key = key
+
+        if ProgramContainer.isContainer(self.__code):
+            self.__openContainer(bytecode_filepath)
+
+    def __openContainer(self, bytecode_filepath: PathLike | str) -> None:
+        """Оставить от отображения контейнера только байткод программы"""
+        container = self.__code
+
+        try:
+            header = ProgramContainer.readHeader(container)
+
+            if header.signature != self.__signature:
+                raise ContainerError(f"Program was compiled for another environment (signature {header.signature.hex()})")
+
+            ProgramContainer.verifyChecksum(container, header)
+
+        except ContainerError as e:
+            self.unload()
+            raise InterpreterError(f"Invalid container {bytecode_filepath}: {e}") from e
+
+        self.__code = ProgramContainer.payload(container, header)
+        container.release()
+
+    def unload(self) -> None:
+        """
+        Освободить отображение файла байткода.
+        После load, step и replay отображение остаётся открытым: вызвать перед перезаписью файла (run освобождает сам)
+        """
+        if self.__code is not None:
+            self.__code.release()
+
+        if self.__code_map is not None:
+            try:
+                self.__code_map.close()
+
+            except BufferError:
+                # Отображение используется снимками и будет закрыто вместе с ними
+                pass
+
+        self.__code = None
+        self.__code_map = None
+        self.__code_key = None
+
+    def getHeap(self) -> bytes:
+        """Текущее содержимое кучи (адреса до начала кода)"""
+        return bytes(self.__heap)
+
+    def getCodeStart(self) -> int:
+        """Адрес начала сегмента кода загруженной программы"""
+        return self.__code_start
+
+    def getCodeEnd(self) -> int:
+        """Адрес конца сегмента кода загруженной программы"""
+        return len(self.__code)
+
+    def decodeInstruction(self, address: int) -> tuple[int, tuple[int | float, ...], int]:
+        """Декодировать инструкцию по адресу: (индекс инструкции, операнды, адрес следующей инструкции)"""
+        if not self.__code_start <= address < len(self.__code):
+            raise InterpreterError(f"Instruction address {address} out of code segment [{self.__code_start}, {len(self.__code)})")
+
+        index, next_address = self.__opcodes.read(self.__code, address)
+
+        if index >= len(self.__operands_layout):
+            raise InterpreterError(f"Invalid instruction index {index} at {address:04X}")
+
+        address = next_address
+        operands = list[int | float]()
+
+        for primitive in self.__operands_layout[index]:
+            operands.append(self.addressReadPrimitive(address, primitive))
+            address += primitive.size
+
+        return index, tuple(operands), address
+
+    def verify(self) -> None:
+        """
+        Проверить загруженную программу. Проверенная программа в режиме DECODING декодируется без проверок адресов
+        и индексов инструкций. THREADED и FUSED декодируют программу с проверками однократно при загрузке
+        и от проверки не ускоряются. Проверки стека и записи в сегмент кода остаются во всех режимах:
+        адреса и глубина стека вычисляются обработчиками при исполнении
+        :raises InterpreterError: если программа некорректна
+        """
+        if self.__code is None:
+            raise InterpreterError("Cannot verify: no program loaded")
+
+        if errors := self.__verifier.run(self.__code):
+            raise InterpreterError("Bytecode verification failed:\n" + "\n".join(errors))
+
+        self.__verified_key = self.__code_key
+
+    def isVerified(self) -> bool:
+        return self.__code_key is not None and self.__verified_key == self.__code_key
+
+    def snapshot(self) -> InterpreterSnapshot:
+        """Сделать снимок состояния загруженной программы"""
+        if self.__code is None:
+            raise InterpreterError("Cannot snapshot: no program loaded")
+
+        return InterpreterSnapshot(
+            code=memoryview(self.__code),
+            code_key=self.__code_key,
+            code_start=self.__code_start,
+            heap=bytes(self.__heap),
+            stack=bytes(self.__stack[:self.__stack_pointer]),
+            program_pointer=self.__program_pointer,
+            exit_code=self.__exit_code,
+            running=self.__running
+        )
+
+    def restore(self, snapshot: InterpreterSnapshot) -> None:
+        """Восстановить состояние из снимка (Снимок может быть сделан другим интерпретатором того же окружения)"""
+        if len(snapshot.stack) > len(self.__stack):
+            raise InterpreterError(f"Snapshot stack ({len(snapshot.stack)}) does not fit stack size {len(self.__stack)}")
+
+        if snapshot.code_key != self.__code_key:
+            self.unload()
+            self.__code = memoryview(snapshot.code)
+            self.__code_key = snapshot.code_key
+
+        self.__code_start = snapshot.code_start
+        self.__heap = bytearray(snapshot.heap)
+        self.__stack[:len(snapshot.stack)] = snapshot.stack
+        self.__stack_pointer = len(snapshot.stack)
+        self.__program_pointer = snapshot.program_pointer
+        self.__exit_code = snapshot.exit_code
+        self.__running = snapshot.running
+
+    def run(self, bytecode_filepath: PathLike | str, mode: ExecutionMode = ExecutionMode.DECODING) -> int:
+        """
+        Загрузить и исполнить программу до завершения. Отображение файла освобождается после исполнения,
+        поэтому файл можно перекомпилировать (декодированный код переиспользуется, если файл не изменился)
+        """
+        self.load(bytecode_filepath)
+
+        try:
+            return self.resume(mode)
+
+        finally:
+            self.unload()
+
+    def resume(self, mode: ExecutionMode = ExecutionMode.THREADED) -> int:
+        """
+        Продолжить исполнение с текущего состояния (после load, step или restore) до завершения.
+        Ошибки исполнения (в том числе выход за конец сегмента кода и переход не на начало инструкции)
+        сообщаются как InterpreterError во всех режимах. Проверенная программа (verify) декодируется без проверок
+        """
+        try:
+            self.__execute(mode, self.__runDecoding if self.isVerified() else self.__runDecodingChecked)
+
+        except (IndexError, TypeError, struct.error) as e:
+            raise self.__runtimeError(e) from e
+
+        finally:
+            self.__output.flush()
 
         return self.__exit_code
 
-    @staticmethod
-    def stdoutWrite(value: str) -> None:
-        print(value, end="")
+    def __runtimeError(self, e: Exception) -> InterpreterError:
+        """
+        Ошибка исполнения с адресом. Циклы исполнения не проверяют указатель программы:
+        выход за конец кода или переход не на инструкцию проявляется исключением при декодировании
+        """
+        if self.__code is not None and self.__program_pointer >= len(self.__code):
+            return InterpreterError(f"Execution ran past the end of code segment at {self.__program_pointer:04X} (missing exit?)")
+
+        status = "" if self.isVerified() else " (program is not verified)"
+        return InterpreterError(f"Runtime error near {self.__program_pointer:04X}{status}: {e}")
+
+    def __execute(self, mode: ExecutionMode, run_decoding: Callable[[], None]) -> None:
+        match mode:
+            case ExecutionMode.DECODING:
+                run_decoding()
+
+            case ExecutionMode.THREADED:
+                self.__decode()
+                self.__runThreaded()
+
+            case ExecutionMode.FUSED:
+                self.__decode(fuse=True)
+                self.__runThreaded()
+
+            case ExecutionMode.PROFILING:
+                self.__profiler.reset()
+                self.__runProfiling()
+
+            case ExecutionMode.TRACING:
+                self.__runTracing()
+
+            case _:
+                raise ValueError(mode)
+
+    def __runDecoding(self) -> None:
+        while self.__running:
+            index = self.ipReadInstructionIndex()
+            self.__instructions[index].__call__(self, *map(self.ipReadPrimitive, self.__operands_layout[index]))
+
+    def __runDecodingChecked(self) -> None:
+        while self.__running:
+            index, operands, self.__program_pointer = self.decodeInstruction(self.__program_pointer)
+            self.__instructions[index].__call__(self, *operands)
+
+    def __runProfiling(self) -> None:
+        """Отдельный цикл, чтобы профилирование не замедляло остальные режимы"""
+        records = self.__profiler.records
+
+        while self.__running:
+            address = self.__program_pointer
+            begin = perf_counter_ns()
+            index, operands, self.__program_pointer = self.decodeInstruction(address)
+            self.__instructions[index].__call__(self, *operands)
+            elapsed = perf_counter_ns() - begin
+
+            if (record := records.get(address)) is None:
+                records[address] = [index, 1, elapsed]
+
+            else:
+                record[1] += 1
+                record[2] += elapsed
+
+    def __checkpointTrace(self) -> None:
+        self.__tracer.checkpoint(self.__program_pointer, self.__exit_code, self.__running, bytes(self.__heap), bytes(self.__stack[:self.__stack_pointer]))
+
+    def __runTracing(self) -> None:
+        """Отдельный цикл, чтобы трассировка не замедляла остальные режимы"""
+        if (tracer := self.__tracer) is None:
+            raise InterpreterError("Tracing mode requires a tracer (setTracer)")
+
+        def tracingWrite(address: int, primitive: PrimitiveType, value: int | float) -> None:
+            Interpreter.addressWritePrimitive(self, address, primitive, value)
+            tracer.recordWrite(address, bytes(self.__heap[address:address + primitive.size]))
+
+        # Обработчики обращаются к vm.addressWritePrimitive: атрибут экземпляра перехватывает запись только на время трассировки
+        self.addressWritePrimitive = tracingWrite
+
+        try:
+            if tracer.needCheckpoint():
+                self.__checkpointTrace()
+
+            while self.__running:
+                address = self.__program_pointer
+                index, operands, self.__program_pointer = self.decodeInstruction(address)
+                tracer.beginStep(address, index)
+                self.__instructions[index].__call__(self, *operands)
+                tracer.endStep()
+
+                if tracer.needCheckpoint():
+                    self.__checkpointTrace()
+
+        finally:
+            del self.addressWritePrimitive
+
+    def replay(self, trace: TraceReader, bytecode_filepath: PathLike | str, step: int) -> None:
+        """
+        Восстановить состояние ВМ после шага step трассы:
+        состояние ближайшей контрольной точки и повторное исполнение оставшихся шагов.
+        Вывод повторно исполняемых шагов отбрасывается: он уже был выведен при записи трассы
+        """
+        checkpoint = trace.findCheckpoint(step)
+        self.load(bytecode_filepath, checkpoint.heap)
+
+        if len(checkpoint.stack) > len(self.__stack):
+            raise InterpreterError(f"Trace stack ({len(checkpoint.stack)}) does not fit stack size {len(self.__stack)}")
+
+        self.__stack[:len(checkpoint.stack)] = checkpoint.stack
+        self.__stack_pointer = len(checkpoint.stack)
+        self.__program_pointer = checkpoint.program_pointer
+        self.__exit_code = checkpoint.exit_code
+        self.__running = checkpoint.running
+
+        output, self.__output = self.__output, NullSink()
+
+        try:
+            executed = self.step(step - checkpoint.step)
+
+        finally:
+            self.__output = output
+
+        if executed != step - checkpoint.step:
+            raise InterpreterError(f"Program exited at step {checkpoint.step + executed} before step {step}")
+
+    def __decode(self, fuse: bool = False) -> None:
+        """Однократно декодировать сегмент кода, начиная с начального адреса"""
+        if self.__decoded_key == (self.__code_key, fuse):
+            return
+
+        self.__decoded.clear()
+        self.__decoded_indexes.clear()
+        self.__slot_by_address = [None] * (len(self.__code) + 1)
+
+        address = self.__code_start
+        end = len(self.__code)
+
+        while address < end:
+            index, operands, next_address = self.decodeInstruction(address)
+            self.__slot_by_address[address] = len(self.__decoded)
+            self.__decoded.append((self.__instructions[index], operands, next_address))
+            self.__decoded_indexes.append(index)
+            address = next_address
+
+        if fuse:
+            self.__fuse()
+
+        self.__decoded_key = (self.__code_key, fuse)
+
+    def __fuse(self) -> None:
+        """
+        Заменить записи пар соседних инструкций суперинструкциями.
+        Запись второй инструкции пары остаётся на своём месте для переходов на её адрес
+        """
+        pairs = tuple(zip(self.__decoded_indexes, self.__decoded_indexes[1:]))
+
+        if (selected := self.__fused_pairs) is None:
+            selected = frozenset(pair for pair, _ in Counter(pairs).most_common(self.FUSION_HISTOGRAM_TOP))
+
+        for slot, pair in enumerate(pairs):
+            if pair not in selected or pair not in self.__fused_handlers and not self.__canFuse(pair):
+                continue
+
+            if (fused := self.__fused_handlers.get(pair)) is None:
+                fused = self.__fused_handlers[pair] = self.__createFusedHandler(pair)
+
+            _, operands_first, _ = self.__decoded[slot]
+            _, operands_second, second_next = self.__decoded[slot + 1]
+            self.__decoded[slot] = (fused, (*operands_first, *operands_second), second_next)
+
+    def __canFuse(self, pair: tuple[int, int]) -> bool:
+        """Первая инструкция пары не может перейти или завершить программу: вторая исполняется всегда"""
+        from bytelang.sourcegenerator import BasicBlockCompiler
+
+        return BasicBlockCompiler.isStraight(self.__instructions[pair[0]])
+
+    def __createFusedHandler(self, pair: tuple[int, int]) -> InstructionHandler:
+        """
+        Суперинструкция: функция, вызывающая обработчики пары с операндами в позиционных аргументах.
+        Вместо двух итераций цикла исполнения (выборка записи, распаковка операндов) - одна
+        """
+        first, second = pair
+        names_first = tuple(f"a{i}" for i in range(len(self.__operands_layout[first])))
+        names_second = tuple(f"b{i}" for i in range(len(self.__operands_layout[second])))
+        source = (
+            f"def fused(vm, {', '.join((*names_first, *names_second))}):\n"
+            f"    first(vm, {', '.join(names_first)})\n"
+            f"    second(vm, {', '.join(names_second)})\n"
+        )
+        namespace = {"first": self.__instructions[first], "second": self.__instructions[second]}
+        exec(compile(source, f"<bytelang fused {first}:{second}>", "exec"), namespace)
+        return namespace["fused"]
+
+    def step(self, budget: int) -> int:
+        """
+        Исполнить не более budget инструкций загруженной программы (load).
+        Исполнение можно продолжить следующим вызовом. Ошибки исполнения сообщаются как InterpreterError, как и в resume
+        :return: количество исполненных инструкций
+        """
+        self.__decode()
+        decoded = self.__decoded
+        slots = self.__slot_by_address
+        executed = 0
+
+        try:
+            while self.__running and executed < budget:
+                handler, operands, self.__program_pointer = decoded[slots[self.__program_pointer]]
+                handler(self, *operands)
+                executed += 1
+
+        except (IndexError, TypeError, struct.error) as e:
+            raise self.__runtimeError(e) from e
+
+        return executed
+
+    def __runThreaded(self) -> None:
+        decoded = self.__decoded
+        slots = self.__slot_by_address
+
+        while self.__running:
+            handler, operands, self.__program_pointer = decoded[slots[self.__program_pointer]]
+            handler(self, *operands)
+
+    def stdoutWrite(self, value: str) -> None:
+        self.__output.writeText(value)
 
-    def IPPrint(self, primitive: PrimitiveType) -> None:
-        self.stdoutWrite(f"|> {self.ipReadVariable(primitive)}\n")
+    def addressPrint(self, address: int, primitive: PrimitiveType) -> None:
+        """Вывести значение переменной по адресу"""
+        self.__output.writeValue(address, primitive, self.addressReadPrimitive(address, primitive))
@@ -0,0 +1,112 @@
+"""Размещение переменных в heap"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from enum import auto
+from typing import ClassVar
+
+from bytelang.codegenerator import CodeInstruction
+from bytelang.codegenerator import ProgramData
+from bytelang.codegenerator import Variable
+from bytelang.content import PrimitiveType
+from bytelang.handlers import BasicErrorHandler
+from bytelang.registries import PrimitivesRegistry
+from bytelang.relocation import ProgramRelocator
+
+
+class HeapLayout(Enum):
+    """Способ размещения переменных в heap"""
+
+    DECLARATION = auto()
+    """В порядке объявления, без выравнивания"""
+    ALIGNED = auto()
+    """Каждая переменная выровнена по своему размеру, промежутки по возможности заполняются меньшими переменными"""
+    PACKED = auto()
+    """Без промежутков. Порядок подбирается так, чтобы выровненными оказалось как можно больше переменных"""
+
+
+@dataclass(frozen=True, kw_only=True)
+class HeapLayoutReport:
+    """Итоговое размещение переменных"""
+
+    mode: HeapLayout
+    """Применённый способ размещения"""
+    size: int
+    """Размер heap вместе с заголовком"""
+    padding: int
+    """Байт, потраченных на выравнивание"""
+    unaligned: tuple[str, ...]
+    """Идентификаторы невыровненных переменных"""
+
+    def __str__(self) -> str:
+        return f"{self.mode.name}: heap {self.size}B, padding {self.padding}B, unaligned: {', '.join(self.unaligned) or '-'}"
+
+
+class HeapLayoutOptimizer:
+    """Переразмещение переменных в heap с пересчётом всех зависящих от адресов значений"""
+
+    MAX_ALIGNMENT: ClassVar[int] = 8
+    """Наибольшее учитываемое выравнивание"""
+
+    def __init__(self, error_handler: BasicErrorHandler, primitives: PrimitivesRegistry) -> None:
+        self.__err = error_handler.getChild(self.__class__.__name__)
+        self.__relocator = ProgramRelocator(self.__err, primitives)
+
+    @classmethod
+    def alignment(cls, primitive: PrimitiveType) -> int:
+        """Естественное выравнивание примитивного типа"""
+        return min(primitive.size & -primitive.size, cls.MAX_ALIGNMENT)
+
+    @classmethod
+    def report(cls, mode: HeapLayout, data: ProgramData) -> HeapLayoutReport:
+        return HeapLayoutReport(
+            mode=mode,
+            size=data.start_address,
+            padding=data.start_address - data.environment.profile.pointer_heap.size - sum(var.primitive.size for var in data.variables),
+            unaligned=tuple(var.identifier for var in data.variables if var.address % cls.alignment(var.primitive) != 0)
+        )
+
+    def run(self, instructions: tuple[CodeInstruction, ...], data: ProgramData, mode: HeapLayout) -> tuple[tuple[CodeInstruction, ...], ProgramData, HeapLayoutReport]:
+        if mode is not HeapLayout.DECLARATION:
+            variables = self.__place(data, mode)
+            start_address = variables[-1].address + variables[-1].primitive.size if variables else data.start_address
+            instructions, data = self.__relocator.run(instructions, data, variables, start_address)
+
+        return instructions, data, self.report(mode, data)
+
+    def __place(self, data: ProgramData, mode: HeapLayout) -> tuple[Variable, ...]:
+        """
+        Жадное размещение: по текущему смещению берётся выровненная переменная с наибольшим выравниванием.
+        Если таких нет, ALIGNED добавляет минимальный промежуток, PACKED ставит самую маленькую переменную
+        """
+        offset = data.environment.profile.pointer_heap.size
+        remaining = list(data.variables)
+        placed = list[Variable]()
+
+        while remaining:
+            aligned = [var for var in remaining if offset % self.alignment(var.primitive) == 0]
+
+            if aligned:
+                var = max(aligned, key=lambda v: self.alignment(v.primitive))
+
+            elif mode is HeapLayout.PACKED:
+                var = min(remaining, key=lambda v: v.primitive.size)
+
+            else:
+                step = min(self.alignment(v.primitive) for v in remaining)
+                offset += -offset % step
+                continue
+
+            remaining.remove(var)
+            placed.append(Variable(
+                address=offset,
+                identifier=var.identifier,
+                primitive=var.primitive,
+                value=var.value,
+                reference=var.reference
+            ))
+            offset += var.primitive.size
+
+        return tuple(placed)
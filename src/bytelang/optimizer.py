@@ -0,0 +1,157 @@
+"""Оптимизация промежуточного кода перед генерацией байткода"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from bytelang.codegenerator import CodeInstruction
+from bytelang.codegenerator import ProgramData
+from bytelang.content import EnvironmentInstruction
+from bytelang.content import InstructionSemantics
+from bytelang.content import PrimitiveWriteType
+from bytelang.handlers import BasicErrorHandler
+from bytelang.registries import PrimitivesRegistry
+from bytelang.relocation import ProgramRelocator
+
+
+class PeepholeOptimizer:
+    """
+    Локальные замены в окне из нескольких инструкций:
+    удаление недостижимого кода после завершающих инструкций,
+    удаление пары push/pop, запись которой сразу перезаписывается следующей парой,
+    слияние соседних pop в один более широкий.
+    Действия инструкций берутся только из объявления окружения (EnvironmentInstruction.semantics):
+    инструкции без объявленного действия не изменяются и не удаляются.
+    После замен адреса инструкций, меток и ссылки на метки пересчитываются
+    """
+
+    def __init__(self, error_handler: BasicErrorHandler, primitives: PrimitivesRegistry) -> None:
+        self.__err = error_handler.getChild(self.__class__.__name__)
+        self.__relocator = ProgramRelocator(self.__err, primitives)
+
+    def run(self, instructions: tuple[CodeInstruction, ...], data: Optional[ProgramData]) -> tuple[tuple[CodeInstruction, ...], Optional[ProgramData]]:
+        if data is None:
+            self.__err.write("Program data is None")
+            return instructions, data
+
+        pops = dict[int, EnvironmentInstruction]()
+
+        for ins in sorted(data.environment.instructions.values(), key=lambda i: i.index):
+            if self.__isIntegerPop(ins):
+                pops.setdefault(ins.arguments[0].pointing_type.size, ins)
+
+        marked = frozenset(data.marks.keys())
+        code = list(instructions)
+
+        while True:
+            size = len(code)
+            code = self.__removeUnreachable(code, marked)
+            code = self.__removeOverwrittenStores(code, marked)
+            code = self.__mergePops(code, marked, pops)
+
+            if len(code) == size:
+                break
+
+        return self.__relocator.run(code, data)
+
+    @staticmethod
+    def __isIntegerPop(instruction: EnvironmentInstruction) -> bool:
+        """
+        Целочисленный pop переносит байты стека без изменений.
+        Вещественный - через значение с плавающей точкой, поэтому половины одного значения им не объединить
+        """
+        return instruction.semantics is InstructionSemantics.POP and instruction.arguments[0].pointing_type.write_type is not PrimitiveWriteType.exponent
+
+    @staticmethod
+    def __pushSize(ins: CodeInstruction) -> Optional[int]:
+        if ins.instruction.semantics is InstructionSemantics.PUSH:
+            return ins.instruction.arguments[0].primitive_type.size
+
+    @staticmethod
+    def __popSize(ins: CodeInstruction) -> Optional[int]:
+        if ins.instruction.semantics is InstructionSemantics.POP:
+            return ins.instruction.arguments[0].pointing_type.size
+
+    @staticmethod
+    def __popAddress(ins: CodeInstruction) -> int:
+        return ins.instruction.arguments[0].primitive_type.packer.unpack(ins.arguments[0])[0]
+
+    def __removeUnreachable(self, code: list[CodeInstruction], marked: frozenset[int]) -> list[CodeInstruction]:
+        ret = list[CodeInstruction]()
+        reachable = True
+
+        for ins in code:
+            if ins.address in marked:
+                reachable = True
+
+            if reachable:
+                ret.append(ins)
+
+            if ins.instruction.semantics is InstructionSemantics.EXIT:
+                reachable = False
+
+        return ret
+
+    def __isStore(self, push: CodeInstruction, pop: CodeInstruction) -> bool:
+        """Пара push/pop одного размера - запись константы по адресу"""
+        return (size := self.__pushSize(push)) is not None and size == self.__popSize(pop)
+
+    def __removeOverwrittenStores(self, code: list[CodeInstruction], marked: frozenset[int]) -> list[CodeInstruction]:
+        ret = list[CodeInstruction]()
+        i = 0
+
+        while i < len(code):
+            window = code[i:i + 4]
+
+            if (
+                    len(window) == 4
+                    and not any(ins.address in marked for ins in window[1:])
+                    and self.__isStore(window[0], window[1])
+                    and self.__isStore(window[2], window[3])
+            ):
+                first, second = self.__popAddress(window[1]), self.__popAddress(window[3])
+
+                if second <= first and first + self.__popSize(window[1]) <= second + self.__popSize(window[3]):
+                    i += 2
+                    continue
+
+            ret.append(code[i])
+            i += 1
+
+        return ret
+
+    def __mergePops(self, code: list[CodeInstruction], marked: frozenset[int], pops: dict[int, EnvironmentInstruction]) -> list[CodeInstruction]:
+        ret = list[CodeInstruction]()
+        i = 0
+
+        while i < len(code):
+            if i + 1 < len(code) and (merged := self.__mergePair(code[i], code[i + 1], marked, pops)) is not None:
+                ret.append(merged)
+                i += 2
+                continue
+
+            ret.append(code[i])
+            i += 1
+
+        return ret
+
+    def __mergePair(self, first: CodeInstruction, second: CodeInstruction, marked: frozenset[int], pops: dict[int, EnvironmentInstruction]) -> Optional[CodeInstruction]:
+        """popK A+K; popK A -> pop2K A. Первый pop снимает верхние K байт стека, которые ложатся в старшую половину"""
+        if second.address in marked or not self.__isIntegerPop(first.instruction) or not self.__isIntegerPop(second.instruction):
+            return
+
+        if (size := self.__popSize(first)) != self.__popSize(second):
+            return
+
+        if (wider := pops.get(size * 2)) is None:
+            return
+
+        if (address := self.__popAddress(second)) + size != self.__popAddress(first):
+            return
+
+        return CodeInstruction(
+            instruction=wider,
+            arguments=(wider.arguments[0].primitive_type.write(address),),
+            address=first.address,
+            references=second.references
+        )
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import gc
+import os
+import pickle
 import re
 from abc import ABC
 from abc import abstractmethod
-from dataclasses import dataclass
+from collections import deque
+from contextlib import contextmanager
 from typing import Callable
 from typing import ClassVar
 from typing import Final
 from typing import Generic
 from typing import Iterable
+from typing import Iterator
 from typing import Optional
 from typing import TextIO
 from typing import TypeVar
 
+from bytelang.errors import ExpressionError
+from bytelang.expressions import ExpressionParser
 from bytelang.handlers import BasicErrorHandler
 from bytelang.statement import Regex
 from bytelang.statement import Statement
@@ -29,68 +36,210 @@ class Parser(ABC, Generic[_T]):
     COMMENT: Final[str] = "#"
 
     def run(self, file: TextIO) -> Iterable[_T]:
-        return Filter.notNone(
-            self._parseLine(index + 1, line)
-            for index, line in enumerate(filter(bool, map(self.__cleanup, file)))
-        )
+        return Filter.notNone(self._parseLine(index, line) for index, line in self.lines(file))
 
-    def __cleanup(self, line: str) -> str:
-        return line.split(self.COMMENT)[0].strip()
+    @classmethod
+    def lines(cls, file: TextIO) -> Iterator[tuple[int, str]]:
+        """Чистые непустые строчки с их номерами (номер - порядковый среди непустых строчек, с 1)"""
+        return enumerate(filter(bool, map(cls.__cleanup, file)), 1)
+
+    @classmethod
+    def __cleanup(cls, line: str) -> str:
+        return line.split(cls.COMMENT)[0].strip()
 
     @abstractmethod
     def _parseLine(self, index: int, line: str) -> Optional[_T]:
         """Обработать чистую строчку кода и вернуть абстрактный токен"""
 
 
-@dataclass(frozen=True)
-class Matcher:
-    __pattern: str
-    __handler: Callable[[str], UniversalArgument]
-
-    def process(self, lexeme: str) -> Optional[UniversalArgument]:
-        if re.match(self.__pattern, lexeme):
-            return self.__handler(lexeme)
-
-
 class StatementParser(Parser[Statement]):
-    __MATCHERS: ClassVar[tuple[Matcher, ...]] = (
-        Matcher(Regex.INTEGER, lambda s: UniversalArgument.fromInteger(int(s, 10))),
-        Matcher(Regex.BIN_VALUE, lambda s: UniversalArgument.fromInteger(int(s, 2))),
-        Matcher(Regex.OCT_VALUE, lambda s: UniversalArgument.fromInteger(int(s, 8))),
-        Matcher(Regex.HEX_VALUE, lambda s: UniversalArgument.fromInteger(int(s, 16))),
-        Matcher(Regex.EXPONENT, lambda s: UniversalArgument.fromExponent(float(s))),
-        Matcher(Regex.CHAR, lambda s: UniversalArgument.fromExponent(ord(s[1]))),
-        Matcher(Regex.IDENTIFIER, lambda s: UniversalArgument.fromName(s)),
-    )
+    __ARGUMENT_CONVERTERS: ClassVar[dict[str, Callable[[str], UniversalArgument]]] = {
+        "INTEGER": lambda s: UniversalArgument.fromInteger(int(s, 10)),
+        "BIN_VALUE": lambda s: UniversalArgument.fromInteger(int(s, 2)),
+        "OCT_VALUE": lambda s: UniversalArgument.fromInteger(int(s, 8)),
+        "HEX_VALUE": lambda s: UniversalArgument.fromInteger(int(s, 16)),
+        "EXPONENT": lambda s: UniversalArgument.fromExponent(float(s)),
+        "CHAR": lambda s: UniversalArgument.fromInteger(ord(s[1])),
+        "IDENTIFIER": lambda s: UniversalArgument.fromName(s),
+        "EXPRESSION": lambda s: UniversalArgument.fromExpression(ExpressionParser.parse(s)),
+    }
+    """Преобразование лексемы аргумента по имени группы. Порядок групп - приоритет при совпадении"""
+
+    __LEXER: ClassVar[re.Pattern] = re.compile("|".join((
+        rf"\A(?:[.](?P<DIRECTIVE_USE>{Regex.NAME})|(?P<MARK_DECLARE>{Regex.NAME}):|(?P<INSTRUCTION_CALL>{Regex.NAME}))(?=\s|\Z)",
+        r"(?P<SPACE>\s+)",
+        *(rf"(?P<{name}>{getattr(Regex, name)})(?=\s|\Z)" for name in __ARGUMENT_CONVERTERS.keys()),
+        r"(?P<UNKNOWN>\S+)",
+    )))
+    """Единое регулярное выражение: голова выражения (только в начале строки), пробелы, аргументы, нераспознанная лексема"""
 
     def __init__(self, error_handler: BasicErrorHandler):
         self.__err = error_handler.getChild(self.__class__.__name__)
 
     def _parseLine(self, index: int, line: str) -> Optional[Statement]:
-        first, *lexemes = line.split()
-
         self.__err.begin()
 
-        args = tuple(self.__matchStatementArg(lexeme, i, index, line) for i, lexeme in enumerate(lexemes))
-        _type, head = self.__matchStatementType(first, index, line)
+        _type: Optional[StatementType] = None
+        head: Optional[str] = None
+        args = list[Optional[UniversalArgument]]()
+
+        for m in self.__LEXER.finditer(line):
+            kind = m.lastgroup
+
+            if kind == "SPACE":
+                continue
+
+            if m.start() == 0:
+                if kind in StatementType.__members__:
+                    _type, head = StatementType[kind], m.group(kind)
+                    continue
+
+                self.__err.writeLineAt(line, index, f"Не удалось определить тип выражения: '{m.group()}'")
+                continue
+
+            args.append(self.__convertArgument(kind, m.group(), len(args), index, line))
 
         if self.__err.failed():
             return
 
-        return Statement(type=_type, line=line, index=index, head=head, arguments=args)
+        return Statement(type=_type, line=line, index=index, head=head, arguments=tuple(args))
 
-    def __matchStatementType(self, lexeme: str, index: int, line_source: str) -> tuple[StatementType, str] | tuple[None, None]:
-        for statement_type in StatementType:
-            if m := re.fullmatch(statement_type.value, lexeme):
-                w = re.search(Regex.NAME, m.string)
-                return statement_type, w.string[w.start():w.end()]
+    def __convertArgument(self, kind: str, lexeme: str, i: int, line_index: int, line_source: str) -> Optional[UniversalArgument]:
+        if (converter := self.__ARGUMENT_CONVERTERS.get(kind)) is not None:
+            try:
+                return converter(lexeme)
 
-        self.__err.writeLineAt(line_source, index, f"Не удалось определить тип выражения: '{lexeme}'")
-        return None, None
+            except ValueError:
+                pass
 
-    def __matchStatementArg(self, lexeme: str, i: int, line_index: int, line_source: str) -> Optional[UniversalArgument]:
-        for matcher in self.__MATCHERS:
-            if ret := matcher.process(lexeme):
-                return ret
+            except ExpressionError as e:
+                self.__err.writeLineAt(line_source, line_index, f"Запись Аргумента ({i}) '{lexeme}' не распознана: {e}")
+                return
 
         self.__err.writeLineAt(line_source, line_index, f"Запись Аргумента ({i}) '{lexeme}' не распознана")
+
+
+class _EventRecorder(BasicErrorHandler):
+    """Записывает сообщения ошибок в общий список событий разбора"""
+
+    def __init__(self, events: list[Statement | str]) -> None:
+        super().__init__()
+        self.__events = events
+
+    def success(self) -> bool:
+        return True
+
+    def _appendMessage(self, message: str) -> None:
+        self.__events.append(message)
+
+
+@contextmanager
+def _gcPaused() -> Iterator[None]:
+    """
+    Приостановить сборку мусора на время создания множества объектов без циклов ссылок (выражения разбора):
+    иначе сборщик многократно обходит растущее множество объектов, что замедляет создание в разы
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _parseChunk(chunk: tuple[int, tuple[str, ...]]) -> bytes:
+    """
+    Разобрать часть исходника в процессе пула: выражения и сообщения ошибок в порядке появления.
+    Результат сериализуется здесь, чтобы основной процесс распаковывал его сам (_loadChunk), а не поток пула
+    """
+    start, lines = chunk
+    events = list[Statement | str]()
+    parser = StatementParser(_EventRecorder(events))
+
+    with _gcPaused():
+        for index, line in enumerate(lines, start):
+            if (statement := parser._parseLine(index, line)) is not None:
+                events.append(statement)
+
+        return pickle.dumps(events, pickle.HIGHEST_PROTOCOL)
+
+
+def _loadChunk(data: bytes) -> list[Statement | str]:
+    with _gcPaused():
+        return pickle.loads(data)
+
+
+class ChunkedStatementParser:
+    """
+    Разбор большого исходника частями в пуле процессов.
+    Строчки разбираются независимо, поэтому исходник делится на части по строчкам, а выражения и ошибки частей
+    объединяются в исходном порядке: номера строчек, выражения и сообщения совпадают с последовательным StatementParser
+    """
+
+    DEFAULT_CHUNK_LINES: ClassVar[int] = 20000
+    """Строчек в части по умолчанию"""
+
+    WINDOW_PER_WORKER: ClassVar[int] = 2
+    """Частей в обработке на процесс: остальные части не читаются из исходника, пока не получены результаты первых"""
+
+    def __init__(self, error_handler: BasicErrorHandler, workers: Optional[int] = None, chunk_lines: int = DEFAULT_CHUNK_LINES) -> None:
+        self.__err = error_handler
+        """Сообщения процессов уже содержат имя StatementParser"""
+        self.__parser = StatementParser(error_handler)
+        self.__workers = workers
+        """Количество процессов. None - по количеству ядер"""
+        self.__chunk_lines = chunk_lines
+
+    def run(self, file: TextIO) -> Iterator[Statement]:
+        lines = Parser.lines(file)
+        first = tuple(self.__take(lines))
+
+        if len(first) < self.__chunk_lines:
+            # Исходник умещается в одну часть - пул процессов не нужен
+            yield from Filter.notNone(self.__parser._parseLine(index, line) for index, line in first)
+            return
+
+        from concurrent.futures import Future
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = self.__chunks(first, lines)
+        window_size = (self.__workers or os.cpu_count() or 1) * self.WINDOW_PER_WORKER
+        window = deque[Future]()
+
+        with ProcessPoolExecutor(self.__workers) as pool:
+            try:
+                while True:
+                    for chunk in chunks:
+                        window.append(pool.submit(_parseChunk, chunk))
+
+                        if len(window) >= window_size:
+                            break
+
+                    if not window:
+                        return
+
+                    for event in _loadChunk(window.popleft().result()):
+                        if isinstance(event, str):
+                            self.__err.write(event)
+
+                        else:
+                            yield event
+
+            finally:
+                # Генератор закрыт досрочно или разбор части завершился ошибкой: ждать остальные части незачем
+                for future in window:
+                    future.cancel()
+
+    def __take(self, lines: Iterator[tuple[int, str]]) -> Iterator[tuple[int, str]]:
+        for _, item in zip(range(self.__chunk_lines), lines):
+            yield item
+
+    def __chunks(self, first: tuple[tuple[int, str], ...], lines: Iterator[tuple[int, str]]) -> Iterator[tuple[int, tuple[str, ...]]]:
+        chunk = first
+
+        while chunk:
+            yield chunk[0][0], tuple(line for _, line in chunk)
+            chunk = tuple(self.__take(lines))
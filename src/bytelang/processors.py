@@ -1,18 +1,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from dataclasses import replace
 from enum import Flag
 from enum import auto
 from os import PathLike
+from pathlib import Path
+from typing import ClassVar
 from typing import Iterable
 from typing import Optional
 
+from bytelang.caches import CompileCache
 from bytelang.codegenerator import ByteCodeGenerator
 from bytelang.codegenerator import CodeGenerator
 from bytelang.codegenerator import CodeInstruction
 from bytelang.codegenerator import ProgramData
+from bytelang.container import ProgramContainer
 from bytelang.content import PrimitiveType
 from bytelang.handlers import BasicErrorHandler
+from bytelang.layout import HeapLayout
+from bytelang.layout import HeapLayoutOptimizer
+from bytelang.layout import HeapLayoutReport
+from bytelang.optimizer import PeepholeOptimizer
+from bytelang.parsers import ChunkedStatementParser
 from bytelang.parsers import Parser
 from bytelang.parsers import StatementParser
 from bytelang.registries import EnvironmentsRegistry
@@ -45,7 +55,9 @@ class LogFlag(Flag):
     """Представление переменных"""
     CONSTANTS = auto()
     """Значения констант"""
-    PROGRAM_VALUES = VARIABLES | CONSTANTS
+    HEAP_LAYOUT = auto()
+    """Размещение переменных в heap"""
+    PROGRAM_VALUES = VARIABLES | CONSTANTS | HEAP_LAYOUT
     """Все значения"""
 
     BYTECODE = auto()
@@ -59,9 +71,16 @@ class LogFlag(Flag):
 class CompileResult:
     primitives: Iterable[PrimitiveType]
     statements: tuple[Statement, ...]
+    """Выражения программы (пусто в потоковом режиме)"""
     instructions: tuple[CodeInstruction, ...]
+    """Инструкции промежуточного кода (пусто в потоковом режиме)"""
     program_data: ProgramData
     bytecode: bytes
+    """Байт-код программы (пусто в потоковом режиме)"""
+    program_size: int
+    """Размер байт-кода программы"""
+    heap_layout: HeapLayoutReport
+    """Итоговое размещение переменных"""
     source_filepath: str
     bytecode_filepath: str
 
@@ -87,6 +106,9 @@ class CompileResult:
         if LogFlag.VARIABLES in flags:
             sb.append(ReprTool.headed("variables", self.program_data.variables))
 
+        if LogFlag.HEAP_LAYOUT in flags:
+            sb.append(ReprTool.title("heap layout")).append(self.heap_layout)
+
         if LogFlag.CODE_INSTRUCTIONS in flags:
             sb.append(ReprTool.headed(f"code instructions : {self.source_filepath}", self.instructions))
 
@@ -112,7 +134,7 @@ class CompileResult:
             if (var := var_by_addr.get(address)) is not None:
                 self.__writeComment(sb, var)
 
-            if (mark := self.program_data.marks.get(address)) is not None:
+            for mark in self.program_data.marks.get(address, ()):
                 self.__writeComment(sb, f"{mark}:")
 
             if (ins := ins_by_addr.get(address)) is not None:
@@ -124,26 +146,102 @@ class CompileResult:
 class Compiler:
     """Компилятор ByteLang"""
 
+    VERSION: ClassVar[int] = 4
+    """Версия компилятора. Увеличивается при изменении генерируемого байткода (записи CompileCache прежних версий не используются)"""
+
     def __init__(self, error_handler: BasicErrorHandler, primitives: PrimitivesRegistry, environments: EnvironmentsRegistry):
         self.__err = error_handler.getChild(self.__class__.__name__)
         self.__primitives = primitives
+        self.__environments = environments
+        self.__cache: Optional[CompileCache] = None
         self.__parser = StatementParser(self.__err)
         self.__code_generator = CodeGenerator(self.__err, environments, primitives)
+        self.__layout_optimizer = HeapLayoutOptimizer(self.__err, primitives)
+        self.__optimizer = PeepholeOptimizer(self.__err, primitives)
         self.__bytecode_generator = ByteCodeGenerator(self.__err)
 
-    def run(self, source_filepath: PathLike | str, bytecode_filepath: PathLike | str) -> Optional[CompileResult]:
+    def setCache(self, cache: Optional[CompileCache]) -> None:
+        """Кэш результатов компиляции (None - отключить)"""
+        self.__cache = cache
+
+    def run(
+            self,
+            source_filepath: PathLike | str,
+            bytecode_filepath: PathLike | str,
+            *,
+            streaming: bool = False,
+            optimize: bool = False,
+            layout: HeapLayout = HeapLayout.DECLARATION,
+            container: bool = False,
+            parse_workers: Optional[int] = 1
+    ) -> Optional[CompileResult]:
+        """
+        container - записать байт-код в самоописывающий контейнер (ProgramContainer),
+        parse_workers - количество процессов разбора исходника частями (1 - последовательный разбор, None - по количеству ядер)
+        """
+        parser = self.__parser if parse_workers == 1 else ChunkedStatementParser(self.__err, parse_workers)
+
+        if self.__cache is None:
+            return self.__run(source_filepath, bytecode_filepath, parser, streaming, optimize, layout, container)
+
+        with open(source_filepath, "rb") as f:
+            key = CompileCache.key(f.read(), (self.VERSION, streaming, optimize, layout.name, container))
+
+        primitives_digest = CompileCache.primitivesDigest(self.__primitives.getValues())
+
+        if (result := self.__cache.restore(key, bytecode_filepath, self.__signature, primitives_digest, self.__primitives.get)) is not None:
+            return replace(result, source_filepath=str(source_filepath), bytecode_filepath=str(bytecode_filepath))
+
+        if (result := self.__run(source_filepath, bytecode_filepath, parser, streaming, optimize, layout, container)) is None:
+            return
+
+        env = result.program_data.environment
+        self.__cache.put(key, env.name, ProgramContainer.signature(env), primitives_digest, bytecode_filepath, replace(result, primitives=tuple(result.primitives)))
+        return result
+
+    def __signature(self, env_name: str) -> Optional[bytes]:
+        if (env := self.__environments.get(env_name)) is None:
+            return
+
+        return ProgramContainer.signature(env)
+
+    def __run(
+            self,
+            source_filepath: PathLike | str,
+            bytecode_filepath: PathLike | str,
+            parser: StatementParser | ChunkedStatementParser,
+            streaming: bool,
+            optimize: bool,
+            layout: HeapLayout,
+            container: bool
+    ) -> Optional[CompileResult]:
+        if streaming:
+            if optimize or layout is not HeapLayout.DECLARATION:
+                self.__err.write("Оптимизация и переразмещение heap недоступны в потоковом режиме")
+                return
+
+            return self.__runStreaming(source_filepath, bytecode_filepath, parser, container)
+
         with open(source_filepath) as f:
-            statements = tuple(self.__parser.run(f))
+            statements = tuple(parser.run(f))
 
         instructions, data = self.__code_generator.run(statements)
 
+        if data is None or not self.__err.success():
+            return
+
+        instructions, data, heap_layout = self.__layout_optimizer.run(instructions, data, layout)
+
+        if optimize:
+            instructions, data = self.__optimizer.run(instructions, data)
+
         if not (program := self.__bytecode_generator.run(instructions, data)):
             return
 
         if not self.__err.success():
             return
 
-        FileTool.saveBytes(bytecode_filepath, program)
+        FileTool.saveBytes(bytecode_filepath, ProgramContainer.pack(data.environment, self.__primitives.getValues(), program) if container else program)
 
         return CompileResult(
             primitives=self.__primitives.getValues(),
@@ -151,6 +249,47 @@ class Compiler:
             instructions=instructions,
             program_data=data,
             bytecode=program,
+            program_size=len(program),
+            heap_layout=heap_layout,
+            source_filepath=str(source_filepath),
+            bytecode_filepath=str(bytecode_filepath)
+        )
+
+    def __runStreaming(
+            self,
+            source_filepath: PathLike | str,
+            bytecode_filepath: PathLike | str,
+            parser: StatementParser | ChunkedStatementParser,
+            container: bool
+    ) -> Optional[CompileResult]:
+        """Выражения и инструкции не накапливаются: байт-код пишется в файл по мере разбора исходника"""
+        with open(source_filepath) as source, open(bytecode_filepath, "w+b") as output:
+            if container:
+                output.write(bytes(ProgramContainer.PAYLOAD_OFFSET))
+
+            size = self.__bytecode_generator.stream(
+                output,
+                self.__code_generator.stream(parser.run(source)),
+                self.__code_generator.getProgramData
+            )
+
+            if container and size is not None and self.__err.success():
+                ProgramContainer.finishStream(output, 0, self.__code_generator.getProgramData().environment, self.__primitives.getValues(), size)
+
+        if size is None or not self.__err.success():
+            Path(bytecode_filepath).unlink(missing_ok=True)
+            return
+
+        data = self.__code_generator.getProgramData()
+
+        return CompileResult(
+            primitives=self.__primitives.getValues(),
+            statements=(),
+            instructions=(),
+            program_data=data,
+            bytecode=bytes(),
+            program_size=size,
+            heap_layout=HeapLayoutOptimizer.report(HeapLayout.DECLARATION, data),
             source_filepath=str(source_filepath),
             bytecode_filepath=str(bytecode_filepath)
         )
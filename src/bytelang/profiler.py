@@ -0,0 +1,95 @@
+"""Профилирование исполнения байткода"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Optional
+
+from bytelang.content import Environment
+from bytelang.content import EnvironmentInstruction
+from bytelang.tools import ReprTool
+from bytelang.tools import StringBuilder
+
+
+@dataclass(frozen=True, kw_only=True)
+class InstructionStatistics:
+    """Статистика исполнения инструкции"""
+
+    name: str
+    """Полное имя инструкции окружения"""
+    index: int
+    """Индекс инструкции"""
+    address: Optional[int]
+    """Адрес инструкции в программе. None для сводной статистики по индексу"""
+    count: int
+    """Количество исполнений"""
+    time_ns: int
+    """Суммарное время исполнения (декодирование и обработчик) в наносекундах"""
+
+    def __str__(self) -> str:
+        address = "" if self.address is None else f" @{self.address:04X}"
+        return f"{self.name:32}{address:8} x{self.count:<10} {self.time_ns / 1e6:>12.3f} ms"
+
+
+class ExecutionProfiler:
+    """Сборщик статистики исполнения инструкций по адресам"""
+
+    def __init__(self, env: Environment) -> None:
+        self.__environment_instructions: dict[int, EnvironmentInstruction] = {ins.index: ins for ins in env.instructions.values()}
+        self.records = dict[int, list[int]]()
+        """Адрес инструкции -> [индекс инструкции, количество исполнений, суммарное время нс]. Заполняется циклом интерпретатора"""
+
+    def reset(self) -> None:
+        self.records.clear()
+
+    def __name(self, index: int) -> str:
+        if (ins := self.__environment_instructions.get(index)) is None:
+            return f"<unknown>@{index}"
+
+        return f"{ins.package}::{ins.name}"
+
+    def byAddress(self) -> tuple[InstructionStatistics, ...]:
+        """Статистика по адресам в порядке расположения"""
+        return tuple(
+            InstructionStatistics(name=self.__name(index), index=index, address=address, count=count, time_ns=time_ns)
+            for address, (index, count, time_ns) in sorted(self.records.items())
+        )
+
+    def byInstruction(self) -> tuple[InstructionStatistics, ...]:
+        """Сводная статистика по индексам инструкций, по убыванию времени"""
+        total = dict[int, list[int]]()
+
+        for index, count, time_ns in self.records.values():
+            item = total.setdefault(index, [0, 0])
+            item[0] += count
+            item[1] += time_ns
+
+        return tuple(sorted(
+            (
+                InstructionStatistics(name=self.__name(index), index=index, address=None, count=count, time_ns=time_ns)
+                for index, (count, time_ns) in total.items()
+            ),
+            key=lambda s: s.time_ns,
+            reverse=True
+        ))
+
+    def toJSON(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(
+            {
+                "instructions": [asdict(s) for s in self.byInstruction()],
+                "addresses": [asdict(s) for s in self.byAddress()],
+            },
+            indent=indent
+        )
+
+    def toCollapsedStacks(self, root: str = "program") -> str:
+        """Формат 'collapsed stacks' для flamegraph: root;инструкция;адрес время_нс"""
+        return "".join(f"{root};{s.name};{s.address:04X} {s.time_ns}\n" for s in self.byAddress())
+
+    def getLog(self) -> str:
+        sb = StringBuilder()
+        sb.append(ReprTool.headed("profile : instructions", self.byInstruction()))
+        sb.append(ReprTool.headed("profile : addresses", self.byAddress()))
+        return sb.toString()
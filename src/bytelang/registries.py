@@ -12,10 +12,13 @@ from typing import Final
 from typing import Generic
 from typing import Iterable
 from typing import Optional
+from typing import TYPE_CHECKING
 from typing import TypeVar
 
 from bytelang.content import Environment
 from bytelang.content import EnvironmentInstruction
+from bytelang.content import InstructionSemantics
+from bytelang.content import OpcodeEncoding
 from bytelang.content import Package
 from bytelang.content import PackageInstruction
 from bytelang.content import PackageInstructionArgument
@@ -26,6 +29,9 @@ from bytelang.parsers import Parser
 from bytelang.tools import FileTool
 from bytelang.tools import ReprTool
 
+if TYPE_CHECKING:
+    from bytelang.caches import RegistryCache
+
 _T = TypeVar("_T")
 """content Type"""
 _K = TypeVar("_K")
@@ -62,28 +68,69 @@ class Registry(ABC, Generic[_K, _T]):
 
 class JSONFileRegistry(Registry[str, _T], Generic[_R, _T]):
     """
-    Реестр, сразу заполнивший значения из JSON-файла
+    Реестр значений JSON-файла. Файл читается при первом обращении, значения разбираются по мере запроса
     """
 
     def __init__(self):
         super().__init__()
         self._filepath: Optional[Path] = None
+        self.__raw: Optional[dict[str, _R]] = None
+        """Сырые значения файла. None - файл ещё не прочитан"""
+        self.__complete = False
+        """Разобраны все значения"""
+        self.__cache: Optional[RegistryCache] = None
+
+    def setCache(self, cache: Optional[RegistryCache]) -> None:
+        """Установить постоянный кэш содержимого файла"""
+        self.__cache = cache
 
     def setFile(self, filepath: PathLike | str) -> None:
         self._filepath = Path(filepath)
-        self._data.clear()
-        self._data.update(
-            {
-                name: self._parse(name, raw)
-                for name, raw in FileTool.readJSON(self._filepath).items()
-            }
-        )
+        self.__raw = None
+        self._reset()
+
+    def setRaw(self, filepath: PathLike | str, values: dict[str, _R]) -> None:
+        """Заполнить реестр уже прочитанными сырыми значениями (filepath - их источник)"""
+        self._filepath = Path(filepath)
+        self.__raw = dict(values)
+        self._reset()
+
+    def preload(self) -> None:
+        """Разобрать все значения (в порядке файла)"""
+        if self.__complete:
+            return
+
+        raw = self.__getRaw()
+
+        for name in raw:
+            self.get(name)
+
+        self._data = {name: self._data[name] for name in raw}
+        self.__complete = True
+
+    def getValues(self) -> Iterable[_T]:
+        self.preload()
+        return super().getValues()
 
     def get(self, __key: str) -> Optional[_T]:
+        if (ret := self._data.get(__key)) is None and (raw := self.__getRaw().get(__key)) is not None:
+            ret = self._data[__key] = self._parse(__key, raw)
+
+        return ret
+
+    def _reset(self) -> None:
+        """Сбросить разобранные значения"""
+        self._data.clear()
+        self.__complete = False
+
+    def __getRaw(self) -> dict[str, _R]:
         if self._filepath is None:
             raise ValueError("Must select File")
 
-        return self._data.get(__key)
+        if self.__raw is None:
+            self.__raw = FileTool.readJSON(self._filepath) if self.__cache is None else self.__cache.readJSON(self._filepath)
+
+        return self.__raw
 
     @abstractmethod
     def _parse(self, name: str, raw: _R) -> _T:
@@ -105,8 +152,13 @@ class PrimitivesRegistry(JSONFileRegistry[_PrimitiveRaw, PrimitiveType]):
         self.__primitives_by_size = dict[tuple[int, PrimitiveWriteType], PrimitiveType]()
 
     def getBySize(self, size: int, write_type: PrimitiveWriteType = PrimitiveWriteType.unsigned) -> PrimitiveType:
+        self.preload()
         return self.__primitives_by_size[size, write_type]
 
+    def _reset(self) -> None:
+        super()._reset()
+        self.__primitives_by_size.clear()
+
     def _parse(self, name: str, raw: _PrimitiveRaw) -> PrimitiveType:
         size = raw["size"]
         write_type = PrimitiveWriteType[raw["type"]]
@@ -152,6 +204,17 @@ class CatalogRegistry(Registry[str, _T]):
 
         self._data.clear()
 
+    def preload(self, names: Optional[Iterable[str]] = None) -> None:
+        """Загрузить контент заранее. None - весь контент каталога"""
+        if self.__folder is None:
+            raise ValueError("Cannot preload! Must set folder")
+
+        if names is None:
+            names = sorted(path.stem for path in self.__folder.glob(f"*.{self.__FILE_EXT}"))
+
+        for name in names:
+            self.get(name)
+
     def get(self, name: str) -> _T:
         if self.__folder is None:
             raise ValueError(f"Cannot get {name}! Must set folder")
@@ -191,6 +254,7 @@ class ProfileRegistry(CatalogRegistry[Profile]):
             pointer_program=getType("ptr_prog"),
             pointer_heap=getType("ptr_heap"),
             instruction_index=getType("ptr_inst"),
+            stack_size=data.get("stack_size", Profile.DEFAULT_STACK_SIZE)
         )
 
 
@@ -204,6 +268,7 @@ class PackageParser(Parser[PackageInstruction]):
 
     def begin(self, package_name: str) -> None:
         self.__package_name = package_name
+        self.__used_names.clear()
 
     def _parseLine(self, index: int, line: str) -> Optional[PackageInstruction]:
         name, *arg_types = line.split()
@@ -251,28 +316,75 @@ class EnvironmentsRegistry(CatalogRegistry[Environment]):
         super().__init__(file_ext)
         self.__profile_registry = profiles
         self.__package_registry = packages
+        self.__cache: Optional[RegistryCache] = None
+        self.__primitives: Optional[PrimitivesRegistry] = None
+
+    def setCache(self, cache: Optional[RegistryCache], primitives: PrimitivesRegistry) -> None:
+        """Установить постоянный кэш разрешённых окружений (primitives - реестр, на типы которого ссылаются окружения)"""
+        self.__cache = cache
+        self.__primitives = primitives
 
     def _load(self, filepath: str, name: str) -> Environment:
+        if self.__cache is not None and (env := self.__cache.getEnvironment(filepath, self.__primitives.get)) is not None:
+            return env
+
         data = FileTool.readJSON(filepath)
         profile = self.__profile_registry.get(data["profile"])
+        opcodes = OpcodeEncoding(index=profile.instruction_index, variable=data.get("variable_opcodes", False))
+        reports = tuple(Path(filepath).parent / report for report in data.get("opcode_profile", ()))
 
-        return Environment(
+        env = Environment(
             parent=filepath,
             name=name,
             profile=profile,
-            instructions=self.__processPackages(profile, data["packages"])
+            opcodes=opcodes,
+            instructions=self.__processPackages(profile, opcodes, data["packages"], self.__loadFrequencies(reports), data.get("semantics", {}))
         )
 
-    def __processPackages(self, profile: Profile, packages_names: Iterable[str]) -> dict[str, EnvironmentInstruction]:
-        ret = dict[str, EnvironmentInstruction]()
-        index: int = 0
+        if self.__cache is not None:
+            packages = (self.__package_registry.get(package_name).parent for package_name in data["packages"])
+            self.__cache.putEnvironment(env, (profile.parent, *packages, *reports))
+
+        return env
+
+    @staticmethod
+    def __loadFrequencies(reports: Iterable[Path]) -> dict[str, int]:
+        """Суммарное количество исполнений инструкций (package::name) по отчётам профилировщика (ExecutionProfiler.toJSON)"""
+        ret = dict[str, int]()
+
+        for report in reports:
+            for record in FileTool.readJSON(report)["instructions"]:
+                ret[record["name"]] = ret.get(record["name"], 0) + record["count"]
+
+        return ret
+
+    def __processPackages(
+            self,
+            profile: Profile,
+            opcodes: OpcodeEncoding,
+            packages_names: Iterable[str],
+            frequencies: dict[str, int],
+            semantics: dict[str, str]
+    ) -> dict[str, EnvironmentInstruction]:
+        """
+        Индексы назначаются в порядке убывания частоты, инструкции с равной частотой - в порядке объявления.
+        semantics - действия инструкций по именам (поле semantics окружения)
+        """
+        declared = dict[str, PackageInstruction]()
 
         for package_name in packages_names:
             for ins in self.__package_registry.get(package_name).instructions:
-                if (ex_ins := ret.get(ins.name)) is not None:
+                if (ex_ins := declared.get(ins.name)) is not None:
                     raise ValueError(f"{ins} - overload is not allowed ({ex_ins} defined already)")
 
-                ret[ins.name] = ins.transform(index, profile)
-                index += 1
+                declared[ins.name] = ins
 
-        return ret
+        if unknown := semantics.keys() - declared.keys():
+            raise ValueError(f"Semantics declared for unknown instructions: {', '.join(sorted(unknown))}")
+
+        ordered = sorted(declared.values(), key=lambda i: -frequencies.get(f"{i.parent}::{i.name}", 0))
+
+        return {
+            ins.name: ins.transform(index, profile, opcodes, None if (value := semantics.get(ins.name)) is None else InstructionSemantics(value))
+            for index, ins in enumerate(ordered)
+        }
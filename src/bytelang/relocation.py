@@ -0,0 +1,116 @@
+"""Пересчёт адресов программы после изменения расположения кода или переменных"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Iterable
+from typing import Optional
+
+from bytelang.codegenerator import CodeInstruction
+from bytelang.codegenerator import ProgramData
+from bytelang.codegenerator import Variable
+from bytelang.content import PrimitiveType
+from bytelang.content import PrimitiveWriteType
+from bytelang.handlers import BasicErrorHandler
+from bytelang.registries import PrimitivesRegistry
+from bytelang.statement import UniversalArgument
+from bytelang.symbols import SymbolTable
+
+
+class ProgramRelocator:
+    """
+    Перестраивает программу под новые адреса:
+    инструкции размещаются подряд от начала кода, метки переходят на первую сохранившуюся инструкцию не раньше прежнего адреса,
+    аргументы и начальные значения переменных, зависящие от адресов, вычисляются заново
+    """
+
+    def __init__(self, error_handler: BasicErrorHandler, primitives: PrimitivesRegistry) -> None:
+        self.__err = error_handler.getChild(self.__class__.__name__)
+        self.__primitives = primitives
+
+    def run(
+            self,
+            instructions: Iterable[CodeInstruction],
+            data: ProgramData,
+            variables: Optional[Iterable[Variable]] = None,
+            start_address: Optional[int] = None
+    ) -> tuple[tuple[CodeInstruction, ...], ProgramData]:
+        """
+        :param instructions: инструкции в порядке исполнения с прежними адресами
+        :param data: данные программы с прежними адресами
+        :param variables: переменные с новыми адресами (по умолчанию - прежние)
+        :param start_address: новый адрес начала кода (по умолчанию - прежний)
+        """
+        code = tuple(instructions)
+        variables = tuple(data.variables if variables is None else variables)
+        start_address = data.start_address if start_address is None else start_address
+
+        old_addresses = [ins.address for ins in code]
+        new_addresses = list[int]()
+        address = start_address
+
+        for ins in code:
+            new_addresses.append(address)
+            address += ins.instruction.size
+
+        addresses = {var.identifier: var.address for var in variables}
+
+        marks = dict[int, tuple[str, ...]]()
+
+        for old, names in data.marks.items():
+            i = bisect_left(old_addresses, old)
+            new = new_addresses[i] if i < len(new_addresses) else address
+            # Несколько меток по одному адресу: пересчитывается каждая
+            marks[new] = (*marks.get(new, ()), *names)
+            addresses.update(dict.fromkeys(names, new))
+
+        symbols = SymbolTable(self.__primitives.get)
+
+        for name, value in data.constants.items():
+            if name in addresses:
+                symbols.define(name, UniversalArgument.fromInteger(addresses[name]), address=True)
+
+            else:
+                symbols.define(name, value)
+
+        instructions = tuple(
+            CodeInstruction(
+                instruction=ins.instruction,
+                arguments=tuple(
+                    arg if ref is None else self.__relocateArgument(symbols, ref, i_arg.primitive_type, arg)
+                    for arg, ref, i_arg in zip(ins.arguments, ins.references or (None,) * len(ins.arguments), ins.instruction.arguments)
+                ),
+                address=new_address,
+                references=ins.references
+            )
+            for ins, new_address in zip(code, new_addresses)
+        )
+
+        variables = tuple(
+            var if var.reference is None else Variable(
+                address=var.address,
+                identifier=var.identifier,
+                primitive=var.primitive,
+                value=self.__relocateArgument(symbols, var.reference, var.primitive, var.value),
+                reference=var.reference
+            )
+            for var in variables
+        )
+
+        return instructions, ProgramData(
+            environment=data.environment,
+            start_address=start_address,
+            variables=variables,
+            constants=symbols.getDefinitions(),
+            marks=marks
+        )
+
+    def __relocateArgument(self, symbols: SymbolTable, reference: UniversalArgument, primitive: PrimitiveType, old: bytes) -> bytes:
+        """Пересчитать значение, зависящее от адресов"""
+        try:
+            value = symbols.evaluate(reference)
+            return primitive.write(value.exponent if primitive.write_type == PrimitiveWriteType.exponent else value.integer)
+
+        except Exception as e:
+            self.__err.write(f"Не удалось пересчитать значение {reference}: {e}")
+            return old
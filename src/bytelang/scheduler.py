@@ -0,0 +1,70 @@
+"""Кооперативное исполнение множества виртуальных машин в одном цикле событий asyncio"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from os import PathLike
+from typing import Iterable
+from typing import Optional
+
+from bytelang.errors import ExecutionLimitError
+from bytelang.interpreters import Interpreter
+
+
+@dataclass(frozen=True, kw_only=True)
+class ExecutionLimits:
+    """Ограничения исполнения одной ВМ"""
+
+    instructions: Optional[int] = None
+    """Максимальное количество инструкций. None - без ограничения"""
+    seconds: Optional[float] = None
+    """Максимальное время от начала исполнения (wall-clock). None - без ограничения"""
+
+
+class InterpreterScheduler:
+    """Планировщик, исполняющий ВМ квантами инструкций и уступающий цикл событий между квантами"""
+
+    def __init__(self, slice_size: int = 1000) -> None:
+        self.__slice_size = slice_size
+        """Количество инструкций в одном кванте"""
+
+    async def runUntilExit(self, vm: Interpreter, bytecode_filepath: PathLike | str, limits: ExecutionLimits = ExecutionLimits()) -> int:
+        """
+        Исполнить программу до завершения
+        Отображение файла байткода освобождается по завершении, как и в Interpreter.run
+        :return: код завершения программы
+        :raises ExecutionLimitError: если превышен лимит исполнения
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if limits.seconds is None else loop.time() + limits.seconds
+        executed = 0
+        vm.load(bytecode_filepath)
+
+        try:
+            while vm.isRunning():
+                budget = self.__slice_size
+
+                if limits.instructions is not None:
+                    if (budget := min(budget, limits.instructions - executed)) <= 0:
+                        raise ExecutionLimitError(f"Instruction limit {limits.instructions} exceeded: {bytecode_filepath}")
+
+                executed += vm.step(budget)
+
+                if deadline is not None and vm.isRunning() and loop.time() > deadline:
+                    raise ExecutionLimitError(f"Time limit {limits.seconds}s exceeded after {executed} instructions: {bytecode_filepath}")
+
+                await asyncio.sleep(0)
+
+        finally:
+            vm.getOutput().flush()
+            vm.unload()
+
+        return vm.getExitCode()
+
+    async def runAll(self, jobs: Iterable[tuple[Interpreter, PathLike | str]], limits: ExecutionLimits = ExecutionLimits()) -> list[int | BaseException]:
+        """Исполнить программы одновременно. Для каждой: код завершения или возникшее исключение"""
+        return await asyncio.gather(
+            *(self.runUntilExit(vm, filepath, limits) for vm, filepath in jobs),
+            return_exceptions=True
+        )
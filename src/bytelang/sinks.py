@@ -0,0 +1,139 @@
+"""Приёмники вывода инструкций печати виртуальной машины"""
+
+from __future__ import annotations
+
+import sys
+from abc import ABC
+from abc import abstractmethod
+from struct import Struct
+from typing import BinaryIO
+from typing import ClassVar
+from typing import Iterable
+from typing import Optional
+from typing import TextIO
+
+from bytelang.content import PrimitiveType
+from bytelang.content import PrimitiveWriteType
+from bytelang.registries import PrimitivesRegistry
+
+
+class OutputSink(ABC):
+    """Базовый приёмник вывода ВМ"""
+
+    @abstractmethod
+    def writeValue(self, address: int, primitive: PrimitiveType, value: int | float) -> None:
+        """Вывести значение переменной примитивного типа по адресу"""
+
+    @abstractmethod
+    def writeText(self, text: str) -> None:
+        """Вывести произвольный текст"""
+
+    def flush(self) -> None:
+        """Сбросить накопленный вывод"""
+
+
+class TextSink(OutputSink, ABC):
+    """Приёмник, форматирующий значения в текст"""
+
+    @staticmethod
+    def formatValue(value: int | float) -> str:
+        return f"|> {value}\n"
+
+    def writeValue(self, address: int, primitive: PrimitiveType, value: int | float) -> None:
+        self.writeText(self.formatValue(value))
+
+
+class BufferedTextSink(TextSink):
+    """Текстовый вывод в поток, сбрасываемый порциями"""
+
+    def __init__(self, stream: Optional[TextIO] = None, flush_size: int = 4096) -> None:
+        self.__stream = stream
+        """Поток вывода. None - текущий sys.stdout"""
+        self.__flush_size = flush_size
+        """Размер накопленного текста, при котором вывод сбрасывается в поток"""
+        self.__buffer = list[str]()
+        self.__buffered = 0
+
+    def writeText(self, text: str) -> None:
+        self.__buffer.append(text)
+        self.__buffered += len(text)
+
+        if self.__buffered >= self.__flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.__buffer:
+            return
+
+        stream = sys.stdout if self.__stream is None else self.__stream
+        stream.write("".join(self.__buffer))
+        stream.flush()
+        self.__buffer.clear()
+        self.__buffered = 0
+
+
+class MemorySink(TextSink):
+    """Вывод, сохраняемый в памяти (Для тестов и пакетного исполнения)"""
+
+    def __init__(self) -> None:
+        self.__parts = list[str]()
+
+    def writeText(self, text: str) -> None:
+        self.__parts.append(text)
+
+    def getValue(self) -> str:
+        return "".join(self.__parts)
+
+    def clear(self) -> None:
+        self.__parts.clear()
+
+
+class NullSink(OutputSink):
+    """Вывод отбрасывается (повторное исполнение уже выведенных шагов)"""
+
+    def writeValue(self, address: int, primitive: PrimitiveType, value: int | float) -> None:
+        pass
+
+    def writeText(self, text: str) -> None:
+        pass
+
+
+class BinarySink(OutputSink):
+    """
+    Запись сырых значений (адрес, тип, значение) в двоичный поток для последующего форматирования.
+    Запись: заголовок (адрес, вид, размер) и байты значения. Вид - PrimitiveWriteType.value или TEXT_KIND
+    """
+
+    HEADER: ClassVar[Struct] = Struct("<IBI")
+    """Адрес, вид записи, размер данных"""
+    TEXT_KIND: ClassVar[int] = 0
+    """Вид записи произвольного текста (UTF-8)"""
+    TEXT_ADDRESS: ClassVar[int] = 0xFFFF_FFFF
+    """Адрес записи произвольного текста"""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.__stream = stream
+
+    def writeValue(self, address: int, primitive: PrimitiveType, value: int | float) -> None:
+        self.__stream.write(self.HEADER.pack(address, primitive.write_type.value, primitive.size) + primitive.write(value))
+
+    def writeText(self, text: str) -> None:
+        data = text.encode()
+        self.__stream.write(self.HEADER.pack(self.TEXT_ADDRESS, self.TEXT_KIND, len(data)) + data)
+
+    def flush(self) -> None:
+        self.__stream.flush()
+
+    @classmethod
+    def read(cls, stream: BinaryIO, primitives: PrimitivesRegistry) -> Iterable[tuple[int, Optional[PrimitiveType], int | float | str]]:
+        """Прочитать записи: (адрес, примитивный тип или None для текста, значение)"""
+        while header := stream.read(cls.HEADER.size):
+            address, kind, size = cls.HEADER.unpack(header)
+            data = stream.read(size)
+
+            if kind == cls.TEXT_KIND:
+                yield address, None, data.decode()
+                continue
+
+            primitive = primitives.getBySize(size, PrimitiveWriteType(kind))
+            yield address, primitive, primitive.packer.unpack(data)[0]
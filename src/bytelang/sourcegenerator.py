@@ -1,19 +1,27 @@
 """Генераторы кода для виртуальных машин"""
 from __future__ import annotations
 
+import functools
+import math
 from abc import ABC
 from abc import abstractmethod
 from dataclasses import dataclass
 from enum import Enum
 from enum import auto
+from os import PathLike
 from pathlib import Path
+from types import CodeType
+from typing import Callable
+from typing import ClassVar
 from typing import Iterable
 from typing import Optional
 
+from bytelang.container import ProgramContainer
 from bytelang.content import Environment
 from bytelang.content import EnvironmentInstruction
 from bytelang.content import EnvironmentInstructionArgument
-from bytelang.content import PrimitiveType
+from bytelang.content import PrimitiveWriteType
+from bytelang.interpreters import InstructionHandler
 from bytelang.interpreters import Interpreter
 from bytelang.registries import PrimitivesRegistry
 from bytelang.tools import ReprTool
@@ -29,14 +37,13 @@ class Language(Enum):
 class GenerationSettings:
     vm_instance: str
     vm_class: str
-    vm_method_ipReadPrimitive: str
-    vm_method_ipReadHeapPointer: str
 
-    def strCall_ipReadPrimitive(self, primitive: PrimitiveType) -> str:
-        return f"{self.vm_instance}.{self.vm_method_ipReadPrimitive}({self.vm_instance}.{primitive.name})"
-
-    def strCall_ipReadHeapPointer(self) -> str:
-        return f"{self.vm_instance}.{self.vm_method_ipReadHeapPointer}()"
+    @staticmethod
+    def strOperandAnnotation(arg: EnvironmentInstructionArgument) -> str:
+        """Аннотация типа операнда (указатель передаётся уже декодированным адресом)"""
+        if arg.pointing_type is None and arg.primitive_type.write_type == PrimitiveWriteType.exponent:
+            return float.__name__
+        return int.__name__
 
 
 class InstructionSourceGenerator(ABC):
@@ -65,10 +72,11 @@ class InstructionSourceGenerator(ABC):
         with open(output_filepath, "w") as f:
             f.write(self._getFileHeadedLines(env))
 
-            for instruction in env.instructions.values():
+            for instruction in sorted(env.instructions.values(), key=lambda i: i.index):
                 f.write(self._process(instruction))
 
             f.write(self._getInstructionCollectionDeclare())
+            f.write(self._getSignatureDeclare(ProgramContainer.signature(env)))
 
         return output_filepath
 
@@ -88,6 +96,10 @@ class InstructionSourceGenerator(ABC):
     def _getInstructionCollectionDeclare(self) -> str:
         """Сформировать выражение объявления коллекции инструкций"""
 
+    @abstractmethod
+    def _getSignatureDeclare(self, signature: bytes) -> str:
+        """Сформировать выражение объявления подписи окружения, для которого сгенерирована коллекция инструкций"""
+
 
 @dataclass(frozen=True)
 class PythonSourceFunctionArgument:
@@ -125,6 +137,9 @@ class PythonInstructionSourceGenerator(InstructionSourceGenerator, PythonSourceG
     def _getInstructionCollectionDeclare(self) -> str:
         return f"INSTRUCTIONS = {ReprTool.iter(self.instruction_names)}\n"
 
+    def _getSignatureDeclare(self, signature: bytes) -> str:
+        return f"SIGNATURE = bytes.fromhex({signature.hex()!r})\n{self.docString('Подпись окружения (ProgramContainer.signature): порядок INSTRUCTIONS соответствует индексам инструкций')}"
+
     def _getFileHeadedLines(self, env: Environment) -> str:
         enf_info = f"env: '{env.name}' from {env.parent!r}"
         return f"{self.docString(enf_info)}{self.importClass(Interpreter)}\n\n"
@@ -136,24 +151,200 @@ class PythonInstructionSourceGenerator(InstructionSourceGenerator, PythonSourceG
         super().__init__()
         self.gs = GenerationSettings(
             vm_instance="vm",
-            vm_class=Interpreter.__name__,
-            vm_method_ipReadPrimitive="ipReadPrimitive",
-            vm_method_ipReadHeapPointer="ipReadHeapPointer"
+            vm_class=Interpreter.__name__
         )
 
-    def __processArgStatement(self, i: int, arg: EnvironmentInstructionArgument) -> str:
-        rv = self.gs.strCall_ipReadPrimitive(arg.primitive_type) if arg.pointing_type is None else self.gs.strCall_ipReadHeapPointer()
-        return f"{arg.reprShakeCase()}_{i} = {rv}"
+    def __processArgument(self, i: int, arg: EnvironmentInstructionArgument) -> PythonSourceFunctionArgument:
+        return PythonSourceFunctionArgument(f"{arg.reprShakeCase()}_{i}", self.gs.strOperandAnnotation(arg))
 
     def _process(self, instruction: EnvironmentInstruction) -> str:
         return self.pythonFunc(
             self._processInstructionName(instruction),
             (
                 PythonSourceFunctionArgument(self.gs.vm_instance, self.gs.vm_class),
+                *(self.__processArgument(index, arg) for index, arg in enumerate(instruction.arguments))
             ),
-            (
-                self.__processArgStatement(index, arg)
-                for index, arg in enumerate(instruction.arguments)
-            ),
+            (),
             doc_string=instruction.__repr__()
         )
+
+
+@dataclass(frozen=True, kw_only=True)
+class CompiledProgram:
+    """Программа, скомпилированная в Python-функцию"""
+
+    bytecode_filepath: str
+    """Путь к байткоду (Из него загружается куча при каждом запуске)"""
+    source: str
+    """Исходный код блоков, известных на момент компиляции"""
+    function: Callable[[Interpreter], None]
+    """Функция программы"""
+
+    def run(self, vm: Interpreter) -> int:
+        vm.load(self.bytecode_filepath)
+
+        try:
+            self.function(vm)
+
+        finally:
+            vm.getOutput().flush()
+            vm.unload()
+
+        return vm.getExitCode()
+
+
+class BasicBlockCompiler(PythonSourceGenerator):
+    """
+    Компилятор байткода в Python-функцию.
+    Код разбивается на базовые блоки по адресам меток и после инструкций передачи управления.
+    Каждый блок - линейная последовательность вызовов обработчиков с операндами-литералами,
+    блоки связаны через словарь диспетчеризации по адресу.
+    Блок по адресу, не известному при компиляции (переход внутрь блока), компилируется при первом обращении.
+    Инструкции передачи управления определяются по обработчикам (isStraight): после обработчика,
+    который может перейти или завершить программу, блок продолжается с указателя программы ВМ
+    """
+
+    STRAIGHT_NAMES: ClassVar[frozenset[str]] = frozenset((
+        "i8", "u8", "i16", "u16", "i32", "u32", "i64", "u64", "f32", "f64",
+        "stackPushPrimitive", "stackPopPrimitive", "addressStackPop", "addressWritePrimitive", "addressReadPrimitive",
+        "stdoutWrite", "addressPrint",
+        "abs", "bool", "chr", "divmod", "float", "int", "len", "max", "min", "ord", "pow", "round", "str",
+    ))
+    """Имена (методы ВМ и встроенные функции), обращение к которым не передаёт управление и не завершает программу"""
+
+    @classmethod
+    def isStraight(cls, handler: InstructionHandler) -> bool:
+        """
+        Обработчик не может передать управление: функция Python без замыканий и значений по умолчанию,
+        которая (вместе с вложенными функциями) обращается только к STRAIGHT_NAMES.
+        Остальные обработчики считаются инструкциями передачи управления
+        """
+        if (code := getattr(handler, "__code__", None)) is None or handler.__defaults__ or handler.__kwdefaults__:
+            return False
+
+        return cls.__isStraightCode(code)
+
+    @classmethod
+    def __isStraightCode(cls, code: CodeType) -> bool:
+        if code.co_freevars or not cls.STRAIGHT_NAMES.issuperset(code.co_names):
+            return False
+
+        return all(cls.__isStraightCode(const) for const in code.co_consts if isinstance(const, CodeType))
+
+    def __init__(self, env: Environment, instructions: tuple[InstructionHandler, ...]) -> None:
+        self.__instructions = instructions
+        self.__environment_instructions: dict[int, EnvironmentInstruction] = {ins.index: ins for ins in env.instructions.values()}
+        self.__control_indexes = frozenset(index for index, handler in enumerate(instructions) if not self.isStraight(handler))
+
+        self.gs = GenerationSettings(
+            vm_instance="vm",
+            vm_class=Interpreter.__name__
+        )
+
+
+    @staticmethod
+    def __blockName(address: int) -> str:
+        return f"__block_{address:04X}"
+
+    @staticmethod
+    def __literal(value: int | float) -> str:
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"float({value.__repr__()!r})"
+
+        return value.__repr__()
+
+    def __handlerName(self, index: int) -> str:
+        return self.__environment_instructions[index].reprShakeCase()
+
+    def __vmArgument(self) -> PythonSourceFunctionArgument:
+        return PythonSourceFunctionArgument(self.gs.vm_instance, self.gs.vm_class)
+
+    def __processBlock(self, vm: Interpreter, leaders: set[int], start: int) -> str:
+        """Сгенерировать исходный код базового блока, начинающегося с адреса (vm - ВМ с загруженной программой)"""
+        lines = list[str]()
+        end = vm.getCodeEnd()
+        address = start
+
+        while True:
+            index, operands, next_address = vm.decodeInstruction(address)
+            call = f"{self.__handlerName(index)}{ReprTool.iter((self.gs.vm_instance, *map(self.__literal, operands)))}"
+
+            if index in self.__control_indexes:
+                lines.append(f"{self.gs.vm_instance}.ipJump({next_address})")
+                lines.append(call)
+                lines.append(f"return {self.gs.vm_instance}.getProgramPointer()")
+                break
+
+            lines.append(call)
+
+            if next_address in leaders or next_address >= end:
+                lines.append(f"return {next_address}")
+                break
+
+            address = next_address
+
+        return self.pythonFunc(self.__blockName(start), (self.__vmArgument(),), lines, returns=int.__name__)
+
+    def __findLeaders(self, vm: Interpreter, start: int, marks: Iterable[int]) -> set[int]:
+        """Найти адреса начала базовых блоков"""
+        ret = {start, *marks}
+        address = start
+        end = vm.getCodeEnd()
+
+        while address < end:
+            index, _, address = vm.decodeInstruction(address)
+
+            if index in self.__control_indexes and address < end:
+                ret.add(address)
+
+        return ret
+
+    def __compileBlock(self, namespace: dict[str, object], leaders: set[int], vm: Interpreter, address: int) -> Callable[[Interpreter], int]:
+        """Скомпилировать блок по адресу, не известному при компиляции программы. vm - исполняющая программу ВМ"""
+        leaders.add(address)
+        exec(compile(self.__processBlock(vm, leaders, address), f"<bytelang block {address:04X}>", "exec"), namespace)
+        block = namespace["BLOCKS"][address] = namespace[self.__blockName(address)]
+        return block
+
+    def compile(self, vm: Interpreter, bytecode_filepath: PathLike | str, marks: Iterable[int] = ()) -> CompiledProgram:
+        """
+        Скомпилировать программу
+        :param vm: Интерпретатор, в который программа загружается на время компиляции для декодирования.
+        Блоки, не известные при компиляции, декодируются исполняющей ВМ
+        :param bytecode_filepath: путь к байткоду
+        :param marks: адреса меток (ProgramData.marks) - дополнительные начала блоков
+        """
+        vm.load(bytecode_filepath)
+
+        try:
+            start = vm.getProgramPointer()
+            leaders = self.__findLeaders(vm, start, marks)
+            blocks = tuple(self.__processBlock(vm, leaders, address) for address in sorted(leaders))
+
+        finally:
+            vm.unload()
+
+        dispatch = ReprTool.iter((f"{address}: {self.__blockName(address)}" for address in sorted(leaders)), l_paren="{", r_paren="}")
+        source = "".join((
+            *blocks,
+            f"BLOCKS = {dispatch}\n\n\n",
+            self.pythonFunc(
+                "program",
+                (self.__vmArgument(),),
+                (
+                    f"address = {start}",
+                    f"while {self.gs.vm_instance}.isRunning():",
+                    f"    address = (BLOCKS.get(address) or COMPILE_BLOCK({self.gs.vm_instance}, address))({self.gs.vm_instance})",
+                ),
+                doc_string=f"{str(bytecode_filepath)!r}"
+            )
+        ))
+
+        namespace = {
+            Interpreter.__name__: Interpreter,
+            **{self.__handlerName(index): handler for index, handler in enumerate(self.__instructions)}
+        }
+        namespace["COMPILE_BLOCK"] = functools.partial(self.__compileBlock, namespace, leaders)
+        exec(compile(source, f"<bytelang program {bytecode_filepath}>", "exec"), namespace)
+
+        return CompiledProgram(bytecode_filepath=str(bytecode_filepath), source=source, function=namespace["program"])
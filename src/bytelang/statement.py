@@ -7,17 +7,33 @@ from enum import Flag
 from enum import auto
 from typing import Optional
 
+from bytelang.expressions import ExpressionNode
 from bytelang.tools import ReprTool
 
 
+def _nestedParentheses(depth: int) -> str:
+    """Шаблон скобок с вложенностью не глубже depth"""
+    ret = r"\([^()]*\)"
+
+    for _ in range(depth - 1):
+        ret = rf"\((?:[^()]|{ret})*\)"
+
+    return ret
+
+
 class Regex:
-    IDENTIFIER = r"^[a-zA-Z_][a-zA-Z\d_]*$"
-    CHAR = r"^'.'$"
-    INTEGER = r"^0$|^([+-]?[1-9][\d_]*)$"
-    EXPONENT = r"^[-+]?\d+[.]\d+([eE][-+]?\d+)?$"
-    HEX_VALUE = r"^0[xX][_\da-fA-F]+$"
-    OCT_VALUE = r"^[+-]?0[_0-7]+$"
-    BIN_VALUE = r"^0[bB][_01]+$"
+    """Шаблоны лексем (без привязки к началу и концу строки)"""
+
+    IDENTIFIER = r"[a-zA-Z_][a-zA-Z\d_]*"
+    CHAR = r"'\S'"
+    INTEGER = r"0|[+-]?[1-9][\d_]*"
+    EXPONENT = r"[-+]?\d+[.]\d+(?:[eE][-+]?\d+)?"
+    HEX_VALUE = r"0[xX][_\da-fA-F]+"
+    OCT_VALUE = r"[+-]?0[_0-7]+"
+    BIN_VALUE = r"0[bB][_01]+"
+
+    EXPRESSION = rf"(?:[^\s()]|{_nestedParentheses(8)})+"
+    """Константное выражение: без пробелов вне скобок"""
 
     NAME = r"[_a-zA-Z\d]+"
 
@@ -41,9 +57,10 @@ class ArgumentValueType(Flag):
     INTEGER = auto()
     EXPONENT = auto()
     IDENTIFIER = auto()
+    EXPRESSION = auto()
 
     NUMBER = INTEGER | EXPONENT
-    ANY = IDENTIFIER | NUMBER
+    ANY = IDENTIFIER | NUMBER | EXPRESSION
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -54,6 +71,7 @@ class UniversalArgument:
     integer: Optional[int]
     exponent: Optional[float]
     identifier: Optional[str]
+    expression: Optional[ExpressionNode] = None
 
     @staticmethod
     def fromName(name: str) -> UniversalArgument:
@@ -65,9 +83,23 @@ class UniversalArgument:
 
     @staticmethod
     def fromExponent(value: float) -> UniversalArgument:
-        return UniversalArgument(type=ArgumentValueType.NUMBER, integer=math.floor(value), exponent=value, identifier=None)
+        """
+        Вещественное значение: целое представление - отброшенная дробная часть, в выражениях используется вещественное
+        :raises ValueError: значение бесконечно или не является числом
+        """
+        if not math.isfinite(value):
+            raise ValueError(f"{value} is not a finite number")
+
+        return UniversalArgument(type=ArgumentValueType.EXPONENT, integer=math.floor(value), exponent=value, identifier=None)
+
+    @staticmethod
+    def fromExpression(expression: ExpressionNode) -> UniversalArgument:
+        return UniversalArgument(type=ArgumentValueType.EXPRESSION, integer=None, exponent=None, identifier=None, expression=expression)
 
     def __repr__(self) -> str:
+        if self.expression is not None:
+            return f"[{self.expression}]"
+
         if self.identifier is None:
             return f"{{ {self.integer} | {self.exponent} }}"
 
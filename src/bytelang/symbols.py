@@ -0,0 +1,125 @@
+"""Таблица символов (констант) программы"""
+
+from __future__ import annotations
+
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+from bytelang.content import PrimitiveType
+from bytelang.errors import ExpressionError
+from bytelang.expressions import ExpressionContext
+from bytelang.expressions import ExpressionParser
+from bytelang.expressions import Number
+from bytelang.statement import ArgumentValueType
+from bytelang.statement import UniversalArgument
+
+
+class SymbolTable(ExpressionContext):
+    """
+    Таблица констант программы.
+    Хранит исходные определения (значение, псевдоним или выражение)
+    и однократно вычисленные числовые значения, поэтому цепочки псевдонимов разрешаются за константное время
+    """
+
+    def __init__(self, primitives: Callable[[str], Optional[PrimitiveType]]) -> None:
+        self.__primitives = primitives
+        self.__definitions = dict[str, UniversalArgument]()
+        self.__resolved = dict[str, UniversalArgument]()
+        self.__addresses = set[str]()
+        self.__address_dependent = dict[str, bool]()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__definitions
+
+    def clear(self) -> None:
+        self.__definitions.clear()
+        self.__resolved.clear()
+        self.__addresses.clear()
+        self.__address_dependent.clear()
+
+    def define(self, name: str, value: UniversalArgument, *, address: bool = False) -> None:
+        """
+        Добавить константу (address - константа является адресом метки или переменной). Переопределение не допускается.
+        Значение вычисляется сразу: используемые идентификаторы уже разрешены, поэтому глубина вычисления не растёт с длиной цепочки
+        """
+        if name in self.__definitions:
+            raise ExpressionError(f"Идентификатор {name} уже используется")
+
+        self.__definitions[name] = value
+
+        try:
+            self.resolve(name)
+
+        except ExpressionError:
+            del self.__definitions[name]
+            raise
+
+        if address:
+            self.__addresses.add(name)
+
+        self.__nameDependsOnAddress(name)
+
+    def getDefinitions(self) -> dict[str, UniversalArgument]:
+        """Исходные определения констант"""
+        return self.__definitions
+
+    def sizeOf(self, typename: str) -> int:
+        if (primitive := self.__primitives(typename)) is None:
+            raise ExpressionError(f"{ExpressionParser.SIZEOF}: неизвестный тип {typename}")
+
+        return primitive.size
+
+    def resolve(self, name: str) -> UniversalArgument:
+        """Числовое значение константы (вычисляется один раз)"""
+        if (value := self.__resolved.get(name)) is not None:
+            return value
+
+        if (definition := self.__definitions.get(name)) is None:
+            raise ExpressionError(f"Идентификатор {name} не определён")
+
+        value = self.__resolved[name] = self.evaluate(definition)
+        return value
+
+    def resolveNumber(self, name: str) -> Number:
+        """Значение константы в выражении: вещественная константа остаётся вещественной, как и литерал, которым она определена"""
+        value = self.resolve(name)
+        return value.integer if ArgumentValueType.INTEGER in value.type else value.exponent
+
+    def evaluate(self, argument: UniversalArgument) -> UniversalArgument:
+        """Привести аргумент (число, идентификатор или выражение) к числовому значению"""
+        if argument.expression is not None:
+            value = argument.expression.evaluate(self)
+
+            try:
+                return UniversalArgument.fromInteger(value) if isinstance(value, int) else UniversalArgument.fromExponent(value)
+
+            except (OverflowError, ValueError):
+                raise ExpressionError(f"Значение выражения {argument.expression} не представимо числом")
+
+        if argument.identifier is not None:
+            return self.resolve(argument.identifier)
+
+        return argument
+
+    def names(self, argument: UniversalArgument) -> Iterable[str]:
+        """Идентификаторы, непосредственно используемые аргументом"""
+        if argument.expression is not None:
+            return argument.expression.names()
+
+        if argument.identifier is not None:
+            return argument.identifier,
+
+        return ()
+
+    def dependsOnAddress(self, argument: UniversalArgument) -> bool:
+        """Зависит ли значение аргумента (через любые цепочки констант) от адреса метки или переменной"""
+        return any(map(self.__nameDependsOnAddress, self.names(argument)))
+
+    def __nameDependsOnAddress(self, name: str) -> bool:
+        if (ret := self.__address_dependent.get(name)) is None:
+            ret = self.__address_dependent[name] = name in self.__addresses or (
+                    name in self.__definitions and self.dependsOnAddress(self.__definitions[name])
+            )
+
+        return ret
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import glob
 import json
+import mmap
 from io import StringIO
 from os import PathLike
 from pathlib import Path
@@ -32,6 +34,31 @@ class FileTool:
         with open(filepath, "rb") as f:
             return f.read()
 
+    @classmethod
+    def mapBytes(cls, filepath: PathLike | str) -> mmap.mmap:
+        """Отобразить файл в память только для чтения"""
+        with open(filepath, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def collect(cls, patterns: Iterable[PathLike | str], extension: str) -> tuple[Path, ...]:
+        """Собрать файлы с расширением по путям: файл, каталог (рекурсивно) или glob-шаблон"""
+        ret = dict[Path, None]()
+
+        for pattern in patterns:
+            path = Path(pattern)
+
+            if path.is_dir():
+                ret.update(dict.fromkeys(sorted(path.rglob(f"*.{extension}"))))
+
+            elif path.is_file():
+                ret[path] = None
+
+            else:
+                ret.update(dict.fromkeys(sorted(Path(p) for p in glob.glob(str(pattern), recursive=True) if p.endswith(f".{extension}"))))
+
+        return tuple(ret.keys())
+
     @classmethod
     def readJSON(cls, filepath: str | Path) -> dict | list:
         with open(filepath) as f:
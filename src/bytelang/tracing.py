@@ -0,0 +1,242 @@
+"""Запись трассы исполнения в компактный двоичный журнал и чтение её для воспроизведения"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from os import PathLike
+from struct import Struct
+from typing import BinaryIO
+from typing import ClassVar
+from typing import Iterator
+from typing import Optional
+
+from bytelang.errors import InterpreterError
+
+
+class TraceFormat:
+    """
+    Формат журнала:
+    заголовок, записи шагов и контрольных точек, индекс контрольных точек, завершение (смещение индекса)
+    """
+
+    MAGIC: ClassVar[bytes] = b"BLTR"
+    VERSION: ClassVar[int] = 1
+
+    HEADER: ClassVar[Struct] = Struct("<4sBI")
+    """Сигнатура, версия, интервал контрольных точек"""
+    STEP: ClassVar[Struct] = Struct("<BIHH")
+    """Вид, адрес инструкции, индекс инструкции, количество записей в кучу"""
+    WRITE: ClassVar[Struct] = Struct("<IH")
+    """Адрес, размер записанных байт"""
+    CHECKPOINT: ClassVar[Struct] = Struct("<BQIqBII")
+    """Вид, номер шага, указатель программы, код завершения, флаг исполнения, размер кучи, размер стека"""
+    INDEX_ENTRY: ClassVar[Struct] = Struct("<QQ")
+    """Номер шага, смещение контрольной точки"""
+    FOOTER: ClassVar[Struct] = Struct("<QQ4s")
+    """Смещение индекса, количество контрольных точек, сигнатура"""
+
+    KIND_STEP: ClassVar[int] = 1
+    KIND_CHECKPOINT: ClassVar[int] = 2
+
+
+@dataclass(frozen=True, kw_only=True)
+class TraceStep:
+    """Запись шага исполнения"""
+
+    step: int
+    """Номер шага (исполненная инструкция с номером step переводит ВМ в состояние шага step)"""
+    address: int
+    """Адрес исполненной инструкции"""
+    index: int
+    """Индекс инструкции"""
+    writes: tuple[tuple[int, bytes], ...]
+    """Записи в кучу: (адрес, записанные байты)"""
+
+
+@dataclass(frozen=True, kw_only=True)
+class TraceCheckpoint:
+    """Полное состояние ВМ после шага step"""
+
+    step: int
+    program_pointer: int
+    exit_code: int
+    running: bool
+    heap: bytes
+    stack: bytes
+
+
+class TraceWriter:
+    """Буферизованная запись трассы исполнения"""
+
+    def __init__(self, filepath: PathLike | str, checkpoint_interval: int = 4096, buffer_size: int = 1 << 16) -> None:
+        self.__file: BinaryIO = open(filepath, "wb", buffering=buffer_size)
+        self.__checkpoint_interval = checkpoint_interval
+        """Через сколько шагов сохраняется контрольная точка"""
+        self.__index = list[tuple[int, int]]()
+        self.__writes = list[tuple[int, bytes]]()
+        self.__address = 0
+        self.__instruction_index = 0
+        self.__step = 0
+
+        self.__file.write(TraceFormat.HEADER.pack(TraceFormat.MAGIC, TraceFormat.VERSION, checkpoint_interval))
+
+    def getStep(self) -> int:
+        """Количество записанных шагов"""
+        return self.__step
+
+    def needCheckpoint(self) -> bool:
+        return self.__step % self.__checkpoint_interval == 0 and (not self.__index or self.__index[-1][0] != self.__step)
+
+    def beginStep(self, address: int, index: int) -> None:
+        self.__address = address
+        self.__instruction_index = index
+        self.__writes.clear()
+
+    def recordWrite(self, address: int, data: bytes) -> None:
+        self.__writes.append((address, data))
+
+    def endStep(self) -> None:
+        f = self.__file
+        f.write(TraceFormat.STEP.pack(TraceFormat.KIND_STEP, self.__address, self.__instruction_index, len(self.__writes)))
+
+        for address, data in self.__writes:
+            f.write(TraceFormat.WRITE.pack(address, len(data)))
+            f.write(data)
+
+        self.__step += 1
+
+    def checkpoint(self, program_pointer: int, exit_code: int, running: bool, heap: bytes, stack: bytes) -> None:
+        """Сохранить полное состояние ВМ после текущего шага"""
+        self.__index.append((self.__step, self.__file.tell()))
+        self.__file.write(TraceFormat.CHECKPOINT.pack(TraceFormat.KIND_CHECKPOINT, self.__step, program_pointer, exit_code, running, len(heap), len(stack)))
+        self.__file.write(heap)
+        self.__file.write(stack)
+
+    def close(self) -> None:
+        if self.__file.closed:
+            return
+
+        index_offset = self.__file.tell()
+
+        for step, offset in self.__index:
+            self.__file.write(TraceFormat.INDEX_ENTRY.pack(step, offset))
+
+        self.__file.write(TraceFormat.FOOTER.pack(index_offset, len(self.__index), TraceFormat.MAGIC))
+        self.__file.close()
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class TraceReader:
+    """Чтение трассы и восстановление состояния кучи на любом шаге по ближайшей контрольной точке"""
+
+    def __init__(self, filepath: PathLike | str) -> None:
+        self.__file: BinaryIO = open(filepath, "rb")
+        magic, version, _ = TraceFormat.HEADER.unpack(self.__read(TraceFormat.HEADER.size))
+
+        if magic != TraceFormat.MAGIC or version != TraceFormat.VERSION:
+            raise InterpreterError(f"Not a trace file (version {TraceFormat.VERSION}): {filepath}")
+
+        self.__file.seek(-TraceFormat.FOOTER.size, 2)
+        self.__end, count, magic = TraceFormat.FOOTER.unpack(self.__read(TraceFormat.FOOTER.size))
+
+        if magic != TraceFormat.MAGIC:
+            raise InterpreterError(f"Trace file is not closed properly: {filepath}")
+
+        self.__file.seek(self.__end)
+        self.__index: tuple[tuple[int, int], ...] = tuple(
+            TraceFormat.INDEX_ENTRY.unpack(self.__read(TraceFormat.INDEX_ENTRY.size))
+            for _ in range(count)
+        )
+        """(номер шага, смещение) контрольных точек по возрастанию шага"""
+
+    def __read(self, size: int) -> bytes:
+        if len(data := self.__file.read(size)) != size:
+            raise InterpreterError("Unexpected end of trace")
+
+        return data
+
+    def getCheckpointSteps(self) -> tuple[int, ...]:
+        return tuple(step for step, _ in self.__index)
+
+    def findCheckpoint(self, step: int) -> TraceCheckpoint:
+        """Ближайшая контрольная точка не позже шага step"""
+        offset: Optional[int] = None
+
+        for checkpoint_step, checkpoint_offset in self.__index:
+            if checkpoint_step > step:
+                break
+
+            offset = checkpoint_offset
+
+        if offset is None:
+            raise InterpreterError(f"No checkpoint before step {step}")
+
+        self.__file.seek(offset)
+        return self.__readCheckpoint()
+
+    def __readCheckpoint(self) -> TraceCheckpoint:
+        _, step, program_pointer, exit_code, running, heap_size, stack_size = TraceFormat.CHECKPOINT.unpack(self.__read(TraceFormat.CHECKPOINT.size))
+        return TraceCheckpoint(
+            step=step,
+            program_pointer=program_pointer,
+            exit_code=exit_code,
+            running=bool(running),
+            heap=self.__read(heap_size),
+            stack=self.__read(stack_size)
+        )
+
+    def steps(self, start: int = 0) -> Iterator[TraceStep]:
+        """
+        Записи шагов после шага start (чтение начинается с ближайшей контрольной точки).
+        Чтение других данных трассы во время перебора сбивает позицию
+        """
+        checkpoint = self.findCheckpoint(start)
+        step = checkpoint.step
+
+        while self.__file.tell() < self.__end:
+            kind = self.__read(1)[0]
+            self.__file.seek(-1, 1)
+
+            if kind == TraceFormat.KIND_CHECKPOINT:
+                self.__readCheckpoint()
+                continue
+
+            _, address, index, count = TraceFormat.STEP.unpack(self.__read(TraceFormat.STEP.size))
+            writes = list[tuple[int, bytes]]()
+
+            for _ in range(count):
+                write_address, size = TraceFormat.WRITE.unpack(self.__read(TraceFormat.WRITE.size))
+                writes.append((write_address, self.__read(size)))
+
+            step += 1
+
+            if step > start:
+                yield TraceStep(step=step, address=address, index=index, writes=tuple(writes))
+
+    def heapAt(self, step: int) -> bytes:
+        """Содержимое кучи после шага step без повторного исполнения"""
+        checkpoint = self.findCheckpoint(step)
+        heap = bytearray(checkpoint.heap)
+
+        for record in self.steps(checkpoint.step):
+            if record.step > step:
+                break
+
+            for address, data in record.writes:
+                heap[address:address + len(data)] = data
+
+        return bytes(heap)
+
+    def close(self) -> None:
+        self.__file.close()
+
+    def __enter__(self) -> TraceReader:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -0,0 +1,335 @@
+"""
+Синхронное (lockstep) исполнение одной программы над множеством куч с помощью NumPy.
+Требует необязательный пакет numpy
+"""
+
+from __future__ import annotations
+
+from os import PathLike
+from typing import Optional
+
+try:
+    import numpy as np
+
+except ImportError as _e:
+    raise ImportError("bytelang.vectorized requires numpy (pip install numpy)") from _e
+
+from bytelang.content import Environment
+from bytelang.content import PrimitiveType
+from bytelang.errors import InterpreterError
+from bytelang.interpreters import InstructionHandler
+from bytelang.interpreters import Interpreter
+from bytelang.registries import PrimitivesRegistry
+from bytelang.sinks import MemorySink
+from bytelang.sinks import OutputSink
+
+LaneValue = int | float | np.ndarray
+"""Значение, общее для всех дорожек, или массив значений по дорожкам"""
+
+_OutputEvent = tuple[Optional[int], Optional[PrimitiveType], np.ndarray | str]
+"""Вывод: адрес, тип и значения по дорожкам или текст (адрес и тип None)"""
+
+
+class _Divergence(Exception):
+    """Обработчику нужно одно значение, а значения дорожек различаются"""
+
+
+class _LaneArray(np.ndarray):
+    """
+    Значения по дорожкам. Приведение к bool, int или float (ветвление обработчика по значению)
+    допустимо, только если значения всех дорожек равны, иначе дорожки расходятся по управлению
+    """
+
+    def __uniform(self) -> int | float:
+        values = self.view(np.ndarray)
+        first = values.flat[0]
+
+        if not (values == first).all():
+            raise _Divergence()
+
+        return first.item()
+
+    def __bool__(self) -> bool:
+        return bool(self.__uniform())
+
+    def __int__(self) -> int:
+        return int(self.__uniform())
+
+    def __float__(self) -> float:
+        return float(self.__uniform())
+
+    def __index__(self) -> int:
+        return int(self.__uniform())
+
+
+class LockstepInterpreter:
+    """
+    Исполнитель одной программы над N кучами одновременно.
+    Куча - двумерный массив uint8 (дорожка, адрес), значения примитивных типов читаются как типизированные столбцы,
+    поэтому каждая инструкция применяется ко всем дорожкам одной операцией NumPy.
+    Обработчики инструкций те же, что и у Interpreter.
+    Значения читаются расширенными до 64 бит, а при записи проверяется диапазон типа, как и в Interpreter.
+    Если дорожки расходятся по управлению (переход по разным адресам или ветвление обработчика по значению),
+    каждая дорожка исполняется заново отдельно обычным интерпретатором с её начальной кучей.
+    Вывод дорожек копится и передаётся приёмникам после исполнения, поэтому при расхождении не повторяется
+    """
+
+    SLICE: int = 1 << 16
+    """Количество инструкций за один вызов step при исполнении отдельной дорожки"""
+
+    def __init__(self, env: Environment, primitives: PrimitivesRegistry, instructions: tuple[InstructionHandler, ...], lanes: int, signature: Optional[bytes] = None) -> None:
+        self.i8 = primitives.get("i8")
+        self.u8 = primitives.get("u8")
+        self.i16 = primitives.get("i16")
+        self.u16 = primitives.get("u16")
+        self.i32 = primitives.get("i32")
+        self.u32 = primitives.get("u32")
+        self.i64 = primitives.get("i64")
+        self.u64 = primitives.get("u64")
+        self.f32 = primitives.get("f32")
+        self.f64 = primitives.get("f64")
+
+        self.__lanes = lanes
+        self.__instructions = instructions
+        self.__scalar = Interpreter(env, primitives, instructions, signature)
+        """Декодирование программы и исполнение дорожек при расхождении"""
+        self.__dtypes = dict[PrimitiveType, np.dtype]()
+
+        self.__heap = np.zeros((lanes, 0), np.uint8)
+        self.__initial_heap = self.__heap
+        self.__stack = np.zeros((lanes, env.profile.stack_size), np.uint8)
+        self.__stack_pointer = 0
+        self.__code_start = 0
+        self.__program_pointer = 0
+        self.__running = False
+        self.__diverged = False
+        self.__exit_code: LaneValue = 0
+        self.__bytecode_filepath: Optional[PathLike | str] = None
+        self.__decoded = dict[int, tuple[int, tuple[int | float, ...], int]]()
+
+        self.__outputs: list[OutputSink] = [MemorySink() for _ in range(lanes)]
+        """Приёмники вывода по дорожкам"""
+        self.__pending = list[_OutputEvent]()
+        """Вывод синхронного исполнения, ещё не переданный приёмникам"""
+
+    def __dtype(self, primitive: PrimitiveType) -> np.dtype:
+        if (ret := self.__dtypes.get(primitive)) is None:
+            ret = self.__dtypes[primitive] = np.dtype(primitive.packer.format)
+
+        return ret
+
+    def __column(self, buffer: np.ndarray, address: int, primitive: PrimitiveType) -> np.ndarray:
+        """Типизированный столбец (представление без копирования) значений по адресу во всех дорожках"""
+        if address < 0 or address + primitive.size > buffer.shape[1]:
+            raise InterpreterError(f"Access {primitive} at {address} out of region (size {buffer.shape[1]})")
+
+        return buffer[:, address:address + primitive.size].view(self.__dtype(primitive))[:, 0]
+
+    @staticmethod
+    def __widen(column: np.ndarray) -> _LaneArray:
+        """Копия значений в 64-битном типе: арифметика обработчиков не переполняется молча в узком типе"""
+        match column.dtype.kind:
+            case "f":
+                dtype = np.float64
+
+            case "u" if column.dtype.itemsize == 8:
+                dtype = np.uint64
+
+            case _:
+                dtype = np.int64
+
+        return column.astype(dtype).view(_LaneArray)
+
+    @staticmethod
+    def __store(column: np.ndarray, primitive: PrimitiveType, value: LaneValue) -> None:
+        """Запись с проверкой диапазона типа (NumPy при присваивании молча отбрасывает старшие биты)"""
+        values = np.asarray(value)
+
+        if values.size == 0:
+            return
+
+        if column.dtype.kind in "iu":
+            if values.dtype.kind not in "iubO":
+                raise InterpreterError(f"Write {primitive}: required argument is not an integer ({values.dtype})")
+
+            info = np.iinfo(column.dtype)
+            low, high = int(values.min()), int(values.max())
+
+            if low < info.min or high > info.max:
+                raise InterpreterError(f"Write {primitive}: value out of range {info.min} <= [{low}, {high}] <= {info.max}")
+
+        else:
+            try:
+                values = values.astype(np.float64)
+
+            except OverflowError as e:
+                raise InterpreterError(f"Write {primitive}: {e}") from e
+
+            finite = values[np.isfinite(values)]
+
+            if finite.size and np.abs(finite).max() > np.finfo(column.dtype).max:
+                raise InterpreterError(f"Write {primitive}: float too large to pack")
+
+        column[:] = values
+
+    def getOutputs(self) -> list[OutputSink]:
+        return self.__outputs
+
+    def getHeaps(self) -> np.ndarray:
+        """Кучи всех дорожек (дорожка, адрес)"""
+        return self.__heap
+
+    def getExitCodes(self) -> np.ndarray:
+        return np.broadcast_to(np.asarray(self.__exit_code), (self.__lanes,)).copy()
+
+    def getProgramPointer(self) -> int:
+        return self.__program_pointer
+
+    def isRunning(self) -> bool:
+        return self.__running
+
+    def load(self, bytecode_filepath: PathLike | str) -> None:
+        """Загрузить программу. Кучи всех дорожек заполняются начальными значениями из файла"""
+        self.__scalar.load(bytecode_filepath)
+        self.__bytecode_filepath = bytecode_filepath
+        self.__code_start = self.__scalar.getCodeStart()
+        self.__heap = np.tile(np.frombuffer(self.__scalar.getHeap(), np.uint8), (self.__lanes, 1))
+        self.__decoded.clear()
+
+    def addressWritePrimitive(self, address: int, primitive: PrimitiveType, value: LaneValue) -> None:
+        """Запись значения (или значений по дорожкам) по адресу"""
+        if address >= self.__code_start:
+            raise InterpreterError(f"Write {primitive} to code segment at {address}")
+
+        self.__store(self.__column(self.__heap, address, primitive), primitive, value)
+
+    def addressReadPrimitive(self, address: int, primitive: PrimitiveType) -> LaneValue:
+        """Считать значения по адресу во всех дорожках"""
+        if address < self.__code_start:
+            return self.__widen(self.__column(self.__heap, address, primitive))
+
+        return self.__scalar.addressReadPrimitive(address, primitive)
+
+    def stackPushPrimitive(self, primitive: PrimitiveType, value: LaneValue) -> None:
+        sp = self.__stack_pointer
+
+        if sp + primitive.size > self.__stack.shape[1]:
+            raise InterpreterError(f"Stack overflow: push {primitive} at {sp} (stack size {self.__stack.shape[1]})")
+
+        self.__store(self.__column(self.__stack, sp, primitive), primitive, value)
+        self.__stack_pointer = sp + primitive.size
+
+    def stackPopPrimitive(self, primitive: PrimitiveType) -> np.ndarray:
+        sp = self.__stack_pointer - primitive.size
+
+        if sp < 0:
+            raise InterpreterError(f"Stack underflow: pop {primitive} at {self.__stack_pointer}")
+
+        self.__stack_pointer = sp
+        return self.__widen(self.__column(self.__stack, sp, primitive))
+
+    def addressStackPop(self, address: int, primitive: PrimitiveType) -> None:
+        self.addressWritePrimitive(address, primitive, self.stackPopPrimitive(primitive))
+
+    def ipJump(self, address: LaneValue) -> None:
+        """Переход. Разные адреса в дорожках - расхождение по управлению"""
+        addresses = np.unique(np.asarray(address))
+
+        if addresses.size != 1:
+            self.__diverged = True
+            return
+
+        self.__program_pointer = int(addresses[0])
+
+    def setExitCode(self, code: LaneValue) -> None:
+        self.__exit_code = code
+        self.__running = False
+
+    def stdoutWrite(self, value: str) -> None:
+        self.__pending.append((None, None, value))
+
+    def addressPrint(self, address: int, primitive: PrimitiveType) -> None:
+        values = np.broadcast_to(np.asarray(self.addressReadPrimitive(address, primitive)), (self.__lanes,))
+        self.__pending.append((address, primitive, values))
+
+    def __flushPending(self) -> None:
+        """Передать накопленный вывод приёмникам дорожек"""
+        for lane, output in enumerate(self.__outputs):
+            for address, primitive, value in self.__pending:
+                if primitive is None:
+                    output.writeText(value)
+
+                else:
+                    output.writeValue(address, primitive, value[lane].item())
+
+            output.flush()
+
+        self.__pending.clear()
+
+    def __decode(self, address: int) -> tuple[int, tuple[int | float, ...], int]:
+        if (ret := self.__decoded.get(address)) is None:
+            ret = self.__decoded[address] = self.__scalar.decodeInstruction(address)
+
+        return ret
+
+    def execute(self) -> np.ndarray:
+        """
+        Исполнить загруженную программу во всех дорожках
+        :return: коды завершения по дорожкам
+        """
+        self.__initial_heap = self.__heap.copy()
+        self.__program_pointer = self.__code_start
+        self.__stack_pointer = 0
+        self.__running = True
+        self.__diverged = False
+        self.__pending.clear()
+
+        try:
+            while self.__running:
+                index, operands, self.__program_pointer = self.__decode(self.__program_pointer)
+                self.__instructions[index](self, *operands)
+
+                if self.__diverged:
+                    break
+
+        except _Divergence:
+            self.__diverged = True
+
+        if self.__diverged:
+            # Вывод синхронной части отбрасывается: дорожки выведут его заново
+            self.__pending.clear()
+            self.__runLanes()
+
+        else:
+            self.__flushPending()
+
+        return self.getExitCodes()
+
+    def run(self, bytecode_filepath: PathLike | str) -> np.ndarray:
+        """Загрузить и исполнить программу. Отображение файла освобождается после исполнения, как и в Interpreter.run"""
+        self.load(bytecode_filepath)
+
+        try:
+            return self.execute()
+
+        finally:
+            self.__scalar.unload()
+
+    def __runLanes(self) -> None:
+        """Исполнить каждую дорожку заново отдельным интерпретатором с её начальной кучей"""
+        exit_codes = np.zeros(self.__lanes, np.int64)
+
+        for lane in range(self.__lanes):
+            output = self.__outputs[lane]
+            self.__scalar.setOutput(output)
+            self.__scalar.load(self.__bytecode_filepath, self.__initial_heap[lane].tobytes())
+
+            while self.__scalar.isRunning():
+                self.__scalar.step(self.SLICE)
+
+            output.flush()
+            exit_codes[lane] = self.__scalar.getExitCode()
+            self.__heap[lane] = np.frombuffer(self.__scalar.getHeap(), np.uint8)
+
+        self.__exit_code = exit_codes
+        self.__running = False
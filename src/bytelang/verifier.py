@@ -0,0 +1,83 @@
+"""Проверка байткода перед исполнением"""
+
+from __future__ import annotations
+
+import struct
+from typing import Optional
+
+from bytelang.content import Environment
+from bytelang.content import EnvironmentInstruction
+
+
+class ByteCodeVerifier:
+    """
+    Однократная проверка программы: допустимость индексов инструкций,
+    попадание операндов-указателей в кучу и завершение сегмента кода на границе инструкции
+    """
+
+    MAX_ERRORS: int = 16
+    """После скольких ошибок проверка прекращается"""
+
+    def __init__(self, env: Environment) -> None:
+        self.__profile = env.profile
+        self.__opcodes = env.opcodes
+        self.__instructions: dict[int, EnvironmentInstruction] = {ins.index: ins for ins in env.instructions.values()}
+
+    def run(self, program: bytes | memoryview) -> tuple[str, ...]:
+        """
+        Проверить программу (заголовок, кучу и сегмент кода)
+        :return: описания найденных ошибок. Пустой кортеж - программа корректна
+        """
+        errors = list[str]()
+        heap_pointer = self.__profile.pointer_heap
+
+        if len(program) < heap_pointer.size:
+            return f"Program size {len(program)} is less than the heap pointer size {heap_pointer.size}",
+
+        code_start = heap_pointer.packer.unpack_from(program, 0)[0]
+
+        if not heap_pointer.size <= code_start <= len(program):
+            return f"Code start address {code_start} out of program [{heap_pointer.size}, {len(program)}]",
+
+        address = code_start
+
+        while address < len(program) and len(errors) < self.MAX_ERRORS:
+            error, size = self.__checkInstruction(program, address, code_start)
+
+            if error is not None:
+                errors.append(error)
+
+            if size is None:
+                break
+
+            address += size
+
+        if not errors and address != len(program):
+            errors.append(f"Code segment does not end on an instruction boundary ({address} != {len(program)})")
+
+        return tuple(errors)
+
+    def __checkInstruction(self, program: bytes | memoryview, address: int, code_start: int) -> tuple[Optional[str], Optional[int]]:
+        """Проверить инструкцию по адресу: (ошибка, размер инструкции или None, если продолжать проверку невозможно)"""
+        try:
+            index, offset = self.__opcodes.read(program, address)
+
+        except (IndexError, struct.error):
+            return f"Truncated instruction index at {address:04X}", None
+
+        if (ins := self.__instructions.get(index)) is None:
+            return f"Invalid instruction index {index} at {address:04X}", None
+
+        if address + ins.size > len(program):
+            return f"Truncated instruction {ins} at {address:04X}", None
+
+        for i, arg in enumerate(ins.arguments):
+            if arg.pointing_type is not None:
+                pointer = arg.primitive_type.packer.unpack_from(program, offset)[0]
+
+                if not self.__profile.pointer_heap.size <= pointer <= code_start - arg.pointing_type.size:
+                    return f"Pointer operand ({i}) {pointer} of {ins} at {address:04X} out of heap [{self.__profile.pointer_heap.size}, {code_start})", ins.size
+
+            offset += arg.primitive_type.size
+
+        return None, ins.size
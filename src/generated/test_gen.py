@@ -2,16 +2,16 @@
 from bytelang.interpreters import Interpreter
 
 
-def __avr_test_exit__u8(vm: Interpreter) -> None:
+def __avr_test_exit__u8(vm: Interpreter, u8_0: int) -> None:
     """[2B] test::exit@0(std::u8)"""
-    const_u8_0 = vm.ipReadPrimitive(vm.u8)
-    vm.setExitCode(const_u8_0)
+    vm.setExitCode(u8_0)
 
 
-def __avr_test_print__u32_ptr(vm: Interpreter) -> None:
+def __avr_test_print__u32_ptr(vm: Interpreter, u32_ptr_0: int) -> None:
     """[2B] test::print@1(std::u8*(std::u32))"""
-    var_u32_0 = vm.ipReadHeapPointer()
-    vm.stdoutWrite(f"|> {vm.addressReadPrimitive(var_u32_0, vm.u32)}\n")
+    vm.addressPrint(u32_ptr_0, vm.u32)
 
 
 INSTRUCTIONS = (__avr_test_exit__u8, __avr_test_print__u32_ptr)
+SIGNATURE = bytes.fromhex('cd1a62aa67ec3b9bfc89bae38ad26932')
+"""Подпись окружения (ProgramContainer.signature): порядок INSTRUCTIONS соответствует индексам инструкций"""
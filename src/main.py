@@ -6,6 +6,7 @@ from bytelang.interpreters import Interpreter
 from bytelang.processors import LogFlag
 from bytelang.tools import FileTool
 from generated.test_gen import INSTRUCTIONS
+from generated.test_gen import SIGNATURE
 
 # Рабочие папки
 base_folder = PurePath(r"A:\Projects\ByteLang")
@@ -33,7 +34,7 @@ def run(filename: str, log_flags: LogFlag = LogFlag.ALL) -> None:
 
 def execute(bytecode_filepath: PathLike, env: str) -> None:
     """Исполнить байткод программу"""
-    vm = Interpreter(bl.environment_registry.get(env), bl.primitives_registry, INSTRUCTIONS)
+    vm = Interpreter(bl.environment_registry.get(env), bl.primitives_registry, INSTRUCTIONS, SIGNATURE)
     ret = vm.run(bytecode_filepath)
     print(f"Программа Bytelang завершена с кодом {ret}")
 
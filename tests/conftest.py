@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from bytelang import ByteLang  # noqa: E402
+from bytelang.interpreters import Interpreter  # noqa: E402
+from bytelang.sinks import MemorySink  # noqa: E402
+
+
+def _exit(vm: Interpreter, code: int) -> None:
+    vm.setExitCode(code)
+
+
+def _print(vm: Interpreter, address: int) -> None:
+    vm.addressPrint(address, vm.u32)
+
+
+def _print8(vm: Interpreter, address: int) -> None:
+    vm.addressPrint(address, vm.u8)
+
+
+def _inc(vm: Interpreter, address: int) -> None:
+    vm.addressWritePrimitive(address, vm.i16, vm.addressReadPrimitive(address, vm.i16) + 1)
+
+
+def _write(vm: Interpreter, char: int) -> None:
+    vm.stdoutWrite(chr(char))
+
+
+def _push32(vm: Interpreter, value: int) -> None:
+    vm.stackPushPrimitive(vm.u32, value)
+
+
+def _pop32(vm: Interpreter, address: int) -> None:
+    vm.addressStackPop(address, vm.u32)
+
+
+def _pop16(vm: Interpreter, address: int) -> None:
+    vm.addressStackPop(address, vm.u16)
+
+
+def _pop8(vm: Interpreter, address: int) -> None:
+    vm.addressStackPop(address, vm.u8)
+
+
+TEST_ENV_INSTRUCTIONS = (_exit, _print, _print8, _inc, _write, _push32, _pop32, _pop16, _pop8)
+"""Обработчики окружения test_env (пакет base) в порядке индексов"""
+
+
+@pytest.fixture
+def data_folder() -> Path:
+    return ROOT / "data"
+
+
+@pytest.fixture
+def bl(data_folder: Path) -> ByteLang:
+    ret = ByteLang()
+    ret.setDataFolder(data_folder)
+    return ret
+
+
+@pytest.fixture
+def compile_source(bl: ByteLang, tmp_path: Path) -> Callable[..., Path]:
+    """Скомпилировать исходный код, вернуть путь байткода"""
+
+    def ret(source: str, **kwargs) -> Path:
+        source_filepath = tmp_path / "program.bls"
+        source_filepath.write_text(source)
+        bytecode_filepath = tmp_path / "program.blc"
+        assert bl.compile(source_filepath, bytecode_filepath, **kwargs) is not None, bl.getErrorsLog()
+        return bytecode_filepath
+
+    return ret
+
+
+@pytest.fixture
+def execute(bl: ByteLang) -> Callable[[Path], tuple[int, str]]:
+    """Исполнить байткод в окружении test_env, вернуть код завершения и вывод"""
+
+    def ret(bytecode_filepath: Path) -> tuple[int, str]:
+        vm = Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, TEST_ENV_INSTRUCTIONS)
+        sink = MemorySink()
+        vm.setOutput(sink)
+        code = vm.run(bytecode_filepath)
+        vm.unload()
+        return code, sink.getValue()
+
+    return ret
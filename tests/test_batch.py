@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+
+from bytelang.batch import BatchExecutor
+from bytelang.batch import BatchSettings
+
+INSTRUCTIONS_MODULE = """
+from conftest import TEST_ENV_INSTRUCTIONS
+
+
+def _jump(vm, address):
+    vm.ipJump(address)
+
+
+INSTRUCTIONS = tuple(_jump if i == 4 else handler for i, handler in enumerate(TEST_ENV_INSTRUCTIONS))
+"""
+"""Обработчики test_env, write - переход по адресу"""
+
+SOURCE = """
+.env test_env
+.ptr u32 A {value}
+print A
+exit {value}
+"""
+
+LOOP = ".env test_env\nwrite 1\n"
+"""Бесконечный цикл на начало кода"""
+
+
+@pytest.fixture
+def settings(data_folder, tmp_path, monkeypatch):
+    (tmp_path / "batch_instructions.py").write_text(INSTRUCTIONS_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def ret(**kwargs) -> BatchSettings:
+        return BatchSettings(data_folder=str(data_folder), environment="test_env", instructions_module="batch_instructions", **kwargs)
+
+    return ret
+
+
+@pytest.fixture
+def compile_to(bl, tmp_path):
+    def ret(name: str, source: str) -> str:
+        source_filepath = tmp_path / f"{name}.bls"
+        source_filepath.write_text(source)
+        assert bl.compile(source_filepath, tmp_path / f"{name}.blc") is not None, bl.getErrorsLog()
+        return str(tmp_path / f"{name}.blc")
+
+    return ret
+
+
+def test_batch_results(settings, compile_to, tmp_path):
+    programs = [compile_to(f"p{i}", SOURCE.format(value=i)) for i in range(5)]
+    missing = str(tmp_path / "missing.blc")
+    results = {r.bytecode_filepath: r for r in BatchExecutor(settings(), 2).run((*programs, missing))}
+
+    for i, program in enumerate(programs):
+        result = results[program]
+        assert result.error is None
+        assert (result.exit_code, result.output, result.instructions) == (i, f"|> {i}\n", 2)
+
+    assert results[missing].exit_code is None
+    assert results[missing].error is not None
+
+
+def test_batch_instruction_limit(settings, compile_to):
+    loop = compile_to("loop", LOOP)
+    program = compile_to("program", SOURCE.format(value=1))
+    results = {r.bytecode_filepath: r for r in BatchExecutor(settings(instruction_limit=1000), 1).run((loop, program))}
+
+    assert results[loop].exit_code is None
+    assert results[loop].instructions == 1000
+    assert "ExecutionLimitError" in results[loop].error
+    # Превышение лимита одной программой не влияет на следующую в том же процессе
+    assert (results[program].exit_code, results[program].output) == (1, "|> 1\n")
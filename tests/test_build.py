@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from bytelang.build import BuildExecutor
+from bytelang.build import BuildSettings
+from bytelang.processors import LogFlag
+
+SOURCE = """
+.env test_env
+.ptr u32 A {value}
+print A
+exit 0
+"""
+
+
+def test_outputs_next_to_sources(tmp_path):
+    sources = tmp_path / "a.bls", tmp_path / "sub" / "b.bls"
+    assert BuildExecutor.outputs(sources) == {str(s): str(s.with_suffix(".blc")) for s in sources}
+
+
+def test_outputs_mirror_source_tree(tmp_path):
+    sources = tmp_path / "src" / "a.bls", tmp_path / "src" / "x" / "b.bls", tmp_path / "src" / "x" / "y" / "c.bls"
+    out = tmp_path / "out"
+    assert BuildExecutor.outputs(sources, out) == {
+        str(sources[0]): str(out / "a.blc"),
+        str(sources[1]): str(out / "x" / "b.blc"),
+        str(sources[2]): str(out / "x" / "y" / "c.blc"),
+    }
+
+
+def test_outputs_single_source(tmp_path):
+    source = tmp_path / "src" / "x" / "a.bls"
+    assert BuildExecutor.outputs((source,), tmp_path / "out") == {str(source): str(tmp_path / "out" / "a.blc")}
+    assert BuildExecutor.outputs((), tmp_path / "out") == {}
+
+
+def test_build_matches_compilation(data_folder, tmp_path, compile_source):
+    sources = list[Path]()
+
+    for i, folder in enumerate(("", "x", "x/y")):
+        (tmp_path / "src" / folder).mkdir(parents=True, exist_ok=True)
+        sources.append(tmp_path / "src" / folder / f"p{i}.bls")
+        sources[-1].write_text(SOURCE.format(value=i))
+
+    broken = tmp_path / "src" / "broken.bls"
+    broken.write_text(".env test_env\nunknown 1\n")
+    outputs = BuildExecutor.outputs((*sources, broken), tmp_path / "out")
+    settings = BuildSettings(data_folder=str(data_folder), listing_flags=LogFlag.ALL)
+    results = {r.source_filepath: r for r in BuildExecutor(settings, 2).run(outputs)}
+
+    assert results.keys() == outputs.keys()
+    assert not results[str(broken)].success()
+    assert results[str(broken)].program_size is None
+    assert not Path(outputs[str(broken)]).exists()
+
+    for i, source in enumerate(sources):
+        result = results[str(source)]
+        assert result.success(), result.errors
+        assert Path(result.bytecode_filepath).read_bytes() == compile_source(SOURCE.format(value=i)).read_bytes()
+        assert result.program_size == Path(result.bytecode_filepath).stat().st_size
+        assert Path(f"{result.bytecode_filepath}.txt").exists()
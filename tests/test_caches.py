@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import replace
+
+from bytelang import ByteLang
+from bytelang.caches import RegistryCache
+from bytelang.content import PrimitiveWriteType
+
+SOURCE = """
+.env test_env
+.ptr u32 A 7
+print A
+exit 0
+"""
+
+
+def test_restored_outputs_are_independent(bl, data_folder, tmp_path):
+    """Перекомпиляция одного восстановленного из кэша файла не изменяет другие"""
+    bl.setCompileCache(tmp_path / "cache")
+    sources = tmp_path / "s2.bls", tmp_path / "s3.bls"
+    outputs = tmp_path / "o2.blc", tmp_path / "o3.blc"
+
+    for source in sources:
+        source.write_text(SOURCE)
+
+    bl.compile(sources[0], tmp_path / "first.blc")
+
+    for source, output in zip(sources, outputs):
+        assert bl.compile(source, output) is not None
+
+    expected = outputs[1].read_bytes()
+    sources[0].write_text(SOURCE.replace("7", "9"))
+
+    uncached = ByteLang()
+    uncached.setDataFolder(data_folder)
+    assert uncached.compile(sources[0], outputs[0]) is not None
+    assert outputs[0].read_bytes() != expected
+    assert outputs[1].read_bytes() == expected
+
+
+def test_cache_hit_matches_compilation(bl, tmp_path):
+    source = tmp_path / "program.bls"
+    source.write_text(SOURCE)
+    reference = tmp_path / "reference.blc"
+    assert bl.compile(source, reference) is not None
+
+    bl.setCompileCache(tmp_path / "cache")
+    bl.compile(source, tmp_path / "miss.blc")
+    result = bl.compile(source, tmp_path / "hit.blc")
+
+    assert result is not None and result.bytecode_filepath == str(tmp_path / "hit.blc")
+    assert (tmp_path / "hit.blc").read_bytes() == reference.read_bytes()
+
+
+def _rewrite(path, data, mtime_ns):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_registry_cache_json_staleness(tmp_path):
+    source = tmp_path / "data.json"
+    _rewrite(source, {"value": 1}, 10 ** 18)
+    cache = RegistryCache(tmp_path / "cache")
+    assert cache.readJSON(source) == {"value": 1}
+
+    # Совпадают время изменения и размер - файл считается неизменным без чтения
+    _rewrite(source, {"value": 2}, 10 ** 18)
+    assert RegistryCache(tmp_path / "cache").readJSON(source) == {"value": 1}
+
+    # Изменилось время, содержимое то же - запись действительна
+    _rewrite(source, {"value": 1}, 2 * 10 ** 18)
+    assert RegistryCache(tmp_path / "cache").readJSON(source) == {"value": 1}
+
+    # Изменилось время и содержимое при том же размере - проверка по хешу
+    _rewrite(source, {"value": 3}, 3 * 10 ** 18)
+    assert RegistryCache(tmp_path / "cache").readJSON(source) == {"value": 3}
+
+    # Изменился размер
+    _rewrite(source, {"value": 30}, 3 * 10 ** 18)
+    assert RegistryCache(tmp_path / "cache").readJSON(source) == {"value": 30}
+
+
+def test_registry_cache_environment(bl, tmp_path):
+    bl.setCache(tmp_path / "cache")
+    env = bl.environment_registry.get("test_env")
+    cache = RegistryCache(tmp_path / "cache")
+    primitives = bl.primitives_registry.get
+
+    assert cache.getEnvironment(env.parent, primitives) == env
+
+    u32 = primitives("u32")
+    changed = replace(u32, write_type=PrimitiveWriteType.signed)
+    assert cache.getEnvironment(env.parent, lambda name: changed if name == "u32" else primitives(name)) is None
+    assert cache.getEnvironment(env.parent, lambda name: None if name == "u32" else primitives(name)) is None
+
+
+def test_registry_cache_corrupted(bl, tmp_path):
+    (tmp_path / "cache").write_bytes(b"not a cache")
+    bl.setCache(tmp_path / "cache")
+    assert bl.environment_registry.get("test_env").name == "test_env"
+    assert RegistryCache(tmp_path / "cache").getEnvironment(bl.environment_registry.get("test_env").parent, bl.primitives_registry.get) is not None
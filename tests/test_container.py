@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+from conftest import TEST_ENV_INSTRUCTIONS
+
+from bytelang.container import ProgramContainer
+from bytelang.errors import ContainerError
+from bytelang.errors import InterpreterError
+from bytelang.interpreters import Interpreter
+
+SOURCE = """
+.env test_env
+.ptr u32 A 7
+.ptr i16 B 3
+print A
+inc B
+exit 2
+"""
+
+SIGNATURE_OFFSET = 20
+"""Смещение подписи окружения в заголовке контейнера"""
+
+
+def _corrupt(path, offset):
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0xFF
+    path.write_bytes(data)
+
+
+def test_pack_round_trip(bl, compile_source):
+    program = compile_source(SOURCE).read_bytes()
+    container = compile_source(SOURCE, container=True).read_bytes()
+    env = bl.environment_registry.get("test_env")
+
+    assert ProgramContainer.isContainer(container)
+    assert not ProgramContainer.isContainer(program)
+    header = ProgramContainer.readHeader(container)
+    assert bytes(ProgramContainer.payload(container, header)) == program
+    assert header.signature == ProgramContainer.signature(env)
+
+    restored, primitives = ProgramContainer.readEnvironment(container)
+    assert ProgramContainer.signature(restored) == ProgramContainer.signature(env)
+    assert {name: ins.index for name, ins in restored.instructions.items()} == {name: ins.index for name, ins in env.instructions.items()}
+    assert primitives.get("u32").size == 4
+
+
+def test_container_runs_like_program(compile_source, execute):
+    expected = execute(compile_source(SOURCE))
+    assert execute(compile_source(SOURCE, container=True)) == expected == (2, "|> 7\n")
+
+
+def test_streaming_container_matches(compile_source):
+    expected = compile_source(SOURCE, container=True).read_bytes()
+    assert compile_source(SOURCE, container=True, streaming=True).read_bytes() == expected
+
+
+def test_checksum_corruption_rejected(compile_source, execute):
+    bytecode = compile_source(SOURCE, container=True)
+    _corrupt(bytecode, ProgramContainer.PAYLOAD_OFFSET + 1)
+
+    with pytest.raises(ContainerError, match="checksum"):
+        ProgramContainer.readEnvironment(bytecode.read_bytes())
+
+    with pytest.raises(InterpreterError, match="checksum"):
+        execute(bytecode)
+
+
+def test_signature_mismatch_rejected(compile_source, execute):
+    bytecode = compile_source(SOURCE, container=True)
+    _corrupt(bytecode, SIGNATURE_OFFSET)
+
+    with pytest.raises(ContainerError, match="signature"):
+        ProgramContainer.readEnvironment(bytecode.read_bytes())
+
+    with pytest.raises(InterpreterError, match="another environment"):
+        execute(bytecode)
+
+
+def test_other_environment_rejected(bl, compile_source):
+    bytecode = compile_source(SOURCE, container=True)
+    vm = Interpreter(bl.environment_registry.get("test_gen"), bl.primitives_registry, TEST_ENV_INSTRUCTIONS[:2])
+
+    with pytest.raises(InterpreterError, match="another environment"):
+        vm.run(bytecode)
+
+
+def test_truncated_container_rejected(compile_source):
+    data = compile_source(SOURCE, container=True).read_bytes()
+
+    with pytest.raises(ContainerError):
+        ProgramContainer.readHeader(data[:-1])
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+from conftest import TEST_ENV_INSTRUCTIONS
+
+from bytelang.errors import InterpreterError
+from bytelang.interpreters import ExecutionMode
+from bytelang.interpreters import Interpreter
+from bytelang.sinks import MemorySink
+
+SOURCE = """
+.env test_env
+.ptr u32 A {value}
+print A
+exit 0
+"""
+
+
+@pytest.mark.parametrize("mode", (ExecutionMode.DECODING, ExecutionMode.THREADED))
+def test_run_releases_mapping(bl, compile_source, mode):
+    vm = Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, TEST_ENV_INSTRUCTIONS)
+    sink = MemorySink()
+    vm.setOutput(sink)
+    vm.run(compile_source(SOURCE.format(value=1)), mode)
+
+    with pytest.raises(InterpreterError):
+        vm.snapshot()
+
+    # Перекомпиляция в тот же файл после run: исполняется новая программа
+    vm.run(compile_source(SOURCE.format(value=2)), mode)
+    assert sink.getValue() == "|> 1\n|> 2\n"
+
+
+FUSION_SOURCE = """
+.env test_env
+.ptr u32 A 0
+.ptr u16 B 0
+""" + "push32 1\npop32 A\npush32 2\npop16 B\nprint A\ninc B\n" * 10 + "exit 0\n"
+
+
+def _jump(vm: Interpreter, address: int) -> None:
+    vm.ipJump(address)
+
+
+def _runModes(bl, bytecode, instructions, pairs=None) -> list[tuple[int, bytes, str]]:
+    ret = list[tuple[int, bytes, str]]()
+
+    for mode in (ExecutionMode.DECODING, ExecutionMode.THREADED, ExecutionMode.FUSED):
+        vm = Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, instructions)
+        vm.setFusedPairs(pairs)
+        sink = MemorySink()
+        vm.setOutput(sink)
+        vm.load(bytecode)
+        code = vm.resume(mode)
+        ret.append((code, vm.getHeap(), sink.getValue()))
+        vm.unload()
+
+    return ret
+
+
+def test_fused_matches_threaded(bl, compile_source):
+    decoding, threaded, fused = _runModes(bl, compile_source(FUSION_SOURCE), TEST_ENV_INSTRUCTIONS)
+    assert decoding == threaded == fused
+    assert fused[2] == "|> 1\n" * 10
+
+
+def test_fused_jump_into_pair(bl, compile_source):
+    env = bl.environment_registry.get("test_env")
+    push, write = env.instructions["push32"].size, env.instructions["write"].size
+    # Переход (write) на вторую инструкцию слитой пары push32, pop32
+    target = 1 + 4 + push + write + push
+    source = f".env test_env\n.ptr u32 A 0\npush32 5\nwrite {target}\npush32 7\npop32 A\nprint A\nexit 0\n"
+    instructions = tuple(_jump if i == 4 else handler for i, handler in enumerate(TEST_ENV_INSTRUCTIONS))
+    decoding, threaded, fused = _runModes(bl, compile_source(source), instructions, (("push32", "pop32"), ("write", "push32")))
+    assert decoding == threaded == fused
+    assert fused[2] == "|> 5\n"
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from bytelang import ByteLang
+from conftest import ROOT
+
+UNREACHABLE = """
+.env {env}
+.ptr u32 A 0
+push32 1
+pop32 A
+push32 2
+pop32 A
+exit 0
+print A
+"""
+"""Перекрытая запись и код после exit"""
+
+SPLIT_POPS = """
+.env {env}
+.ptr u16 L 0
+.ptr u16 H 0
+push32 0x12345678
+pop16 H
+pop16 L
+exit 0
+"""
+"""Две половины одного значения"""
+
+MERGED_POP = """
+.env {env}
+.ptr u32 A 0
+push32 0x12345678
+pop32 A
+exit 0
+"""
+
+
+@pytest.fixture
+def custom_bl(tmp_path: Path) -> ByteLang:
+    """Копия папки данных, в которую тест добавляет свои окружения и пакеты"""
+    shutil.copytree(ROOT / "data", tmp_path / "data")
+    ret = ByteLang()
+    ret.setDataFolder(tmp_path / "data")
+    return ret
+
+
+def _addEnvironment(tmp_path: Path, name: str, packages: list[str], semantics: dict[str, str]) -> None:
+    data = {"profile": "avr", "packages": packages, "semantics": semantics}
+    (tmp_path / "data" / "environments" / f"{name}.json").write_text(json.dumps(data))
+
+
+def _compile(bl: ByteLang, tmp_path: Path, source: str, **kwargs) -> bytes:
+    source_filepath = tmp_path / "program.bls"
+    source_filepath.write_text(source)
+    bytecode_filepath = tmp_path / "program.blc"
+    assert bl.compile(source_filepath, bytecode_filepath, **kwargs) is not None, bl.getErrorsLog()
+    return bytecode_filepath.read_bytes()
+
+
+def test_declared_semantics_optimize(custom_bl, tmp_path):
+    source = UNREACHABLE.format(env="test_env")
+    assert len(_compile(custom_bl, tmp_path, source, optimize=True)) < len(_compile(custom_bl, tmp_path, source))
+
+
+def test_undeclared_instructions_untouched(custom_bl, tmp_path):
+    _addEnvironment(tmp_path, "plain", ["base"], {})
+    source = UNREACHABLE.format(env="plain")
+    assert _compile(custom_bl, tmp_path, source, optimize=True) == _compile(custom_bl, tmp_path, source)
+
+
+def test_semantics_must_match_signature(custom_bl, tmp_path):
+    _addEnvironment(tmp_path, "wrong", ["base"], {"print": "push"})
+
+    with pytest.raises(ValueError, match="does not match semantics"):
+        custom_bl.environment_registry.get("wrong")
+
+
+def test_semantics_for_unknown_instruction(custom_bl, tmp_path):
+    _addEnvironment(tmp_path, "unknown", ["base"], {"pop128": "pop"})
+
+    with pytest.raises(ValueError, match="pop128"):
+        custom_bl.environment_registry.get("unknown")
+
+
+def test_merge_ignores_float_pop(custom_bl, tmp_path):
+    # popf объявлен после pop32 и имеет тот же размер: склеенные половины должны записываться целочисленным pop
+    (tmp_path / "data" / "packages" / "float.blp").write_text("popf f32*\n")
+    semantics = {"exit": "exit", "push32": "push", "pop32": "pop", "pop16": "pop", "popf": "pop"}
+    _addEnvironment(tmp_path, "float_env", ["base", "float"], semantics)
+
+    optimized = _compile(custom_bl, tmp_path, SPLIT_POPS.format(env="float_env"), optimize=True)
+    assert optimized == _compile(custom_bl, tmp_path, MERGED_POP.format(env="float_env"))
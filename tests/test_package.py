@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+import bytelang
+from conftest import ROOT
+
+BASELINE_NAMES = (
+    "ByteLang",
+    "CompileResult",
+    "Compiler",
+    "Environment",
+    "EnvironmentsRegistry",
+    "ErrorHandler",
+    "InstructionSourceGenerator",
+    "Interpreter",
+    "Language",
+    "PackageRegistry",
+    "PrimitivesRegistry",
+    "ProfileRegistry",
+)
+"""Имена, доступные из пакета до отложенной загрузки модулей"""
+
+
+@pytest.mark.parametrize("name", BASELINE_NAMES)
+def test_public_names(name):
+    value = getattr(bytelang, name)
+    assert value.__name__ == name
+    assert name in dir(bytelang)
+
+
+def test_import_is_lazy():
+    # Отдельный процесс: в текущем модули уже загружены другими тестами
+    code = "import sys, bytelang; print(sorted(m for m in sys.modules if m.startswith('bytelang.')))"
+    result = subprocess.run((sys.executable, "-c", code), capture_output=True, text=True, check=True, env={"PYTHONPATH": str(ROOT / "src")})
+    assert result.stdout.strip() == "[]"
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError):
+        getattr(bytelang, "Missing")
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import gc
+import io
+
+import pytest
+
+from bytelang.handlers import ErrorHandler
+from bytelang.parsers import ChunkedStatementParser
+from bytelang.parsers import StatementParser
+from bytelang.statement import ArgumentValueType
+from bytelang.statement import StatementType
+
+SOURCE = "".join(f"push32 {i}\npop32 A+{i}\n?bad{i}\n# comment\n\n" for i in range(50))
+"""Выражения, ошибки разбора, комментарии и пустые строчки"""
+
+
+def _parse(parser_type, *args):
+    err = ErrorHandler()
+    statements = tuple(map(str, parser_type(err, *args).run(io.StringIO(SOURCE))))
+    return statements, err.getMessages()
+
+
+def test_chunked_matches_sequential():
+    statements, messages = _parse(StatementParser)
+    assert messages
+    assert _parse(ChunkedStatementParser, 2, 7) == (statements, messages)
+    assert gc.isenabled()
+
+
+def test_chunked_keeps_gc_between_chunks():
+    statements = ChunkedStatementParser(ErrorHandler(), 2, 3).run(io.StringIO(SOURCE))
+    assert next(statements) is not None
+    # Сборка мусора приостанавливается только на распаковку части, а не на всё время жизни генератора
+    assert gc.isenabled()
+    statements.close()
+
+
+def _parseLine(line: str):
+    err = ErrorHandler()
+    return StatementParser(err)._parseLine(1, line), err.getMessages()
+
+
+@pytest.mark.parametrize("line, kind, head", (
+    (".def X 1", StatementType.DIRECTIVE_USE, "def"),
+    ("L1:", StatementType.MARK_DECLARE, "L1"),
+    ("exit", StatementType.INSTRUCTION_CALL, "exit"),
+    ("push32   7", StatementType.INSTRUCTION_CALL, "push32"),
+))
+def test_lexer_head(line, kind, head):
+    statement, messages = _parseLine(line)
+    assert not messages
+    assert (statement.type, statement.head) == (kind, head)
+
+
+@pytest.mark.parametrize("lexeme, value", (
+    ("0", 0),
+    ("42", 42),
+    ("-5", -5),
+    ("1_000", 1000),
+    ("0x1F", 31),
+    ("0b101", 5),
+    ("017", 15),
+    ("'a'", 97),
+))
+def test_lexer_integer_arguments(lexeme, value):
+    statement, messages = _parseLine(f"push32 {lexeme}")
+    assert not messages
+    argument, = statement.arguments
+    assert argument.type == ArgumentValueType.NUMBER
+    assert argument.integer == value
+
+
+def test_lexer_exponent_argument():
+    statement, messages = _parseLine("push32 1.5e2")
+    assert not messages
+    argument, = statement.arguments
+    assert argument.type == ArgumentValueType.EXPONENT
+    assert (argument.integer, argument.exponent) == (150, 150.0)
+
+
+def test_lexer_identifier_and_expressions():
+    statement, messages = _parseLine(".def X A (1 + 2)*3 A+1")
+    assert not messages
+    name, identifier, grouped, offset = statement.arguments
+    assert (name.identifier, identifier.identifier) == ("X", "A")
+    assert grouped.type == offset.type == ArgumentValueType.EXPRESSION
+    assert grouped.expression.evaluate(None) == 9
+    assert set(offset.expression.names()) == {"A"}
+
+
+@pytest.mark.parametrize("line, message", (
+    ("+x 1", "тип выражения"),
+    ("push32 @@", "'@@' не распознана"),
+    ("push32 1.", "'1.' не распознана"),
+    ("push32 1 2.5.1", "(1) '2.5.1' не распознана"),
+))
+def test_lexer_errors(line, message):
+    statement, messages = _parseLine(line)
+    assert statement is None
+    assert len(messages) == 1 and message in messages[0]
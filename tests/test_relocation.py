@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+from bytelang.layout import HeapLayout
+
+SHARED_MARKS = """
+.env test_env
+.ptr u8 C 0
+.ptr u32 A 0
+L1:
+L2:
+push32 L1
+pop32 A
+print A
+push32 L2
+pop32 A
+print A
+exit 0
+"""
+"""Две метки по одному адресу"""
+
+
+@pytest.mark.parametrize("layout", list(HeapLayout))
+def test_shared_marks_layout(compile_source, execute, layout):
+    code, output = execute(compile_source(SHARED_MARKS, layout=layout))
+    first, second = output.splitlines()
+    assert code == 0
+    assert first == second
+
+
+def test_shared_marks_optimize(compile_source, execute):
+    # Первая пара push/pop перезаписывается следующей и удаляется - метки сдвигаются
+    source = SHARED_MARKS.replace("L1:", "push32 1\npop32 A\npush32 2\npop32 A\nL1:")
+    expected = execute(compile_source(source))
+    code, output = execute(compile_source(source, optimize=True))
+    first, second = output.splitlines()
+    assert first == second
+    assert first != expected[1].splitlines()[0]
+
+
+def test_shared_marks_constants(bl, tmp_path):
+    source = tmp_path / "program.bls"
+    source.write_text(SHARED_MARKS)
+    result = bl.compile(source, tmp_path / "program.blc", layout=HeapLayout.ALIGNED, optimize=True)
+    constants = result.program_data.constants
+    assert constants["L1"].integer == constants["L2"].integer
+    assert result.program_data.marks == {constants["L1"].integer: ("L1", "L2")}
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from conftest import TEST_ENV_INSTRUCTIONS
+
+from bytelang.errors import ExecutionLimitError
+from bytelang.errors import InterpreterError
+from bytelang.interpreters import Interpreter
+from bytelang.scheduler import ExecutionLimits
+from bytelang.scheduler import InterpreterScheduler
+from bytelang.sinks import MemorySink
+
+COUNTING = ".env test_env\n.ptr u32 A 0\n" + "push32 7\npop32 A\nprint A\n" * 4 + "exit 3\n"
+"""13 инструкций, 4 печати"""
+
+LOOP = ".env test_env\nwrite 1\n"
+"""write в этих тестах - переход по адресу: бесконечный цикл на начало кода (адрес 1)"""
+
+
+def _jump(vm: Interpreter, address: int) -> None:
+    vm.ipJump(address)
+
+
+JUMP_INSTRUCTIONS = tuple(_jump if i == 4 else handler for i, handler in enumerate(TEST_ENV_INSTRUCTIONS))
+
+
+@pytest.fixture
+def make_vm(bl):
+    def ret(instructions=TEST_ENV_INSTRUCTIONS) -> tuple[Interpreter, MemorySink]:
+        vm = Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, instructions)
+        sink = MemorySink()
+        vm.setOutput(sink)
+        return vm, sink
+
+    return ret
+
+
+def test_step_budget(make_vm, compile_source):
+    vm, sink = make_vm()
+    vm.load(compile_source(COUNTING))
+    assert vm.step(5) == 5
+    assert vm.isRunning()
+    assert vm.step(100) == 8
+    assert not vm.isRunning()
+    assert vm.getExitCode() == 3
+    assert vm.step(100) == 0
+    vm.getOutput().flush()
+    assert sink.getValue() == "|> 7\n" * 4
+    vm.unload()
+
+
+def test_step_runs_off_the_end(make_vm, compile_source):
+    vm, _ = make_vm()
+    vm.load(compile_source(".env test_env\nwrite 65\n"))
+
+    with pytest.raises(InterpreterError, match="past the end"):
+        vm.step(10)
+
+    vm.unload()
+
+
+def test_step_jump_inside_instruction(make_vm, compile_source):
+    vm, _ = make_vm(JUMP_INSTRUCTIONS)
+    # Адрес 2 - операнд инструкции write
+    vm.load(compile_source(".env test_env\nwrite 2\n"))
+
+    with pytest.raises(InterpreterError, match="near 0002"):
+        vm.step(10)
+
+    vm.unload()
+
+
+def test_scheduler_runs_all(make_vm, compile_source):
+    vms = [make_vm() for _ in range(3)]
+    bytecode = compile_source(COUNTING)
+    codes = asyncio.run(InterpreterScheduler(slice_size=2).runAll((vm, bytecode) for vm, _ in vms))
+    assert codes == [3, 3, 3]
+
+    for vm, sink in vms:
+        assert sink.getValue() == "|> 7\n" * 4
+
+        # Отображение файла освобождено
+        with pytest.raises(InterpreterError):
+            vm.snapshot()
+
+
+def test_instruction_limit(make_vm, compile_source):
+    vm, _ = make_vm(JUMP_INSTRUCTIONS)
+    scheduler = InterpreterScheduler(slice_size=7)
+
+    with pytest.raises(ExecutionLimitError, match="Instruction limit 50"):
+        asyncio.run(scheduler.runUntilExit(vm, compile_source(LOOP), ExecutionLimits(instructions=50)))
+
+    assert asyncio.run(scheduler.runUntilExit(vm, compile_source(COUNTING), ExecutionLimits(instructions=13))) == 3
+
+
+def test_seconds_limit(make_vm, compile_source):
+    vm, _ = make_vm(JUMP_INSTRUCTIONS)
+    results = asyncio.run(InterpreterScheduler().runAll(((vm, compile_source(LOOP)),), ExecutionLimits(seconds=0.05)))
+    assert len(results) == 1 and isinstance(results[0], ExecutionLimitError)
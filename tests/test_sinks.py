@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from bytelang.sinks import BinarySink
+from bytelang.sinks import BufferedTextSink
+from bytelang.sinks import MemorySink
+
+
+@pytest.fixture
+def primitives(bl):
+    return bl.primitives_registry
+
+
+def test_binary_sink_round_trip(primitives):
+    stream = io.BytesIO()
+    sink = BinarySink(stream)
+    sink.writeValue(3, primitives.get("u8"), 200)
+    sink.writeValue(4, primitives.get("i16"), -2)
+    sink.writeValue(8, primitives.get("f64"), 0.5)
+    sink.writeText("текст\n")
+    stream.seek(0)
+
+    assert list(BinarySink.read(stream, primitives)) == [
+        (3, primitives.get("u8"), 200),
+        (4, primitives.get("i16"), -2),
+        (8, primitives.get("f64"), 0.5),
+        (BinarySink.TEXT_ADDRESS, None, "текст\n"),
+    ]
+
+
+def test_binary_sink_long_text(primitives):
+    stream = io.BytesIO()
+    text = "x" * 70000
+    BinarySink(stream).writeText(text)
+    stream.seek(0)
+    assert list(BinarySink.read(stream, primitives)) == [(BinarySink.TEXT_ADDRESS, None, text)]
+
+
+def test_buffered_sink_flushes_by_size():
+    stream = io.StringIO()
+    sink = BufferedTextSink(stream, flush_size=8)
+    sink.writeText("abc")
+    assert stream.getvalue() == ""
+
+    sink.writeText("defgh")
+    assert stream.getvalue() == "abcdefgh"
+
+    sink.writeValue(0, None, 1)
+    sink.flush()
+    assert stream.getvalue() == "abcdefgh|> 1\n"
+
+
+def test_memory_sink():
+    sink = MemorySink()
+    sink.writeValue(0, None, 5)
+    sink.writeText("a")
+    assert sink.getValue() == "|> 5\na"
+
+    sink.clear()
+    assert sink.getValue() == ""
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+from conftest import TEST_ENV_INSTRUCTIONS
+
+from bytelang.errors import InterpreterError
+from bytelang.interpreters import Interpreter
+from bytelang.sinks import MemorySink
+
+SOURCE = ".env test_env\n.ptr u32 A 0\n" + "".join(f"push32 {i}\npop32 A\nprint A\n" for i in range(1, 5)) + "exit 3\n"
+"""13 инструкций: после 4-й в стеке лежит значение 2"""
+
+
+def _heap(value: int) -> bytes:
+    """Куча программы: адрес начала кода (u8) и переменная A"""
+    return bytes((5,)) + value.to_bytes(4, "little")
+
+
+@pytest.fixture
+def make_vm(bl):
+    def ret() -> tuple[Interpreter, MemorySink]:
+        vm = Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, TEST_ENV_INSTRUCTIONS)
+        sink = MemorySink()
+        vm.setOutput(sink)
+        return vm, sink
+
+    return ret
+
+
+def _finish(vm: Interpreter, sink: MemorySink) -> tuple[int, bytes, str]:
+    sink.clear()
+    vm.step(100)
+    vm.getOutput().flush()
+    return vm.getExitCode(), vm.getHeap(), sink.getValue()
+
+
+def test_restore_continues_from_snapshot(make_vm, compile_source):
+    vm, sink = make_vm()
+    vm.load(compile_source(SOURCE))
+    vm.step(4)
+    snapshot = vm.snapshot()
+    assert snapshot.stack == (2).to_bytes(4, "little")
+    assert snapshot.running
+
+    expected = _finish(vm, sink)
+    assert expected == (3, _heap(4), "|> 2\n|> 3\n|> 4\n")
+    assert not vm.isRunning()
+
+    vm.restore(snapshot)
+    assert vm.isRunning()
+    assert vm.getHeap() == _heap(1)
+    assert _finish(vm, sink) == expected
+    vm.unload()
+
+
+def test_snapshot_is_independent_of_vm(make_vm, compile_source):
+    vm, sink = make_vm()
+    vm.load(compile_source(SOURCE))
+    vm.step(3)
+    snapshot = vm.snapshot()
+    heap = snapshot.heap
+    vm.step(100)
+    assert snapshot.heap == heap == _heap(1)
+    assert snapshot.stack == b""
+    vm.unload()
+
+
+def test_restore_into_another_interpreter(make_vm, compile_source):
+    vm, sink = make_vm()
+    vm.load(compile_source(SOURCE))
+    vm.step(7)
+    snapshot = vm.snapshot()
+    expected = _finish(vm, sink)
+    vm.unload()
+
+    other, other_sink = make_vm()
+    other.restore(snapshot)
+    assert _finish(other, other_sink) == expected
+    other.unload()
+
+
+def test_snapshot_requires_program(make_vm):
+    vm, _ = make_vm()
+
+    with pytest.raises(InterpreterError):
+        vm.snapshot()
+
+
+def test_restore_rejects_oversized_stack(make_vm, compile_source):
+    vm, _ = make_vm()
+    vm.load(compile_source(SOURCE))
+    snapshot = vm.snapshot()
+
+    with pytest.raises(InterpreterError, match="does not fit"):
+        vm.restore(replace(snapshot, stack=bytes(1024)))
+
+    vm.unload()
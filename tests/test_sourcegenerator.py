@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import shutil
+
+import pytest
+from conftest import TEST_ENV_INSTRUCTIONS
+
+from bytelang import ByteLang
+from bytelang.errors import InterpreterError
+from bytelang.interpreters import Interpreter
+from bytelang.sinks import MemorySink
+from bytelang.sourcegenerator import BasicBlockCompiler
+
+JUMP_SOURCE = """
+.env test_env
+.ptr u32 A 0
+push32 7
+pop32 A
+write {skip}
+print A
+exit 1
+print A
+exit 0
+"""
+"""write в этом тесте - переход вперёд на заданное количество байт"""
+
+
+def _jump(vm: Interpreter, offset: int) -> None:
+    vm.ipJump(vm.getProgramPointer() + offset)
+
+
+def _generate(bl: ByteLang, env: str, folder):
+    filepath = bl.generateSource(env, folder)
+    spec = importlib.util.spec_from_file_location(env, filepath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_renumbered_environment_rejects_handlers(data_folder, tmp_path):
+    data = tmp_path / "data"
+    shutil.copytree(data_folder, data)
+    bl = ByteLang()
+    bl.setDataFolder(data)
+    module = _generate(bl, "test_env", tmp_path)
+    Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, module.INSTRUCTIONS, module.SIGNATURE)
+
+    # Отчёт профилировщика переставляет индексы: прежние обработчики больше не подходят
+    # Отчёт во вложенной папке: EnvironmentsRegistry.preload не должен принять его за окружение
+    (data / "environments" / "reports").mkdir()
+    (data / "environments" / "reports" / "report.json").write_text(json.dumps({"instructions": [{"name": "base::pop8", "count": 10}]}))
+    env_filepath = data / "environments" / "test_env.json"
+    env_filepath.write_text(json.dumps({**json.loads(env_filepath.read_text()), "opcode_profile": ["reports/report.json"]}))
+    renumbered = ByteLang()
+    renumbered.setDataFolder(data)
+    env = renumbered.environment_registry.get("test_env")
+
+    with pytest.raises(InterpreterError):
+        Interpreter(env, renumbered.primitives_registry, module.INSTRUCTIONS, module.SIGNATURE)
+
+    # Без подписи перестановку выдают имена сгенерированных обработчиков
+    with pytest.raises(InterpreterError, match="regenerate"):
+        Interpreter(env, renumbered.primitives_registry, module.INSTRUCTIONS)
+
+    renumbered.preload(None)
+    assert "report" not in {e.name for e in renumbered.environment_registry.getValues()}
+
+    module = _generate(renumbered, "test_env", tmp_path)
+    Interpreter(env, renumbered.primitives_registry, module.INSTRUCTIONS, module.SIGNATURE)
+
+
+def test_handler_arity_checked(bl):
+    instructions = tuple(_jump if i == 0 else handler for i, handler in enumerate(TEST_ENV_INSTRUCTIONS))
+    Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, instructions)
+    instructions = tuple((lambda vm: None) if i == 1 else handler for i, handler in enumerate(TEST_ENV_INSTRUCTIONS))
+
+    with pytest.raises(InterpreterError, match="does not accept"):
+        Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, instructions)
+
+
+def test_block_compiler_detects_control_handlers():
+    assert all(map(BasicBlockCompiler.isStraight, TEST_ENV_INSTRUCTIONS[1:4]))
+    assert not BasicBlockCompiler.isStraight(TEST_ENV_INSTRUCTIONS[0])
+    assert not BasicBlockCompiler.isStraight(_jump)
+    assert not BasicBlockCompiler.isStraight(lambda vm, address, jump=_jump: jump(vm, address))
+
+
+def test_block_compiler_leaves_block_on_jump(bl, compile_source):
+    env = bl.environment_registry.get("test_env")
+    bytecode = compile_source(JUMP_SOURCE.format(skip=env.instructions["print"].size + env.instructions["exit"].size))
+    instructions = tuple(_jump if i == 4 else handler for i, handler in enumerate(TEST_ENV_INSTRUCTIONS))
+    results = list[tuple[int, str]]()
+
+    for run in (lambda vm: vm.run(bytecode), lambda vm: BasicBlockCompiler(env, instructions).compile(vm, bytecode).run(vm)):
+        vm = Interpreter(env, bl.primitives_registry, instructions)
+        sink = MemorySink()
+        vm.setOutput(sink)
+        results.append((run(vm), sink.getValue()))
+        vm.unload()
+
+    assert results[0] == results[1] == (0, "|> 7\n")
+
+
+def test_block_compiler_late_block_uses_running_vm(bl, compile_source):
+    env = bl.environment_registry.get("test_env")
+    # Переход на exit 1 - внутрь линейного блока, который компилируется при первом обращении
+    bytecode = compile_source(JUMP_SOURCE.format(skip=env.instructions["print"].size))
+    instructions = tuple(_jump if i == 4 else handler for i, handler in enumerate(TEST_ENV_INSTRUCTIONS))
+
+    compile_vm = Interpreter(env, bl.primitives_registry, instructions)
+    program = BasicBlockCompiler(env, instructions).compile(compile_vm, bytecode)
+
+    with pytest.raises(InterpreterError):
+        compile_vm.snapshot()
+
+    for _ in range(2):
+        vm = Interpreter(env, bl.primitives_registry, instructions)
+        sink = MemorySink()
+        vm.setOutput(sink)
+        assert program.run(vm) == 1
+        assert sink.getValue() == ""
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+SOURCE = """
+# Ссылки на метки, константы и выражения
+.env test_env
+.def N 3
+.def STEP N*2+1
+.ptr u32 A STEP
+.ptr i16 C 0
+.ptr u8 B 'x'
+start:
+push32 start
+pop32 A
+print A
+inc C
+push32 start+STEP
+pop16 C
+middle:
+print8 B
+write 'y'
+push32 middle
+pop8 B
+exit N-3
+"""
+
+
+@pytest.mark.parametrize("container", (False, True))
+def test_streaming_matches_compilation(compile_source, container):
+    expected = compile_source(SOURCE, container=container).read_bytes()
+    assert compile_source(SOURCE, container=container, streaming=True).read_bytes() == expected
+
+
+def test_streaming_many_marks(compile_source):
+    source = SOURCE + "".join(f"L{i}:\npush32 L{i // 2}\npop32 A\nprint A\n" for i in range(40)) + "exit 0\n"
+    expected = compile_source(source).read_bytes()
+    assert compile_source(source, streaming=True).read_bytes() == expected
+
+
+def test_streaming_rejects_optimize(bl, tmp_path):
+    source_filepath = tmp_path / "program.bls"
+    source_filepath.write_text(SOURCE)
+    assert bl.compile(source_filepath, tmp_path / "program.blc", streaming=True, optimize=True) is None
+    assert bl.getErrors()
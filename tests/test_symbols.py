@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+from bytelang.errors import ExpressionError
+from bytelang.handlers import ErrorHandler
+from bytelang.parsers import StatementParser
+from bytelang.statement import UniversalArgument
+from bytelang.symbols import SymbolTable
+
+
+def _argument(text: str) -> UniversalArgument:
+    statement = StatementParser(ErrorHandler())._parseLine(0, f"push32 {text}")
+    assert statement is not None
+    return statement.arguments[0]
+
+
+@pytest.fixture
+def symbols() -> SymbolTable:
+    return SymbolTable(lambda _: None)
+
+
+@pytest.mark.parametrize("expression", ("1<<1100", "1<<65", "(1<<64)*(1<<64)*(1<<900)", "1.0e400-1.0e400", "1.0e300*1.0e300"))
+def test_unrepresentable_value(symbols, expression):
+    with pytest.raises(ExpressionError):
+        symbols.evaluate(_argument(expression))
+
+
+def test_unrepresentable_value_reported(bl, tmp_path):
+    source_filepath = tmp_path / "program.bls"
+    source_filepath.write_text(".env test_env\n.def X 1<<1100\nexit 0\n")
+    assert bl.compile(source_filepath, tmp_path / "program.blc") is None
+    assert bl.getErrors()
+
+
+@pytest.mark.parametrize("value", ("1.0e400", "1.0e400-1.0e400"))
+def test_non_finite_value_reported(bl, tmp_path, value):
+    source_filepath = tmp_path / "program.bls"
+    source_filepath.write_text(f".env test_env\n.def X {value}\nexit 0\n")
+    assert bl.compile(source_filepath, tmp_path / "program.blc") is None
+    assert bl.getErrors()
+
+
+def test_float_constant_keeps_float_arithmetic(symbols):
+    symbols.define("X", _argument("5.0"))
+    symbols.define("C", _argument("'A'"))
+    assert symbols.evaluate(_argument("X/2")).exponent == symbols.evaluate(_argument("5.0/2")).exponent == 2.5
+    assert symbols.evaluate(_argument("C/2")).integer == 32
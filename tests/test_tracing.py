@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from conftest import TEST_ENV_INSTRUCTIONS
+
+from bytelang.interpreters import ExecutionMode
+from bytelang.interpreters import Interpreter
+from bytelang.sinks import MemorySink
+from bytelang.tracing import TraceReader
+from bytelang.tracing import TraceWriter
+
+SOURCE = """
+.env test_env
+.ptr u32 A 0
+""" + "push32 1\npop32 A\nprint A\n" * 5 + "exit 0\n"
+
+
+def _interpreter(bl) -> tuple[Interpreter, MemorySink]:
+    vm = Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, TEST_ENV_INSTRUCTIONS)
+    sink = MemorySink()
+    vm.setOutput(sink)
+    return vm, sink
+
+
+def test_replay_does_not_repeat_output(bl, compile_source, tmp_path):
+    bytecode = compile_source(SOURCE)
+    trace_filepath = tmp_path / "program.trace"
+    vm, sink = _interpreter(bl)
+
+    with TraceWriter(trace_filepath, checkpoint_interval=4) as tracer:
+        vm.setTracer(tracer)
+        vm.run(bytecode, ExecutionMode.TRACING)
+
+    vm.unload()
+    assert sink.getValue().count("\n") == 5
+
+    replayed, replayed_sink = _interpreter(bl)
+
+    with TraceReader(trace_filepath) as trace:
+        replayed.replay(trace, bytecode, 11)
+
+    replayed.getOutput().flush()
+    assert replayed_sink.getValue() == ""
+
+    # После восстановления вывод продолжается с шага 11: остались печати шагов 12 и 15
+    replayed.resume(ExecutionMode.DECODING)
+    replayed.unload()
+    assert replayed_sink.getValue().count("\n") == 2
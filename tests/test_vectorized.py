@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from bytelang.errors import InterpreterError
+from bytelang.sinks import BufferedTextSink
+from conftest import TEST_ENV_INSTRUCTIONS
+
+np = pytest.importorskip("numpy")
+
+from bytelang.vectorized import LockstepInterpreter  # noqa: E402
+
+
+def _lockstep(bl, instructions, lanes: int) -> LockstepInterpreter:
+    return LockstepInterpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, instructions, lanes)
+
+
+def test_overflow_raises(bl, compile_source, execute):
+    bytecode = compile_source(".env test_env\n.ptr i16 V 32767\ninc V\nexit 0\n")
+
+    with pytest.raises(InterpreterError):
+        execute(bytecode)
+
+    with pytest.raises(InterpreterError):
+        _lockstep(bl, TEST_ENV_INSTRUCTIONS, 3).run(bytecode)
+
+
+def _branching_write(vm, _) -> None:
+    vm.stdoutWrite("x")
+
+    if vm.addressReadPrimitive(1, vm.i32) > 0:
+        vm.setExitCode(9)
+
+
+@pytest.mark.parametrize("initial, codes", (
+        ([-3, -1, 0, 5], [1, 1, 9, 9]),
+        ([1, 1, 1, 1], [9, 9, 9, 9]),
+))
+def test_divergence_output_once(bl, compile_source, initial, codes):
+    instructions = list(TEST_ENV_INSTRUCTIONS)
+    instructions[4] = _branching_write
+    bytecode = compile_source(".env test_env\n.ptr i32 B 0\nprint B\ninc B\nwrite 1\nexit 1\n")
+
+    vm = _lockstep(bl, tuple(instructions), len(initial))
+    streams = [io.StringIO() for _ in initial]
+    vm.getOutputs()[:] = [BufferedTextSink(stream) for stream in streams]
+    vm.load(bytecode)
+    vm.addressWritePrimitive(1, vm.i32, np.array(initial))
+
+    assert vm.execute().tolist() == codes
+    assert all(stream.getvalue().count("x") == 1 for stream in streams)
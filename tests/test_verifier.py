@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+from conftest import TEST_ENV_INSTRUCTIONS
+
+from bytelang.errors import InterpreterError
+from bytelang.interpreters import ExecutionMode
+from bytelang.interpreters import Interpreter
+from bytelang.verifier import ByteCodeVerifier
+
+SOURCE = """
+.env test_env
+.ptr u32 A 0
+print A
+exit 0
+"""
+"""Код начинается с адреса 5: print (индекс 1) с указателем на A, затем exit"""
+
+CODE_START = 5
+
+
+@pytest.fixture
+def program(compile_source) -> bytes:
+    return compile_source(SOURCE).read_bytes()
+
+
+@pytest.fixture
+def verifier(bl) -> ByteCodeVerifier:
+    return ByteCodeVerifier(bl.environment_registry.get("test_env"))
+
+
+def _patch(program: bytes, address: int, value: int) -> bytes:
+    ret = bytearray(program)
+    ret[address] = value
+    return bytes(ret)
+
+
+def test_valid_program(verifier, program):
+    assert program[0] == CODE_START
+    assert verifier.run(program) == ()
+
+
+def test_invalid_instruction_index(verifier, program):
+    errors = verifier.run(_patch(program, CODE_START, 200))
+    assert len(errors) == 1 and "Invalid instruction index 200" in errors[0]
+
+
+def test_pointer_out_of_heap(verifier, program):
+    errors = verifier.run(_patch(program, CODE_START + 1, 200))
+    assert len(errors) == 1 and "out of heap" in errors[0]
+
+
+def test_pointer_into_code(verifier, program):
+    # u32 по адресу 2 заканчивается в сегменте кода
+    assert verifier.run(_patch(program, CODE_START + 1, 2))
+
+
+def test_truncated_tail(verifier, program):
+    errors = verifier.run(program + bytes((1,)))
+    assert len(errors) == 1 and "Truncated instruction" in errors[0]
+
+
+def test_code_start_out_of_program(verifier, program):
+    assert verifier.run(_patch(program, 0, 200))
+
+
+@pytest.mark.parametrize("mode", (ExecutionMode.DECODING, ExecutionMode.THREADED, ExecutionMode.FUSED))
+@pytest.mark.parametrize("verify", (False, True))
+def test_falling_off_the_end(bl, compile_source, mode, verify):
+    bytecode = compile_source(".env test_env\nwrite 65\n")
+    vm = Interpreter(bl.environment_registry.get("test_env"), bl.primitives_registry, TEST_ENV_INSTRUCTIONS)
+    vm.load(bytecode)
+
+    if verify:
+        vm.verify()
+
+    with pytest.raises(InterpreterError, match="past the end|out of code segment"):
+        vm.resume(mode)
+
+    vm.unload()